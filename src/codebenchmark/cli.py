@@ -6,14 +6,18 @@ from typing import Iterable, List, Optional
 import click
 
 import config
+from docs_parser.bulk_crawl import crawl_repos_file
 from docs_parser.crawl_deepwiki_docs import download_deepwiki_docs
+from docs_parser.markdown_sections import MARKDOWN_BACKENDS
 from docs_parser.parse_generated_docs import SUPPORTED_ADAPTERS, parse_docs
+from docs_parser.json_io import json_exists
 from rubrics_generator.generate_rubrics import detect_docs_source as detect_rubrics_docs, run as run_rubrics_generation
 from rubrics_generator.combine_rubrics import combine_rubrics_for_repo
 from rubrics_generator.visualize_rubrics import visualize_rubrics
 from judge.judge import detect_docs_source as detect_reference_docs, run as run_evaluations
 from judge.combine_evaluations import combine_evaluations_for_repo
 from judge.visualize_evaluation import visualize_results
+from codebenchmark.planner import plan_eval, plan_rubrics
 
 DEFAULT_RUBRICS_MODELS = ["claude-sonnet-4", "kimi-k2-instruct", "glm-4p5"]
 DEFAULT_EVAL_MODELS = ["gpt4.1-mini", "kimi-k2-instruct", "glm-4p5"]
@@ -55,7 +59,7 @@ def _resolve_docs_source(repo_name: str, adapter: Optional[str], detector) -> st
     if adapter:
         candidate = base_path / adapter
         docs_tree = candidate / "docs_tree.json"
-        if docs_tree.exists():
+        if json_exists(str(docs_tree)):
             return adapter
         raise click.ClickException(
             f"Could not find parsed docs for adapter '{adapter}' under {candidate}. "
@@ -75,22 +79,79 @@ def app():
 
 @app.command()
 @click.option("--adapter", default="deepwiki", show_default=True, help="Documentation adapter to use.")
-@click.option("--url", required=True, help="Source URL for downloads (adapter specific).")
+@click.option("--url", help="Source URL for downloads (adapter specific).")
 @click.option("--output-dir", help="Directory to store downloaded docs (defaults to data/<repo>/<adapter>/docs).")
 @click.option("--repo", "repo_name", help="Repository name to infer default paths.")
-def download(adapter: str, url: str, output_dir: Optional[str], repo_name: Optional[str]):
+@click.option(
+    "--parse/--no-parse",
+    "parse_pages",
+    default=False,
+    show_default=True,
+    help="Parse pages as they arrive; parsed docs go to the parent of the download directory.",
+)
+@click.option("--mcp-url", help="MCP server SSE endpoint (defaults to config DEEPWIKI_MCP_URL).")
+@click.option(
+    "--repos-file",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Crawl every repository URL listed in this file (one per line, optional repo name after it) instead of --url.",
+)
+@click.option("--manifest", help="Progress manifest for --repos-file (defaults to <repos-file>.manifest.json).")
+@click.option("--concurrency", default=4, show_default=True, type=int, help="Repos crawled at once with --repos-file.")
+@click.option(
+    "--host-interval", default=1.0, show_default=True, type=float, help="Seconds between crawl starts on one MCP host."
+)
+def download(
+    adapter: str,
+    url: Optional[str],
+    output_dir: Optional[str],
+    repo_name: Optional[str],
+    parse_pages: bool,
+    mcp_url: Optional[str],
+    repos_file: Optional[str],
+    manifest: Optional[str],
+    concurrency: int,
+    host_interval: float,
+):
     """Download documentation for a repo (currently only DeepWiki is supported)."""
     adapter = adapter.lower()
     if adapter != "deepwiki":
         raise click.ClickException(f"Adapter '{adapter}' is not supported for downloads.")
 
+    if repos_file:
+        if url or output_dir or repo_name:
+            raise click.ClickException("--repos-file cannot be combined with --url, --output-dir or --repo.")
+        try:
+            entries = crawl_repos_file(
+                repos_file,
+                manifest,
+                parse=parse_pages,
+                concurrency=concurrency,
+                host_interval=host_interval,
+                server_url=mcp_url,
+            )
+        except ValueError as exc:
+            raise click.ClickException(str(exc)) from exc
+        failed = [entry["repo"] for entry in entries.values() if entry["status"] != "done"]
+        click.echo(f"{len(entries) - len(failed)} repos downloaded, {len(failed)} failed.")
+        if failed:
+            raise click.ClickException(f"Failed: {', '.join(failed)}. Run the same command again to retry them.")
+        return
+
+    if not url:
+        raise click.ClickException("Provide --url or --repos-file.")
+
     if not output_dir:
         if not repo_name:
             raise click.ClickException("Either provide --output-dir or supply --repo to infer the destination.")
         output_dir = str(_data_path(repo_name, adapter, "docs"))
 
     click.echo(f"Downloading {adapter} docs from {url} to {output_dir}")
-    download_deepwiki_docs(url, output_dir)
+    if parse_pages:
+        parsed_dir = str(Path(output_dir).resolve().parent)
+        download_deepwiki_docs(url, output_dir, parsed_dir, mcp_url, project_name=repo_name)
+        click.echo(f"Download completed. Structured docs written to {parsed_dir}")
+        return
+    download_deepwiki_docs(url, output_dir, server_url=mcp_url)
     click.echo("Download completed.")
 
 
@@ -99,7 +160,30 @@ def download(adapter: str, url: str, output_dir: Optional[str], repo_name: Optio
 @click.option("--repo", "repo_name", required=True, help="Repository name (used for data/<repo>/...).")
 @click.option("--input-dir", help="Directory containing adapter output (defaults to data/<repo>/<adapter>/docs).")
 @click.option("--output-dir", help="Where parsed docs should be written (defaults to data/<repo>/<adapter>).")
-def parse(adapter: str, repo_name: str, input_dir: Optional[str], output_dir: Optional[str]):
+@click.option("--workers", default=1, show_default=True, help="Processes for markdown parsing (0: one per CPU core).")
+@click.option("--cache/--no-cache", default=True, show_default=True, help="Only re-parse files changed since the last parse.")
+@click.option("--compact", is_flag=True, default=False, help="Write JSON outputs without indentation (smaller files).")
+@click.option(
+    "--markdown-backend",
+    type=click.Choice(MARKDOWN_BACKENDS),
+    default="markdown_to_json",
+    show_default=True,
+    help="Markdown section extractor (markdown_it is faster, same output on typical docs).",
+)
+@click.option("--chunk-store", help="Also store sections by content hash here (e.g. data/<repo>/chunks).")
+@click.option("--shards", is_flag=True, default=False, help="Also write per-page shards (pages/) for the pages backend.")
+def parse(
+    adapter: str,
+    repo_name: str,
+    input_dir: Optional[str],
+    output_dir: Optional[str],
+    workers: int,
+    cache: bool,
+    compact: bool,
+    markdown_backend: str,
+    chunk_store: Optional[str],
+    shards: bool,
+):
     """Parse downloaded docs into structured JSON trees."""
     adapter_normalized = adapter.lower()
     if adapter_normalized not in SUPPORTED_ADAPTERS:
@@ -113,7 +197,18 @@ def parse(adapter: str, repo_name: str, input_dir: Optional[str], output_dir: Op
 
     output_path = Path(output_dir) if output_dir else _data_path(repo_name, adapter_normalized)
     click.echo(f"Parsing {adapter_normalized} docs from {input_path} -> {output_path}")
-    parse_docs(adapter_normalized, repo_name, str(input_path), str(output_path))
+    parse_docs(
+        adapter_normalized,
+        repo_name,
+        str(input_path),
+        str(output_path),
+        workers,
+        cache,
+        compact,
+        markdown_backend,
+        chunk_store,
+        shards,
+    )
     click.echo(f"Structured docs written to {output_path}")
 
 
@@ -126,6 +221,7 @@ def parse(adapter: str, repo_name: str, input_dir: Optional[str], output_dir: Op
 @click.option("--visualize", is_flag=True, default=False, help="Visualize combined rubrics after generation.")
 @click.option("--temperature", default=0.1, show_default=True, help="Temperature for combination step.")
 @click.option("--max-retries", default=3, show_default=True, help="Max retries for rubric combination.")
+@click.option("--plan", is_flag=True, default=False, help="Print projected calls, tokens, cost and wall time, then exit.")
 def rubrics(
     adapter: Optional[str],
     repo_name: str,
@@ -135,11 +231,16 @@ def rubrics(
     visualize: bool,
     temperature: float,
     max_retries: int,
+    plan: bool,
 ):
     """Generate rubrics from parsed docs and combine them."""
     docs_source = _resolve_docs_source(repo_name, adapter, detect_rubrics_docs)
     model_list = _parse_model_list(models, single_model, DEFAULT_RUBRICS_MODELS)
 
+    if plan:
+        plan_rubrics(repo_name, docs_source, model_list, use_tools)
+        return
+
     click.echo(f"Using docs source '{docs_source}' for repo '{repo_name}'.")
     for model in model_list:
         click.echo(f"Generating rubrics with {model}...")
@@ -183,6 +284,7 @@ def rubrics(
 @click.option("--use-tools/--no-use-tools", default=True, show_default=True, help="Toggle doc navigation tools.")
 @click.option("--enable-retry/--disable-retry", default=False, show_default=True, help="Enable evaluation retries.")
 @click.option("--visualize", is_flag=True, default=False, help="Visualize evaluation output.")
+@click.option("--plan", is_flag=True, default=False, help="Print projected calls, tokens, cost and wall time, then exit.")
 def evaluate(
     adapter: Optional[str],
     repo_name: str,
@@ -195,10 +297,18 @@ def evaluate(
     use_tools: bool,
     enable_retry: bool,
     visualize: bool,
+    plan: bool,
 ):
     """Run evaluation pipeline for generated rubrics."""
     reference = _resolve_docs_source(repo_name, adapter, detect_reference_docs)
     model_list = _parse_model_list(models, single_model, DEFAULT_EVAL_MODELS)
+
+    if plan:
+        try:
+            plan_eval(repo_name, reference, model_list, use_tools, batch_size)
+        except FileNotFoundError as exc:
+            raise click.ClickException(str(exc)) from exc
+        return
     click.echo(f"Evaluating docs '{reference}' for repo '{repo_name}' with models: {', '.join(model_list)}")
 
     result_paths: List[Path] = []
@@ -0,0 +1,209 @@
+"""Dry-run planner: project calls, tokens, cost and wall time before a run."""
+
+import glob
+import heapq
+import math
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import click
+
+import config
+from llm_proxy import count_tokens
+from docs_parser.json_io import load_json
+from tools.run_journal import JOURNAL_FILENAME, load_runs
+
+DEFAULT_CONCURRENCY = [1, 2, 4, 8, 16]
+
+# Fallbacks used when no past run journal exists for a stage.
+DEFAULT_ESTIMATES = {
+    "eval": {"requests": 3.0, "tool_tokens": 4_000.0, "output_tokens": 300.0, "seconds_per_request": 15.0},
+    "rubrics": {"requests": 12.0, "tool_tokens": 8_000.0, "output_tokens": 6_000.0, "seconds_per_request": 30.0},
+}
+
+
+def _journal_files() -> List[str]:
+    return glob.glob(os.path.join(str(config.DATA_DIR), "*", JOURNAL_FILENAME))
+
+
+def estimate_turns(stage: str, model: str, use_tools: bool, runs: Iterable[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Average per-run statistics for a stage, preferring journal entries of the same model.
+    Only runs with the same `use_tools` setting are sampled (entries without it are skipped).
+
+    Returns requests per run, tool-output tokens per request (input beyond the prompt),
+    output tokens per run and seconds per request.
+    """
+    runs = [r for r in runs if r.get("use_tools") == use_tools]
+    same_model = [r for r in runs if r.get("model") == model]
+    sample = same_model or runs
+    defaults = dict(DEFAULT_ESTIMATES[stage])
+    if not use_tools:
+        defaults["requests"] = 1.0
+        defaults["tool_tokens"] = 0.0
+
+    if not sample:
+        return {**defaults, "source": "defaults"}
+
+    requests = sum(max(r.get("requests", 1), 1) for r in sample)
+    tool_tokens = sum(
+        max(r.get("input_tokens", 0) - r.get("prompt_tokens", 0) * max(r.get("requests", 1), 1), 0)
+        for r in sample
+    )
+    return {
+        "requests": requests / len(sample) if use_tools else 1.0,
+        "tool_tokens": tool_tokens / requests if use_tools else 0.0,
+        "output_tokens": sum(r.get("output_tokens", 0) for r in sample) / len(sample),
+        "seconds_per_request": sum(r.get("elapsed", 0.0) for r in sample) / requests or defaults["seconds_per_request"],
+        "source": f"{len(sample)} journal runs" + ("" if same_model else " (other models)"),
+    }
+
+
+def project_run(prompt_tokens: List[int], estimate: Dict[str, float], model: str) -> Dict[str, float]:
+    """
+    Project totals for independent agent runs with the given prompt sizes.
+
+    Each request of a run resends the prompt plus the tool output gathered so far.
+    """
+    turns = estimate["requests"]
+    tool_tokens = estimate["tool_tokens"]
+    # Request k carries k-1 earlier tool outputs: sum_{k<turns} k = turns*(turns-1)/2.
+    tool_context = tool_tokens * turns * (turns - 1) / 2
+    input_tokens = sum(p * turns + tool_context for p in prompt_tokens)
+    output_tokens = estimate["output_tokens"] * len(prompt_tokens)
+    pricing = config.get_model_pricing(model)
+    return {
+        "runs": len(prompt_tokens),
+        "calls": turns * len(prompt_tokens),
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "cost": input_tokens * pricing["input"] / 1e6 + output_tokens * pricing["output"] / 1e6,
+        "run_seconds": turns * estimate["seconds_per_request"],
+    }
+
+
+def eval_wall_seconds(leaves: int, batch_size: int, run_seconds: float) -> float:
+    """Judge runs leaves in concurrent batches with a 1s pause between batches."""
+    batches = math.ceil(leaves / batch_size) if leaves else 0
+    return batches * run_seconds + max(batches - 1, 0)
+
+
+def parallel_wall_seconds(run_seconds: List[float], slots: int) -> float:
+    """Wall time of independent runs spread over `slots` workers, longest runs first."""
+    finish = [0.0] * min(max(slots, 1), len(run_seconds))
+    for seconds in sorted(run_seconds, reverse=True):
+        heapq.heappush(finish, heapq.heappop(finish) + seconds)
+    return max(finish, default=0.0)
+
+
+def _total(projections: List[Dict[str, float]]) -> Dict[str, float]:
+    keys = ("runs", "calls", "input_tokens", "output_tokens", "cost")
+    return {key: sum(p[key] for p in projections) for key in keys}
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, secs = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m" if hours else f"{minutes}m{secs:02d}s"
+
+
+def _print_row(label: str, projection: Dict[str, float], wall_seconds: float) -> None:
+    click.echo(
+        f"  {label:<18} calls={projection['calls']:>8.0f}  "
+        f"input={projection['input_tokens'] / 1e6:>7.2f}M  "
+        f"output={projection['output_tokens'] / 1e6:>6.2f}M  "
+        f"cost=${projection['cost']:>8.2f}  wall={_format_duration(wall_seconds)}"
+    )
+
+
+def _print_table(
+    label: str,
+    projection: Dict[str, float],
+    settings: List[int],
+    current: int,
+    wall_seconds: Callable[[int], float],
+) -> None:
+    """One row per concurrency setting; `current` is the setting the real command would use."""
+    for setting in settings:
+        _print_row(f"{label} {setting}" + (" *" if setting == current else ""), projection, wall_seconds(setting))
+
+
+def plan_eval(
+    repo_name: str,
+    reference: str,
+    models: List[str],
+    use_tools: bool,
+    batch_size: int,
+    rubrics_file: Optional[str] = None,
+    concurrency: Optional[List[int]] = None,
+) -> None:
+    """Print projected cost of `codebenchmark eval` without calling any model."""
+    from judge.judge import EVALUATION_SYSTEM_PROMPT, build_evaluation_prompt, collect_leaf_requirements
+
+    base_path = config.get_data_path(repo_name)
+    rubrics_file = rubrics_file or os.path.join(base_path, "rubrics", "combined_rubrics.json")
+    rubrics = load_json(rubrics_file)
+    if isinstance(rubrics, dict) and "rubrics" in rubrics:
+        rubrics = rubrics["rubrics"]
+    docs_tree = load_json(os.path.join(base_path, reference, "docs_tree.json"))
+
+    leaves = collect_leaf_requirements(rubrics)
+    system_tokens = count_tokens(EVALUATION_SYSTEM_PROMPT)
+    prompt_tokens = [system_tokens + count_tokens(build_evaluation_prompt(leaf["requirement"], docs_tree)) for leaf in leaves]
+    runs = load_runs(_journal_files(), stage="eval")
+    settings = sorted(set((concurrency or DEFAULT_CONCURRENCY) + [batch_size]))
+
+    click.echo(f"Plan: eval of '{reference}' for '{repo_name}' ({len(leaves)} leaf requirements)")
+    click.echo(f"Prompt tokens per leaf: {min(prompt_tokens, default=0)}-{max(prompt_tokens, default=0)}")
+    for model in models:
+        estimate = estimate_turns("eval", model, use_tools, runs)
+        projection = project_run(prompt_tokens, estimate, model)
+        click.echo(f"\n{model}: {estimate['requests']:.1f} calls/leaf ({estimate['source']})")
+        _print_table(
+            "batch-size",
+            projection,
+            settings,
+            batch_size,
+            lambda setting: eval_wall_seconds(len(leaves), setting, projection["run_seconds"]),
+        )
+
+
+def plan_rubrics(
+    repo_name: str,
+    docs_source: str,
+    models: List[str],
+    use_tools: bool,
+    concurrency: Optional[List[int]] = None,
+) -> None:
+    """
+    Print projected cost of `codebenchmark rubrics` without calling any model.
+
+    Each model is one agent run; the command runs the models one after another
+    (concurrency 1), the other rows show the wall time if they ran side by side.
+    """
+    from rubrics_generator.generate_rubrics import build_rubrics_prompt, get_system_prompt
+
+    base_path = config.get_data_path(repo_name)
+    docs_tree = load_json(os.path.join(base_path, docs_source, "docs_tree.json"))
+    prompt_tokens = count_tokens(get_system_prompt(use_tools)) + count_tokens(build_rubrics_prompt(docs_tree))
+    runs = load_runs(_journal_files(), stage="rubrics")
+    settings = sorted(set(s for s in (concurrency or DEFAULT_CONCURRENCY) if s <= len(models)) | {1, len(models)})
+
+    click.echo(f"Plan: rubrics from '{docs_source}' for '{repo_name}' (prompt {prompt_tokens} tokens)")
+    projections = []
+    for model in models:
+        estimate = estimate_turns("rubrics", model, use_tools, runs)
+        projection = project_run([prompt_tokens], estimate, model)
+        projections.append(projection)
+        click.echo(f"\n{model}: {estimate['requests']:.1f} calls/run ({estimate['source']})")
+        _print_row("1 run", projection, projection["run_seconds"])
+
+    run_seconds = [p["run_seconds"] for p in projections]
+    click.echo(f"\nAll {len(models)} models:")
+    _print_table(
+        "concurrency",
+        _total(projections),
+        settings,
+        1,
+        lambda setting: parallel_wall_seconds(run_seconds, setting),
+    )
@@ -66,6 +66,23 @@ MAX_TOKENS_PER_TOOL_RESPONSE = int(
     _PROJECT_CFG.get("max_tokens_per_tool_response", 36_000)
 )
 
+# "json" loads the JSON files per process; "store" memory-maps a compiled docs_store.bin;
+# "pages" reads the per-page shards written by the parsers on first access.
+DOCS_BACKEND = os.environ.get("DOCS_BACKEND", _PROJECT_CFG.get("docs_backend", "json"))
+# Page shards kept in memory per navigator with the "pages" backend.
+PAGE_CACHE_SIZE = int(_PROJECT_CFG.get("page_cache_size", 64))
+# docs_navigator output per stage ("eval", "rubrics"): "json" or compact "markdown".
+# Env TOOL_OUTPUT_FORMAT_<STAGE> overrides one stage, TOOL_OUTPUT_FORMAT every stage.
+TOOL_OUTPUT_FORMAT: Dict[str, str] = _PROJECT_CFG.get("tool_output_format", {})
+# Rendered docs_navigator responses kept per process (0 disables the cache).
+RENDER_CACHE_SIZE = int(_PROJECT_CFG.get("render_cache_size", 256))
+# Compression of JSON artifacts written from now on: "none", "gzip" (.json.gz) or "zstd" (.json.zst).
+# Readers open any of the three.
+JSON_COMPRESSION = os.environ.get("JSON_COMPRESSION", _PROJECT_CFG.get("json_compression", "none"))
+# DeepWiki MCP server used by the crawler; one session is kept open per crawl and pinged while idle.
+DEEPWIKI_MCP_URL = os.environ.get("DEEPWIKI_MCP_URL", _PROJECT_CFG.get("deepwiki_mcp_url", "https://mcp.deepwiki.com/sse"))
+MCP_KEEPALIVE_INTERVAL = float(_PROJECT_CFG.get("mcp_keepalive_interval", 30))
+
 
 def _resolve_data_dir() -> Path:
     env_dir = os.environ.get(_DATA_DIR_ENV)
@@ -94,6 +111,27 @@ EMBEDDING_MODEL = os.environ.get(
 )
 BASE_URL = os.environ.get("BASE_URL", _LLM_CFG.get("base_url", "http://localhost:4000/"))
 
+# USD per million tokens, keyed by model name with a "default" fallback.
+MODEL_PRICING: Dict[str, Dict[str, float]] = _LLM_CFG.get(
+    "pricing", {"default": {"input": 3.0, "output": 15.0}}
+)
+
+
+def get_model_pricing(model: str | None) -> Dict[str, float]:
+    pricing = MODEL_PRICING.get(model or MODEL) or MODEL_PRICING.get("default", {})
+    return {
+        "input": float(pricing.get("input", 0.0)),
+        "output": float(pricing.get("output", 0.0)),
+    }
+
+
+def get_tool_output_format(stage: str) -> str:
+    return (
+        os.environ.get(f"TOOL_OUTPUT_FORMAT_{stage.upper()}")
+        or os.environ.get("TOOL_OUTPUT_FORMAT")
+        or TOOL_OUTPUT_FORMAT.get(stage, "json")
+    )
+
 
 def get_project_path(*paths: str) -> str:
     return str(PROJECT_ROOT.joinpath(*paths))
@@ -0,0 +1,167 @@
+"""
+Crawl many DeepWiki repositories concurrently, resuming from a manifest.
+
+The repos file lists one repository URL per line (github.com/<owner>/<repo> or
+deepwiki.com/<owner>/<repo>, as for `codebenchmark download`), optionally
+followed by the repo name to store it under (default: the repository part of
+the URL); blank lines and # comments are skipped. Each repo goes to
+data/<repo>/deepwiki/docs like `codebenchmark download --repo <repo>`.
+
+At most `concurrency` repos are crawled at once (all of them talk to the one MCP
+host), and their crawls start `host_interval` seconds apart. The manifest (JSON, rewritten after every repo) records each repo's
+status; repos marked "done" are skipped on the next run, failed ones retried.
+
+    cd src && python -m docs_parser.bulk_crawl --repos-file repos.txt --concurrency 8
+"""
+
+import argparse
+import asyncio
+import glob
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import config
+from docs_parser.crawl_deepwiki_docs import GitHubRepoProcessor, crawl_and_parse_deepwiki, crawl_deepwiki_docs
+from docs_parser.json_io import dump_json, json_exists, load_json
+
+MANIFEST_VERSION = 1
+
+
+def read_repos_file(path: str) -> List[Tuple[str, str]]:
+    """(url, repo name) per entry of a repos file; ValueError on a line without an <owner>/<repo> URL."""
+    repos = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            fields = line.split("#", 1)[0].split()
+            if not fields:
+                continue
+            url = fields[0]
+            if len([part for part in urlparse(url).path.split("/") if part]) < 2:
+                raise ValueError(f"{path}:{line_no}: not a repository URL: {url}")
+            repos.append((url, fields[1] if len(fields) > 1 else GitHubRepoProcessor.get_repo_info(url)["repo"]))
+    return repos
+
+
+def default_manifest_path(repos_file: str) -> str:
+    return os.path.splitext(repos_file)[0] + ".manifest.json"
+
+
+def load_manifest(path: str) -> Dict[str, Dict[str, Any]]:
+    """url -> entry from a manifest written by crawl_repos; empty when there is none yet."""
+    if not json_exists(path):
+        return {}
+    manifest = load_json(path)
+    return manifest.get("repos", {}) if manifest.get("version") == MANIFEST_VERSION else {}
+
+
+class HostLimiter:
+    """Per-host slot: at most `per_host` holders at a time, started `interval` seconds apart."""
+
+    def __init__(self, per_host: int, interval: float):
+        self.per_host = per_host
+        self.interval = interval
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._last_start: Dict[str, float] = {}
+
+    async def acquire(self, host: str) -> None:
+        await self._slots.setdefault(host, asyncio.Semaphore(self.per_host)).acquire()
+        async with self._locks.setdefault(host, asyncio.Lock()):
+            wait = self._last_start.get(host, float("-inf")) + self.interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_start[host] = time.monotonic()
+
+    def release(self, host: str) -> None:
+        self._slots[host].release()
+
+
+async def crawl_repos(
+    repos: List[Tuple[str, str]],
+    manifest_path: str,
+    parse: bool = False,
+    concurrency: int = 4,
+    host_interval: float = 1.0,
+    server_url: Optional[str] = None,
+    **parse_options: Any,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Crawl every (url, repo name) not yet done in the manifest; with `parse`, pages are
+    parsed as they arrive (crawl_and_parse_deepwiki). Returns the updated manifest entries.
+    Raises ValueError when `concurrency` < 1 or two entries share a repo name.
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+    urls_by_repo: Dict[str, str] = {}
+    for url, repo in repos:
+        if repo in urls_by_repo:
+            raise ValueError(
+                f"{urls_by_repo[repo]} and {url} would both be stored as data/{repo}; give one of them another repo name"
+            )
+        urls_by_repo[repo] = url
+
+    entries = load_manifest(manifest_path)
+    pending = [(url, repo) for url, repo in repos if entries.get(url, {}).get("status") != "done"]
+    print(f"{len(repos) - len(pending)}/{len(repos)} repos already done, {len(pending)} to crawl")
+
+    server_url = server_url or config.DEEPWIKI_MCP_URL
+    host = urlparse(server_url).netloc
+    limiter = HostLimiter(concurrency, host_interval)
+
+    def save() -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(manifest_path)), exist_ok=True)
+        dump_json({"version": MANIFEST_VERSION, "repos": entries}, manifest_path)
+
+    async def crawl(url: str, repo: str) -> None:
+        output_dir = config.get_data_path(repo, "deepwiki", "docs")
+        await limiter.acquire(host)
+        start = time.monotonic()
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+            if parse:
+                parsed_dir = os.path.dirname(os.path.abspath(output_dir))
+                await crawl_and_parse_deepwiki(
+                    url, output_dir, parsed_dir, project_name=repo, server_url=server_url, **parse_options
+                )
+            else:
+                await crawl_deepwiki_docs(url, output_dir, server_url)
+            entry = {"status": "done", "pages": len(glob.glob(os.path.join(output_dir, "content_*.md")))}
+        except Exception as e:
+            entry = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+        finally:
+            limiter.release(host)
+        entries[url] = {"repo": repo, "output_dir": output_dir, **entry, "seconds": round(time.monotonic() - start, 1)}
+        save()
+        done = sum(e["status"] == "done" for e in entries.values())
+        print(f"[{done}/{len(repos)}] {repo}: {entries[url].get('pages', entries[url].get('error'))}")
+
+    await asyncio.gather(*(crawl(url, repo) for url, repo in pending))
+    return entries
+
+
+def crawl_repos_file(repos_file: str, manifest_path: Optional[str] = None, **options: Any) -> Dict[str, Dict[str, Any]]:
+    """Synchronous wrapper used by scripts/CLI."""
+    repos = read_repos_file(repos_file)
+    return asyncio.run(crawl_repos(repos, manifest_path or default_manifest_path(repos_file), **options))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repos-file", required=True)
+    parser.add_argument("--manifest", help="Progress manifest (default: <repos-file>.manifest.json)")
+    parser.add_argument("--parse", action="store_true", help="Parse pages as they arrive")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--host-interval", type=float, default=1.0)
+    parser.add_argument("--mcp-url", help="MCP server SSE endpoint (default: config DEEPWIKI_MCP_URL)")
+    args = parser.parse_args()
+
+    crawl_repos_file(
+        args.repos_file,
+        args.manifest,
+        parse=args.parse,
+        concurrency=args.concurrency,
+        host_interval=args.host_interval,
+        server_url=args.mcp_url,
+    )
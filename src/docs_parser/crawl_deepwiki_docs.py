@@ -1,14 +1,27 @@
 import asyncio
+import hashlib
 import json
 import os
 import argparse
-from pydantic import BaseModel, Field
-from typing import Dict, List, Optional, Any
+from contextlib import AsyncExitStack
+from datetime import timedelta
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple
 
+import config
 from mcp import ClientSession
 from mcp.client.sse import sse_client
 from mcp.types import CallToolResult, Tool as MCPTool
 
+from docs_parser.doc_tree import build_docs
+from docs_parser.parse_cache import ParseCache, write_parsed_docs
+from docs_parser.parse_generated_docs import (
+    add_deepwiki_pages,
+    deepwiki_cache_salt,
+    deepwiki_root_page,
+    process_markdown_text,
+)
+
 
 class MCPClient(BaseModel):
     """A collection of tools that connects to an MCP server and manages available tools through the Model Context Protocol."""
@@ -19,6 +32,12 @@ class MCPClient(BaseModel):
 
     server_url: str
     server_params: Dict[str, Any] = Field(default_factory=dict)
+    keepalive_interval: float = 30.0
+
+    _connection: Optional[asyncio.Task] = PrivateAttr(default=None)
+    _closing: Optional[asyncio.Event] = PrivateAttr(default=None)
+    _keepalive_task: Optional[asyncio.Task] = PrivateAttr(default=None)
+    _lock: asyncio.Lock = PrivateAttr(default_factory=asyncio.Lock)
 
     class Config:
         arbitrary_types_allowed = True
@@ -28,6 +47,7 @@ class MCPClient(BaseModel):
         server_url: str,
         timeout: float = 180.0,
         read_timeout: float = 45.0,
+        keepalive_interval: float = 30.0,
     ):
         """Initialize the MCPClient with server URL and available agents.
 
@@ -36,6 +56,7 @@ class MCPClient(BaseModel):
             available_for_agents: List of agent names that can use this tools from this MCP client.
             timeout: Connection timeout in seconds. Default is 5 seconds.
             read_timeout: The read timeout for the SSE connection. Default is 2 minutes.
+            keepalive_interval: Seconds between pings on an idle session (0 disables them).
         """
         server_params = {
             'url': server_url,
@@ -46,33 +67,74 @@ class MCPClient(BaseModel):
         # Properly initialize the Pydantic model
         super().__init__(
             server_url=server_url,
-            server_params=server_params
+            server_params=server_params,
+            keepalive_interval=keepalive_interval,
         )
             
 
     async def connect_sse(self) -> None:
-
-        if self.session:
+        """Open one SSE connection and initialized session, kept alive until disconnect()."""
+        if self._connection:
             await self.close_session()
 
         print('Connecting to MCP server')
 
+        # sse_client's cancel scope must be exited by the task that entered it, so a
+        # dedicated task holds the connection and any task can close it via _closing
+        ready = asyncio.get_running_loop().create_future()
+        self._closing = asyncio.Event()
+        connection = asyncio.create_task(self._hold_connection(ready, self._closing))
         try:
-            async with sse_client(**self.server_params) as (read, write):
-                async with ClientSession(read, write) as session:
-                    self.session = session
-                    await self._initialize_and_list_tools()
+            self.session = await ready
+        except asyncio.CancelledError:
+            connection.cancel()
+            raise
         except Exception as e:
             print(f'Error connecting to {self.server_url}: {str(e)}')
+            self.session = None
+            self._closing = None
             raise
+        self._connection = connection
+        if self.keepalive_interval > 0:
+            self._keepalive_task = asyncio.create_task(self._keepalive(self.session))
 
-    async def _initialize_and_list_tools(self) -> None:
+    async def _hold_connection(self, ready: asyncio.Future, closing: asyncio.Event) -> None:
+        """Enter the SSE connection and session, hand the session over, and exit them once closing is set."""
+        try:
+            async with AsyncExitStack() as exit_stack:
+                read, write = await exit_stack.enter_async_context(sse_client(**self.server_params))
+                # every request on the session (initialize, tool calls, pings) times out after sse_read_timeout
+                read_timeout = timedelta(seconds=self.server_params['sse_read_timeout'])
+                session = await exit_stack.enter_async_context(ClientSession(read, write, read_timeout))
+                await self._initialize_and_list_tools(session)
+                ready.set_result(session)
+                await closing.wait()
+        except Exception as e:
+            if ready.done():
+                raise
+            ready.set_exception(e)
+        finally:
+            if not ready.done():
+                ready.set_exception(ConnectionError('MCP connection closed before the session was ready'))
+
+    async def _keepalive(self, session: ClientSession) -> None:
+        """Ping the session between calls; a failed ping closes it so the next call reconnects."""
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            async with self._lock:
+                if self.session is not session:
+                    return
+                try:
+                    await session.send_ping()
+                except Exception as e:
+                    print(f'MCP keep-alive failed, reconnecting on the next call: {str(e)}')
+                    await self.close_session()
+                    return
+
+    async def _initialize_and_list_tools(self, session: ClientSession) -> None:
         """Initialize session and populate tool map."""
-        if not self.session:
-            raise RuntimeError('Session not initialized.')
-
-        await self.session.initialize()
-        response = await self.session.list_tools()
+        await session.initialize()
+        response = await session.list_tools()
 
         # resgist mcp tools
         self.regist_mcp_tools(response.tools)
@@ -85,68 +147,74 @@ class MCPClient(BaseModel):
     async def call_tool(self, tool_name: str, args: Dict) -> CallToolResult:
         """Call a tool on the MCP server with automatic reconnection on failure.
 
+        The session opened by connect_sse (or by the first call) is reused; a call
+        that fails is retried once on a fresh connection.
+
         Args:
             tool_name: Name of the tool to call.
             args: Arguments to pass to the tool.
 
         Returns:
-            The tool execution result.
-
-        Raises:
-            ValueError: If the tool is not found.
-            RuntimeError: If connection failed and couldn't be restored.
+            The tool execution result, or an error result if the retry failed too.
         """
 
-        try:
-            # Check if we need to reconnect
-            read_timeout: float = self.server_params['sse_read_timeout']
-            tool_result = await asyncio.wait_for(
-                self.execute_call_tool(tool_name=tool_name, args=args),
-                read_timeout + 1.0,  # noqa: E226
-            )
-            return tool_result
-        except Exception as e:
-            print(f'Tool call to {tool_name} failed: {str(e)}')
-            return CallToolResult(
-                content=[
-                    {
-                        'text': f'Tool call to {tool_name} failed: {str(e)}',
-                        'type': 'text',
-                    }
-                ],
-                isError=True,
-            )
-        finally:
-            await self.close_session()
+        for attempt in range(2):
+            try:
+                return await self.execute_call_tool(tool_name=tool_name, args=args)
+            except Exception as e:
+                print(f'Tool call to {tool_name} failed: {str(e)}')
+                if attempt:
+                    return CallToolResult(
+                        content=[
+                            {
+                                'text': f'Tool call to {tool_name} failed: {str(e)}',
+                                'type': 'text',
+                            }
+                        ],
+                        isError=True,
+                    )
 
     async def execute_call_tool(self, tool_name: str, args: Dict) -> CallToolResult:
-        async with sse_client(**self.server_params) as (read, write):
-            async with ClientSession(read, write) as session:
-                self.session = session
-                if not self.session:
-                    raise RuntimeError(
-                        'Failed to reconnect to MCP server. Session is None.'
-                    )
-                await self.session.initialize()
+        """Call the tool on the current session (connecting first if there is none).
+
+        A failed call closes the session before the lock is released, so the next
+        call (or retry) reconnects and the keep-alive never pings a broken session.
+        """
+        async with self._lock:
+            if not self.session:
+                await self.connect_sse()
+            try:
                 tool_result = await self.session.call_tool(name=tool_name, arguments=args)
-                if tool_result.isError:
-                    print(
-                        f'Tool call to {tool_name} failed: {tool_result.content}'
-                    )
-                return tool_result
+            except Exception:
+                await self.close_session()
+                raise
+            if tool_result.isError:
+                print(
+                    f'Tool call to {tool_name} failed: {tool_result.content}'
+                )
+            return tool_result
 
     async def close_session(self) -> None:
+        """Stop the keep-alive and close the session and its SSE connection."""
+        keepalive, self._keepalive_task = self._keepalive_task, None
+        # the keep-alive closes a dead session itself and must not cancel its own close
+        if keepalive and keepalive is not asyncio.current_task():
+            keepalive.cancel()
+        connection, self._connection = self._connection, None
         try:
-            if self.session:
-                if hasattr(self.session, 'close'):
-                    await self.session.close()
-            self.session = None
+            if connection:
+                self._closing.set()
+                await connection
         except Exception as e:
             print(f'Error during close session: {str(e)}')
+        finally:
+            self._closing = None
+            self.session = None
 
     async def disconnect(self) -> None:
         """Disconnect from the MCP server and clean up resources."""
-        await self.close_session()
+        async with self._lock:
+            await self.close_session()
 
     def regist_mcp_tools(self, mcp_tools: List[MCPTool]) -> None:
 
@@ -288,18 +356,15 @@ class GitHubRepoProcessor:
         }
 
 
-async def crawl_deepwiki_docs(url: str, output_dir: str):
-    """Fetch docs from DeepWiki MCP endpoint and dump markdown files."""
-    client = MCPClient(
-        server_url="https://mcp.deepwiki.com/sse",
-        timeout=30,
-        read_timeout=60,
-    )
-    await client.connect_sse()
+def _check_result(result: CallToolResult) -> CallToolResult:
+    if result.isError:
+        raise RuntimeError(result.content[0].text if result.content else "MCP tool call failed")
+    return result
 
-    repo_name = GitHubRepoProcessor.get_repo_info(url)['full_name']
 
-    read_wiki_structure_result = await client.call_tool("read_wiki_structure", {"repoName": repo_name})
+async def iter_deepwiki_pages(client: MCPClient, repo_name: str) -> AsyncIterator[Tuple[int, str]]:
+    """Yield (index, markdown) for each DeepWiki page as it is received; the first line is the page header."""
+    read_wiki_structure_result = _check_result(await client.call_tool("read_wiki_structure", {"repoName": repo_name}))
     
     headers = read_wiki_structure_result.content[0].text.strip().split("\n")[2:]
     for i in range(len(headers)):
@@ -307,20 +372,111 @@ async def crawl_deepwiki_docs(url: str, output_dir: str):
         header = header.split(" ")[0] + "-" + " ".join(header.split(" ")[1:])
         headers[i] = header
 
-    read_wiki_contents_result = await client.call_tool("read_wiki_contents", {"repoName": repo_name})
-    # print(f"read_wiki_contents_result: {read_wiki_contents_result}")
-    # save the result to a md file
+    read_wiki_contents_result = _check_result(await client.call_tool("read_wiki_contents", {"repoName": repo_name}))
     for i, content in enumerate(read_wiki_contents_result.content):
-        with open(os.path.join(output_dir, f"content_{i}.md"), "w") as f:
-            f.write(headers[i] + "\n\n" + content.text.strip())
+        yield i, headers[i] + "\n\n" + content.text.strip()
 
-    await client.disconnect()
 
+def _archive_page(file_path: str, text: str) -> None:
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(text)
 
-def download_deepwiki_docs(url: str, output_dir: str):
-    """Synchronous wrapper used by scripts/CLI."""
+
+async def crawl_deepwiki_docs(url: str, output_dir: str, server_url: Optional[str] = None):
+    """Fetch docs from DeepWiki MCP endpoint and dump markdown files."""
+    client = MCPClient(
+        server_url=server_url or config.DEEPWIKI_MCP_URL,
+        timeout=30,
+        read_timeout=60,
+        keepalive_interval=config.MCP_KEEPALIVE_INTERVAL,
+    )
+    await client.connect_sse()
+
+    repo_name = GitHubRepoProcessor.get_repo_info(url)['full_name']
+
+    # save each page to a md file
+    try:
+        async for i, text in iter_deepwiki_pages(client, repo_name):
+            _archive_page(os.path.join(output_dir, f"content_{i}.md"), text)
+    finally:
+        await client.disconnect()
+
+
+async def crawl_and_parse_deepwiki(
+    url: str,
+    output_dir: str,
+    parsed_dir: str,
+    project_name: Optional[str] = None,
+    use_cache: bool = True,
+    compact: bool = False,
+    markdown_backend: str = "markdown_to_json",
+    chunk_store: Optional[str] = None,
+    server_url: Optional[str] = None,
+    shards: bool = False,
+):
+    """
+    Fetch DeepWiki docs and parse each page from memory as soon as it arrives.
+
+    The raw markdown is still archived to output_dir/content_{i}.md, in background
+    threads, and each page is recorded in parsed_dir's parse cache. A later
+    `parse_deepwiki(output_dir, output_dir=parsed_dir)` therefore has nothing to
+    re-parse. Returns (root_page, detailed_keys_tree) like parse_deepwiki.
+    """
+    client = MCPClient(
+        server_url=server_url or config.DEEPWIKI_MCP_URL,
+        timeout=30,
+        read_timeout=60,
+        keepalive_interval=config.MCP_KEEPALIVE_INTERVAL,
+    )
+    await client.connect_sse()
+
+    repo_name = GitHubRepoProcessor.get_repo_info(url)['full_name']
+    project_name = project_name or os.path.basename(os.path.abspath(os.path.join(output_dir, os.pardir)))
+    cache = ParseCache(output_dir, parsed_dir, deepwiki_cache_salt({}, markdown_backend), use_cache, content_key=1)
+
+    archives, results = [], []
+    try:
+        async for i, text in iter_deepwiki_pages(client, repo_name):
+            file_path = os.path.join(output_dir, f"content_{i}.md")
+            archives.append(asyncio.create_task(asyncio.to_thread(_archive_page, file_path, text)))
+            # parsed as the archived file would read back (universal newlines), off the event
+            # loop so concurrent crawls keep their sessions alive
+            result = await asyncio.to_thread(
+                process_markdown_text, text.replace("\r\n", "\n").replace("\r", "\n"), file_path, {}, markdown_backend
+            )
+            cache.put(file_path, result, hashlib.sha256(text.encode("utf-8")).hexdigest())
+            results.append(result)
+    finally:
+        await asyncio.gather(*archives)
+        await client.disconnect()
+
+    def write_docs():
+        root_page = deepwiki_root_page(project_name, output_dir)
+        add_deepwiki_pages(root_page, results)
+        detailed_keys_tree, node_ids, structured_docs = build_docs(root_page)
+        write_parsed_docs(parsed_dir, detailed_keys_tree, node_ids, structured_docs, compact, chunk_store, shards)
+        cache.save(structured_docs, node_ids)
+        return root_page, detailed_keys_tree
+
+    return await asyncio.to_thread(write_docs)
+
+
+def download_deepwiki_docs(
+    url: str,
+    output_dir: str,
+    parsed_dir: Optional[str] = None,
+    server_url: Optional[str] = None,
+    **parse_options: Any,
+):
+    """
+    Synchronous wrapper used by scripts/CLI. With `parsed_dir`, pages are also parsed
+    while downloading (crawl_and_parse_deepwiki) and the parsed docs written there.
+    `server_url` overrides config.DEEPWIKI_MCP_URL (e.g. a local MCP stand-in).
+    """
     os.makedirs(output_dir, exist_ok=True)
-    asyncio.run(crawl_deepwiki_docs(url, output_dir))
+    if parsed_dir:
+        return asyncio.run(crawl_and_parse_deepwiki(url, output_dir, parsed_dir, server_url=server_url, **parse_options))
+    asyncio.run(crawl_deepwiki_docs(url, output_dir, server_url))
 
     
 
@@ -331,10 +487,12 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--url", type=str, required=True)
     parser.add_argument("--output-dir", type=str, required=True)
+    parser.add_argument("--parsed-dir", type=str, help="Also parse pages as they arrive and write the parsed docs here")
+    parser.add_argument("--mcp-url", type=str, help="MCP server SSE endpoint (default: config DEEPWIKI_MCP_URL)")
     
     args = parser.parse_args()
 
     url = args.url
     output_dir = args.output_dir
-    download_deepwiki_docs(url, output_dir)
+    download_deepwiki_docs(url, output_dir, args.parsed_dir, args.mcp_url)
     
@@ -0,0 +1,121 @@
+"""
+Page tree shared by the parsers, and the single walk that turns it into outputs.
+
+`DocPage` is a plain `__slots__` node (no validation, no copies). `build_docs`
+visits every page once and emits docs_tree.json, node_ids.json and
+structured_docs.json together.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# structured_docs page keys, in output order
+PAGE_FIELDS = ("title", "description", "content", "metadata", "subpages")
+# Written by the parsers next to docs_tree.json: node id ("n12") -> navigation path.
+NODE_IDS_FILENAME = "node_ids.json"
+
+
+class DocPage:
+    __slots__ = PAGE_FIELDS
+
+    def __init__(
+        self,
+        title: Optional[str] = None,
+        description: Optional[str] = None,
+        content: Optional[Dict[str, Any]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        subpages: Optional[List["DocPage"]] = None,
+    ):
+        self.title = title
+        self.description = description
+        self.content = {} if content is None else content
+        self.metadata = {} if metadata is None else metadata
+        self.subpages = [] if subpages is None else subpages
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The page as nested plain data (JSON-serialisable for the parse cache)."""
+        result = {field: getattr(self, field) for field in PAGE_FIELDS}
+        result["subpages"] = [subpage.to_dict() for subpage in self.subpages]
+        return result
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DocPage":
+        page = cls(**{field: data.get(field) for field in PAGE_FIELDS})
+        page.subpages = [cls.from_dict(subpage) for subpage in page.subpages]
+        return page
+
+
+def _keys_tree(obj: Any, path: List[Any], new_id) -> Any:
+    """Keys of page content down to string values, which show their node id instead."""
+    if isinstance(obj, list):
+        if not obj:
+            return []
+        if isinstance(obj[0], str):
+            return new_id(path)
+        return [_keys_tree(item, path + [i], new_id) for i, item in enumerate(obj)]
+    elif isinstance(obj, dict):
+        if not obj:
+            return {}
+        result = {}
+        for key, value in obj.items():
+            if key == "On this page":
+                continue
+            if isinstance(value, str):
+                result[key] = new_id(path + [key])
+            elif isinstance(value, (int, float, bool)):
+                result[key] = f"<{type(value).__name__}>"
+            elif value is None:
+                result[key] = None
+            else:
+                result[key] = _keys_tree(value, path + [key], new_id)
+        return result
+    elif isinstance(obj, str):
+        return new_id(path)
+    elif obj is None:
+        return None
+    else:
+        return f"<{type(obj).__name__}>"
+
+
+def build_docs(root: DocPage, page_paths: bool = False) -> Tuple[Dict[str, Any], Dict[str, List[Any]], Dict[str, Any]]:
+    """
+    (docs_tree, node_ids, structured_docs) for a page tree in one walk. Pages get a
+    short "id" in docs_tree and node_ids maps each id to its navigation path. With
+    `page_paths`, every non-root page in structured_docs records its path as JSON.
+
+    Ids are numbered in walk order, so they are only stable within one parse:
+    adding or moving a page renumbers every later node. Do not keep ids across
+    parses; content hashes (chunk_index.json) are the stable handle.
+    """
+    node_ids: Dict[str, List[Any]] = {}
+
+    def new_id(node_path: List[Any]) -> str:
+        node_id = f"n{len(node_ids)}"
+        node_ids[node_id] = list(node_path)
+        return node_id
+
+    def visit(page: DocPage, path: List[Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        tree: Dict[str, Any] = {}
+        if page.title:
+            tree["title"] = page.title
+        if page.description:
+            tree["description"] = page.description
+        tree["id"] = new_id(path)
+        if page.content:
+            tree["content"] = _keys_tree(page.content, path + ["content"], new_id)
+
+        docs = {field: getattr(page, field) for field in PAGE_FIELDS}
+        if page_paths and path:
+            docs["path"] = json.dumps(path)
+        subtrees, subdocs = [], []
+        for i, subpage in enumerate(page.subpages):
+            subtree, subdoc = visit(subpage, path + ["subpages", i])
+            subtrees.append(subtree)
+            subdocs.append(subdoc)
+        if subtrees:
+            tree["subpages"] = subtrees
+        docs["subpages"] = subdocs
+        return tree, docs
+
+    docs_tree, structured_docs = visit(root, [])
+    return docs_tree, node_ids, structured_docs
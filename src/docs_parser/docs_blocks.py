@@ -0,0 +1,120 @@
+"""
+Content deduplication for structured_docs.
+
+Paragraphs (text between blank lines) of at least `min_chars` that occur more
+than once are stored once in content_blocks.json and replaced in the tree by a
+`{{block:bN}}` marker. Readers expand markers on output; within one response a
+block is printed once and later repeats become a short back-reference.
+"""
+
+import json
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, Optional, Set, Tuple
+
+from docs_parser.json_io import load_json
+
+BLOCKS_FILENAME = "content_blocks.json"
+BLOCK_RE = re.compile(r"\{\{block:(b\d+)\}\}")
+PARAGRAPH_SEP = "\n\n"
+
+
+def _strings(node: Any):
+    if isinstance(node, dict):
+        for value in node.values():
+            yield from _strings(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _strings(value)
+    elif isinstance(node, str):
+        yield node
+
+
+def dedup_blocks(structured_docs: Any, min_chars: int = 200) -> Tuple[Any, Dict[str, str]]:
+    """
+    (copy of `structured_docs` with repeated paragraphs replaced, block table id -> text).
+    The input is left as is: the parsers' page objects share its content dicts.
+    """
+    seen = Counter(
+        paragraph
+        for text in _strings(structured_docs)
+        for paragraph in text.split(PARAGRAPH_SEP)
+        if len(paragraph) >= min_chars
+    )
+    ids: Dict[str, str] = {}
+    for paragraph, count in seen.items():
+        if count > 1:
+            ids[paragraph] = f"b{len(ids)}"
+    if not ids:
+        return structured_docs, {}
+
+    def replace(text: str) -> str:
+        paragraphs = text.split(PARAGRAPH_SEP)
+        return PARAGRAPH_SEP.join("{{block:%s}}" % ids[p] if p in ids else p for p in paragraphs)
+
+    def walk(node: Any) -> Any:
+        # containers are copied; strings are shared unless they change
+        if isinstance(node, dict):
+            return {key: walk(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [walk(value) for value in node]
+        if isinstance(node, str):
+            return replace(node)
+        return node
+
+    return walk(structured_docs), {block_id: paragraph for paragraph, block_id in ids.items()}
+
+
+def load_blocks(docs_dir: str) -> Dict[str, str]:
+    """Block table next to structured_docs.json; empty when the docs were not deduplicated."""
+    try:
+        return load_json(os.path.join(docs_dir, BLOCKS_FILENAME))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def expand_tree(node: Any, blocks: Dict[str, str]) -> Any:
+    """Copy of a deduplicated subtree with every marker expanded (undoes dedup_blocks)."""
+    if isinstance(node, dict):
+        return {key: expand_tree(value, blocks) for key, value in node.items()}
+    if isinstance(node, list):
+        return [expand_tree(value, blocks) for value in node]
+    if isinstance(node, str):
+        return expand_blocks(node, blocks)
+    return node
+
+
+def expand_blocks(
+    text: str, blocks: Dict[str, str], printed: Optional[Set[str]] = None, shown_chars: Optional[int] = None
+) -> str:
+    """
+    Put block text back in place of markers. With `printed`, blocks already in the
+    set become a back-reference and newly printed ones are added to it; with
+    `shown_chars` (the caller keeps only that many leading characters of the
+    result), only blocks that end within them count as printed. The result does
+    not depend on `shown_chars`.
+    """
+    if not blocks or "{{block:" not in text:
+        return text
+
+    parts = []
+    length = pos = 0
+    expanded: Set[str] = set()
+    for match in BLOCK_RE.finditer(text):
+        parts.append(text[pos:match.start()])
+        length += match.start() - pos
+        pos = match.end()
+        block_id = match.group(1)
+        if printed is not None and (block_id in printed or block_id in expanded):
+            piece = f"[repeated block {block_id}, shown above]"
+        else:
+            piece = blocks.get(block_id, match.group(0))
+            if printed is not None and block_id in blocks:
+                expanded.add(block_id)
+                if shown_chars is None or length + len(piece) <= shown_chars:
+                    printed.add(block_id)
+        parts.append(piece)
+        length += len(piece)
+    parts.append(text[pos:])
+    return "".join(parts)
@@ -0,0 +1,103 @@
+"""
+Content hashes for structured_docs nodes and a content-addressed section store.
+
+Every node gets a merkle hash: a string hashes its text, a dict its keys and the
+hashes of its values, a list the hashes of its items. Positional page fields
+(POSITIONAL_KEYS, e.g. the "path" official docs pages carry) are left out, so
+the hash of a section or page does not depend on where it sits in the tree and
+caches keyed by it survive re-crawls that reorder or insert pages.
+
+chunk_index.json (next to node_ids.json) maps each node id to its hash. With a
+chunk store directory, content sections are also written to
+<store>/<hash[:2]>/<hash>.json once, shared by every docs version that has them.
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from docs_parser.json_io import load_json
+
+CHUNK_INDEX_FILENAME = "chunk_index.json"
+CHUNK_INDEX_VERSION = 2
+# Page fields that only record the page's position (doc_tree.build_docs page_paths).
+POSITIONAL_KEYS = {"path"}
+
+
+def _digest(tag: bytes, data: bytes) -> str:
+    return hashlib.sha256(tag + data).hexdigest()[:32]
+
+
+def chunk_hash(node: Any, hashes: Optional[Dict[tuple, str]] = None, path: tuple = ()) -> str:
+    """Merkle hash of `node`; with `hashes`, records the hash of every subtree by path."""
+    if isinstance(node, str):
+        digest = _digest(b"s", node.encode("utf-8"))
+    elif isinstance(node, dict):
+        # a page is the root or an item of a subpages list
+        is_page = not path or (len(path) > 1 and path[-2] == "subpages")
+        parts = [
+            f"{json.dumps(key)}:{chunk_hash(value, hashes, path + (key,))}"
+            for key, value in node.items()
+            if not (is_page and key in POSITIONAL_KEYS)
+        ]
+        digest = _digest(b"d", ",".join(parts).encode("utf-8"))
+    elif isinstance(node, list):
+        parts = [chunk_hash(value, hashes, path + (i,)) for i, value in enumerate(node)]
+        digest = _digest(b"l", ",".join(parts).encode("utf-8"))
+    else:
+        digest = _digest(b"v", json.dumps(node).encode("utf-8"))
+    if hashes is not None:
+        hashes[path] = digest
+    return digest
+
+
+def build_chunk_index(structured_docs: Any, node_ids: Dict[str, List[Any]]) -> Dict[str, str]:
+    """Node id -> content hash, for the node ids written by the parsers."""
+    hashes: Dict[tuple, str] = {}
+    chunk_hash(structured_docs, hashes)
+    return {node_id: hashes[tuple(path)] for node_id, path in node_ids.items() if tuple(path) in hashes}
+
+
+def load_chunk_index(docs_dir: str) -> Dict[str, str]:
+    """Node id -> hash from chunk_index.json; empty for docs parsed before it existed."""
+    try:
+        index = load_json(os.path.join(docs_dir, CHUNK_INDEX_FILENAME))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return index.get("nodes", {}) if index.get("version") == CHUNK_INDEX_VERSION else {}
+
+
+class ChunkStore:
+    """Directory of section values by content hash; a present file is never rewritten."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], f"{digest}.json")
+
+    def put(self, digest: str, value: Any) -> bool:
+        """Store `value` under `digest`; returns True if it was not stored yet."""
+        path = self.path(digest)
+        if os.path.exists(path):
+            return False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return True
+
+    def put_sections(self, structured_docs: Any, node_ids: Dict[str, List[Any]], index: Dict[str, str]) -> int:
+        """Store the content sections (string leaves under "content") of a parse; returns how many were new."""
+        added = 0
+        for node_id, path in node_ids.items():
+            if "content" not in path or node_id not in index:
+                continue
+            node = structured_docs
+            for key in path:
+                node = node[key]
+            if isinstance(node, (str, list)):
+                added += self.put(index[node_id], node)
+        return added
@@ -0,0 +1,194 @@
+"""
+Sharded page layout: one JSON file per page plus a manifest of the page tree.
+
+pages/manifest.json holds, per page, its shard file, its keys, the rendered
+token counts of the page subtree, of each of its fields and of its subpages
+list, and its subpages. The navigator walks the manifest and reads a shard only
+when a page's own fields are accessed, keeping a bounded number of shards in
+memory. Shards are written by the parsers only on request (--shards or the
+"pages" backend); otherwise the navigator builds them on first use.
+"""
+
+import json
+import os
+import shutil
+from collections import OrderedDict
+from contextlib import contextmanager
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, List, Optional
+
+from docs_parser.json_io import resolve_json_path
+from docs_parser.token_counts import compute_token_counts
+
+PAGES_DIRNAME = "pages"
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 2
+
+
+def write_page_shards(structured_docs: Dict[str, Any], output_dir: str, blocks: Optional[Dict[str, str]] = None) -> None:
+    """Write <output_dir>/pages/ for a structured_docs dict (replaces any previous shards)."""
+    counts = compute_token_counts(structured_docs, blocks)
+    pages_dir = os.path.join(output_dir, PAGES_DIRNAME)
+    tmp_dir = f"{pages_dir}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    written = [0]
+
+    def write(page: Dict[str, Any]) -> Dict[str, Any]:
+        file_name = f"p{written[0]}.json"
+        written[0] += 1
+        with open(os.path.join(tmp_dir, file_name), "w", encoding="utf-8") as f:
+            json.dump({k: v for k, v in page.items() if k != "subpages"}, f, ensure_ascii=False)
+        subpages = page.get("subpages")
+        return {
+            "file": file_name,
+            "keys": list(page.keys()),
+            "tokens": counts[id(page)],
+            "field_tokens": {key: counts.get(id(value), 1) for key, value in page.items() if key != "subpages"},
+            "subpages_tokens": counts.get(id(subpages), 2),
+            "subpages": [write(subpage) for subpage in subpages or []],
+        }
+
+    manifest = {"version": MANIFEST_VERSION, "root": write(structured_docs)}
+    with open(os.path.join(tmp_dir, MANIFEST_FILENAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    shutil.rmtree(pages_dir, ignore_errors=True)
+    os.replace(tmp_dir, pages_dir)
+
+
+def shards_are_current(pages_dir: str, structured_docs_path: str) -> bool:
+    manifest_path = os.path.join(pages_dir, MANIFEST_FILENAME)
+    structured_docs_path = resolve_json_path(structured_docs_path)
+    if not os.path.exists(manifest_path) or os.path.getmtime(manifest_path) < os.path.getmtime(structured_docs_path):
+        return False
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("version") == MANIFEST_VERSION
+    except (OSError, json.JSONDecodeError):
+        return False
+
+
+class PageShards:
+    """
+    Manifest plus a bounded LRU of loaded page shards. Page fields are sized from
+    the manifest; `counts` holds the nested nodes of loaded shards, and shards
+    loaded while `pinned()` are only evicted once the pin is released, so a
+    render never loses the counts of a page it is still walking.
+    """
+
+    def __init__(self, pages_dir: str, cache_size: int = 64, blocks: Optional[Dict[str, str]] = None):
+        self.pages_dir = pages_dir
+        self.cache_size = max(cache_size, 1)
+        self.blocks = blocks
+        with open(os.path.join(pages_dir, MANIFEST_FILENAME), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported page manifest in {pages_dir}")
+        # Token counts of nodes in loaded shards, keyed by id(node) like compute_token_counts.
+        self.counts: Dict[int, int] = {}
+        self._shards: "OrderedDict[str, tuple]" = OrderedDict()
+        self._pins = 0
+        self.manifest_root = manifest["root"]
+        self.root = ShardedPage(self, self.manifest_root)
+
+    def load(self, file_name: str) -> Dict[str, Any]:
+        entry = self._shards.get(file_name)
+        if entry is not None:
+            self._shards.move_to_end(file_name)
+            return entry[0]
+        with open(os.path.join(self.pages_dir, file_name), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        shard_counts = compute_token_counts(data, self.blocks)
+        self.counts.update(shard_counts)
+        self._shards[file_name] = (data, shard_counts)
+        self._evict()
+        return data
+
+    def _evict(self) -> None:
+        while self._pins == 0 and len(self._shards) > self.cache_size:
+            _, (_, evicted) = self._shards.popitem(last=False)
+            for node_id in evicted:
+                self.counts.pop(node_id, None)
+
+    @contextmanager
+    def pinned(self):
+        """Keep every shard loaded inside the block (and its counts) until it exits."""
+        self._pins += 1
+        try:
+            yield self
+        finally:
+            self._pins -= 1
+            self._evict()
+
+    def read_tree(self) -> Dict[str, Any]:
+        """
+        The whole structured_docs as plain dicts, read straight from the shard files
+        (bypassing the LRU), for one-off passes such as building the search index.
+        """
+
+        def read(entry: Dict[str, Any]) -> Dict[str, Any]:
+            with open(os.path.join(self.pages_dir, entry["file"]), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return {
+                key: [read(subpage) for subpage in entry["subpages"]] if key == "subpages" else data[key]
+                for key in entry["keys"]
+            }
+
+        return read(self.manifest_root)
+
+    def __len__(self) -> int:
+        return len(self._shards)
+
+
+class ShardedPage(Mapping):
+    """A page whose own fields are read from its shard on first access."""
+
+    __slots__ = ("_shards", "_entry", "tokens")
+
+    def __init__(self, shards: PageShards, entry: Dict[str, Any]):
+        self._shards = shards
+        self._entry = entry
+        self.tokens = entry["tokens"]
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "subpages" and "subpages" in self._entry["keys"]:
+            return ShardedPages(self._shards, self._entry)
+        if key not in self._entry["keys"]:
+            raise KeyError(key)
+        return self._shards.load(self._entry["file"])[key]
+
+    def __iter__(self):
+        return iter(self._entry["keys"])
+
+    def __len__(self) -> int:
+        return len(self._entry["keys"])
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._entry["keys"]
+
+    def child_tokens(self, key: str) -> int:
+        if key == "subpages":
+            return self._entry["subpages_tokens"]
+        return self._entry["field_tokens"][key]
+
+
+class ShardedPages(Sequence):
+    """The subpages list of a page, served from the manifest alone."""
+
+    __slots__ = ("_shards", "_entries", "tokens")
+
+    def __init__(self, shards: PageShards, entry: Dict[str, Any]):
+        self._shards = shards
+        self._entries: List[Dict[str, Any]] = entry["subpages"]
+        self.tokens = entry["subpages_tokens"]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return ShardedPage(self._shards, self._entries[index])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def child_tokens(self, index: int) -> int:
+        return self._entries[index]["tokens"]
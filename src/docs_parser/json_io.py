@@ -0,0 +1,136 @@
+"""
+JSON artifacts with optional compression, chosen by file suffix.
+
+Callers keep using the plain name ("structured_docs.json"). Readers open whichever
+of name, name.zst (zstandard, the `zstd` extra) or name.gz exists; writers add
+the suffix of config.JSON_COMPRESSION ("none", "gzip" or "zstd"), write compressed
+files with compact separators and remove the other variants of the same name.
+"""
+
+import glob
+import gzip
+import io
+import json
+import os
+from typing import IO, Any, List, Optional
+
+import config
+
+JSON_COMPRESSIONS = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+COMPRESSED_SUFFIXES = (".zst", ".gz")
+ZSTD_LEVEL = 10
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("Reading or writing .json.zst files needs zstandard: pip install '.[zstd]'") from e
+    return zstandard
+
+
+def plain_json_path(path: str) -> str:
+    """`path` without a compression suffix."""
+    for suffix in COMPRESSED_SUFFIXES:
+        if path.endswith(".json" + suffix):
+            return path[: -len(suffix)]
+    return path
+
+
+def json_variants(path: str) -> List[str]:
+    plain = plain_json_path(path)
+    return [plain] + [plain + suffix for suffix in COMPRESSED_SUFFIXES]
+
+
+def resolve_json_path(path: str) -> str:
+    """The existing variant of `path` (plain first), or `path` itself when none exists."""
+    for variant in json_variants(path):
+        if os.path.exists(variant):
+            return variant
+    return path
+
+
+def json_exists(path: str) -> bool:
+    return any(os.path.exists(variant) for variant in json_variants(path))
+
+
+def json_output_path(path: str, compression: Optional[str] = None) -> str:
+    """Where a writer puts `path` under `compression` (defaults to config.JSON_COMPRESSION)."""
+    compression = compression or config.JSON_COMPRESSION
+    if compression not in JSON_COMPRESSIONS:
+        raise ValueError(f"Unknown JSON compression '{compression}'. Expected one of: {', '.join(JSON_COMPRESSIONS)}")
+    return plain_json_path(path) + JSON_COMPRESSIONS[compression]
+
+
+def is_compressed(path: str) -> bool:
+    return path.endswith(COMPRESSED_SUFFIXES)
+
+
+def json_temp_path(path: str) -> str:
+    """Per-process temp file next to `path`, with the same compression suffix."""
+    plain = plain_json_path(path)
+    return f"{plain}.{os.getpid()}.tmp{path[len(plain):]}"
+
+
+def glob_json(directory: str, pattern: str = "*.json") -> List[str]:
+    """Plain names of the JSON files in `directory` matching `pattern`, in any variant."""
+    names = set()
+    for suffix in ("",) + COMPRESSED_SUFFIXES:
+        names.update(plain_json_path(path) for path in glob.glob(os.path.join(directory, pattern + suffix)))
+    return sorted(names)
+
+
+class _GzipWriter(gzip.GzipFile):
+    """Gzip output without the file name and mtime in the header (identical bytes for
+    identical content), closing the underlying file with the stream."""
+
+    def __init__(self, path: str):
+        self._raw = open(path, "wb")
+        super().__init__(filename="", mode="wb", fileobj=self._raw, mtime=0)
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            self._raw.close()
+
+
+def open_json(path: str, mode: str = "r") -> IO[str]:
+    """Text stream for `path` ("r" or "w"), (de)compressed according to its suffix."""
+    if path.endswith(".zst"):
+        zstandard = _zstandard()
+        if mode == "r":
+            return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, "rb")), encoding="utf-8")
+        writer = zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(open(path, "wb"))
+        return io.TextIOWrapper(writer, encoding="utf-8")
+    if path.endswith(".gz"):
+        if mode == "r":
+            return gzip.open(path, "rt", encoding="utf-8")
+        return io.TextIOWrapper(_GzipWriter(path), encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def load_json(path: str) -> Any:
+    """json.load of the existing variant of `path`; FileNotFoundError when there is none."""
+    with open_json(resolve_json_path(path)) as f:
+        return json.load(f)
+
+
+def remove_other_variants(path: str) -> None:
+    """Delete the variants of `path` other than itself, so readers cannot pick a stale one."""
+    for variant in json_variants(path):
+        if variant != path and os.path.exists(variant):
+            os.remove(variant)
+
+
+def dump_json(obj: Any, path: str, indent: Optional[int] = 2, compression: Optional[str] = None, **kwargs: Any) -> str:
+    """Write `obj` atomically to `path` (plus the compression suffix); returns the path written."""
+    path = json_output_path(path, compression)
+    if is_compressed(path):
+        indent, kwargs["separators"] = None, (",", ":")
+    tmp_path = json_temp_path(path)
+    with open_json(tmp_path, "w") as f:
+        json.dump(obj, f, indent=indent, **kwargs)
+    os.replace(tmp_path, path)
+    remove_other_variants(path)
+    return path
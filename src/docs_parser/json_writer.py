@@ -0,0 +1,99 @@
+"""
+Streaming JSON output for the parsers.
+
+`iter_json` yields the same text as `json.dumps(obj, indent=indent, ensure_ascii=False)`
+(`compact` drops the spaces after separators) one page at a time: containers under
+`subpages` (and the root) are walked, every other value is encoded on its own.
+`write_json_if_changed` streams into a temp file and only replaces the target
+when the bytes differ, so no full copy of the output text is held in memory
+(`obj` itself is already in memory; only the serialization is bounded). With
+config.JSON_COMPRESSION the file is compressed (and compact) per docs_parser.json_io.
+"""
+
+import filecmp
+import json
+import os
+from typing import Any, Callable, Iterator, Optional
+
+from docs_parser.json_io import is_compressed, json_output_path, json_temp_path, open_json, remove_other_variants
+
+STREAMED_KEYS = {"subpages"}
+
+
+def _separators(indent: Optional[int], compact: bool):
+    if compact:
+        return ",", ":"
+    return ("," if indent is not None else ", "), ": "
+
+
+def iter_json(
+    obj: Any,
+    indent: Optional[int] = 2,
+    compact: bool = False,
+    default: Optional[Callable[[Any], Any]] = None,
+    level: int = 0,
+    stream: bool = True,
+) -> Iterator[str]:
+    """JSON text of `obj` in chunks; `stream` marks containers that are walked, not encoded whole."""
+    item_sep, key_sep = _separators(indent, compact)
+    if not stream or not isinstance(obj, (dict, list)) or not obj:
+        text = json.dumps(obj, ensure_ascii=False, indent=indent, separators=(item_sep, key_sep), default=default)
+        if indent is not None and level:
+            text = text.replace("\n", "\n" + " " * (indent * level))
+        yield text
+        return
+
+    if indent is None:
+        open_pad = close_pad = ""
+    else:
+        inner = "\n" + " " * (indent * (level + 1))
+        item_sep, open_pad, close_pad = item_sep + inner, inner, "\n" + " " * (indent * level)
+
+    if isinstance(obj, dict):
+        yield "{" + open_pad
+        for i, (key, value) in enumerate(obj.items()):
+            if i:
+                yield item_sep
+            # json.dumps turns non-string keys into their JSON text (1, true, null)
+            name = key if isinstance(key, str) else json.dumps(key)
+            yield json.dumps(name, ensure_ascii=False) + key_sep
+            # page lists are streamed page by page
+            yield from iter_json(value, indent, compact, default, level + 1, stream=key in STREAMED_KEYS)
+        yield close_pad + "}"
+    else:
+        yield "[" + open_pad
+        for i, item in enumerate(obj):
+            if i:
+                yield item_sep
+            yield from iter_json(item, indent, compact, default, level + 1)
+        yield close_pad + "]"
+
+
+def write_json_if_changed(
+    path: str,
+    obj: Any,
+    indent: Optional[int] = 2,
+    compact: bool = False,
+    default: Optional[Callable[[Any], Any]] = None,
+    compression: Optional[str] = None,
+) -> bool:
+    """
+    Stream `obj` to `path` (plus the compression suffix) atomically, keeping the
+    existing file (and its mtime) when the content is identical; returns True if
+    the file was written.
+    """
+    path = json_output_path(path, compression)
+    if is_compressed(path):
+        indent, compact = None, True
+    tmp_path = json_temp_path(path)
+    with open_json(tmp_path, "w") as f:
+        for chunk in iter_json(obj, indent, compact, default):
+            f.write(chunk)
+    changed = not (os.path.exists(path) and filecmp.cmp(tmp_path, path, shallow=False))
+    if changed:
+        os.replace(tmp_path, path)
+    else:
+        os.remove(tmp_path)
+    # only after the replace, so some variant exists at all times for readers
+    remove_other_variants(path)
+    return changed
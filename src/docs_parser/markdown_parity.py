@@ -0,0 +1,58 @@
+"""
+Check the markdown_it section extractor against markdown_to_json and time both.
+Exits with 1 when a file differs or no markdown files are found.
+
+    cd src && python -m docs_parser.markdown_parity --docs-dir ../examples/OpenHands/deepwiki/docs
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Dict, List
+
+import config
+from docs_parser.markdown_sections import MARKDOWN_BACKENDS, markdown_to_dict
+
+
+def markdown_files(docs_dir: str) -> List[str]:
+    return sorted(
+        os.path.join(root, name)
+        for root, _, files in os.walk(docs_dir)
+        for name in files
+        if name.endswith((".md", ".mdx"))
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    # config.PROJECT_ROOT is src/; the examples are next to it
+    parser.add_argument(
+        "--docs-dir", default=os.path.join(str(config.PROJECT_ROOT.parent), "examples", "OpenHands", "deepwiki", "docs")
+    )
+    args = parser.parse_args()
+
+    texts = []
+    for path in markdown_files(args.docs_dir):
+        with open(path, "r", encoding="utf-8") as f:
+            texts.append((path, f.read()))
+
+    if not texts:
+        print(f"No markdown files found in {args.docs_dir}")
+        return 1
+
+    results: Dict[str, list] = {}
+    for backend in MARKDOWN_BACKENDS:
+        start = time.perf_counter()
+        results[backend] = [markdown_to_dict(text, backend) for _, text in texts]
+        print(f"  {backend:<16} {time.perf_counter() - start:.3f}s")
+
+    different = [path for (path, _), old, new in zip(texts, *results.values()) if old != new]
+    print(f"{len(texts) - len(different)}/{len(texts)} files identical in {args.docs_dir}")
+    for path in different:
+        print(f"  differs: {os.path.relpath(path, args.docs_dir)}")
+    return 1 if different else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
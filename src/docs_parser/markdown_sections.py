@@ -0,0 +1,247 @@
+"""
+Markdown -> nested heading dictionaries, built from the markdown-it token stream.
+
+`dictify` follows the rules of `markdown_to_json.dictify` (headings become keys,
+the blocks under a heading become a "\\n\\n"-joined string, a leading list becomes
+an array, text before the first heading is dropped, no heading -> {"root": [...]})
+without its vendored CommonMark parser or a JSON string round trip. Block text is
+taken from the source lines the way that parser keeps it (tabs expanded, leading
+spaces stripped, HTML blocks running to the next blank line).
+
+`markdown_to_dict` selects the backend: "markdown_to_json" (default) or "markdown_it".
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import markdown_to_json
+from markdown_it import MarkdownIt
+
+MARKDOWN_BACKENDS = ("markdown_to_json", "markdown_it")
+
+# Only block structure is needed, so inline parsing is switched off.
+_MD = MarkdownIt("commonmark").disable(["inline", "text_join"])
+_ATX_CLOSING = re.compile(r"(?:(\\#) *#*| *#+) *$")
+_HRULE = re.compile(r"^(?:(?:\* *){3,}|(?:_ *){3,}|(?:- *){3,}) *$")
+_BLOCK_TAG = (
+    "(?:article|header|aside|hgroup|iframe|blockquote|hr|body|li|map|button|object|canvas|ol|caption|output|col|p|"
+    "colgroup|pre|dd|progress|div|section|dl|table|td|dt|tbody|embed|textarea|fieldset|tfoot|figcaption|th|figure|"
+    "thead|footer|tr|form|ul|h1|h2|h3|h4|h5|h6|video|script|style)"
+)
+# Lines on which the old parser starts an HTML block, and lines that end a paragraph there
+_HTML_OPEN = re.compile(r"^ {0,3}<(?:" + _BLOCK_TAG + r"[\s/>]|/" + _BLOCK_TAG + r"[\s>]|[?!])", re.IGNORECASE)
+_INTERRUPT = re.compile(r"^ {0,3}(?:#{1,6}(?: |$)|`{3,}|~{3,}|>|(?:[*+-]|\d+[.)])(?: |$))")
+
+
+class _Block:
+    __slots__ = ("t", "level", "strings", "children", "code")
+
+    def __init__(self, t: str, strings: Optional[List[str]] = None, level: Optional[int] = None):
+        self.t = t
+        self.level = level
+        self.strings = strings or []
+        self.children: List["_Block"] = []
+        self.code: Optional[str] = None
+
+
+def _detab(line: str) -> str:
+    return line.expandtabs(4) if "\t" in line else line
+
+
+def _heading_text(line: str) -> str:
+    """ATX heading text as the old parser keeps it: closing #s removed, trailing spaces kept otherwise."""
+    text = re.sub(r"^ {0,3}#{1,6}(?: +|$)", "", _detab(line))
+    if re.search(r"\\#", text):
+        return _ATX_CLOSING.sub(r"\g<1>", text)
+    return _ATX_CLOSING.sub("", text)
+
+
+def _interrupts(line: str) -> bool:
+    """Whether `line` ends a paragraph the old parser opened at an HTML line."""
+    return bool(_INTERRUPT.match(line) or _HTML_OPEN.match(line) or _HRULE.match(line.strip()))
+
+
+def _build(lines: List[str]) -> Tuple[List[_Block], Optional[int]]:
+    """
+    Block tree for `lines` from markdown-it tokens; top-level text comes from the source
+    lines. Where a top-level HTML block spans other lines than the old parser's (which
+    runs it to the next blank line), returns early with the line to parse again from.
+    """
+    tokens = _MD.parse("\n".join(lines))
+    root = _Block("Document")
+    stack = [root]
+    covered = 0
+    pending: List[str] = []
+
+    def add(block: _Block) -> _Block:
+        stack[-1].children.append(block)
+        return block
+
+    def source(start: int, end: int) -> List[str]:
+        return [_detab(line) for line in lines[start:end]]
+
+    def uncovered(start: int) -> List[str]:
+        """
+        Lines markdown-it consumed without a token (link reference definitions) stay
+        paragraph text; returns the last chunk when it runs into `start`.
+        """
+        chunk: List[str] = []
+        for line in source(covered, start):
+            if line.strip():
+                chunk.append(line.lstrip(" "))
+            elif chunk:
+                add(_Block("Paragraph", chunk))
+                chunk = []
+        return chunk
+
+    for i, token in enumerate(tokens):
+        top = len(stack) == 1
+        if top and token.map:
+            pending = uncovered(token.map[0])
+            if pending and token.type != "paragraph_open":
+                add(_Block("Paragraph", pending))
+            covered = max(covered, token.map[1])
+
+        if token.type in ("blockquote_open", "bullet_list_open", "ordered_list_open", "list_item_open"):
+            t = {"blockquote_open": "BlockQuote", "list_item_open": "ListItem"}.get(token.type, "List")
+            stack.append(add(_Block(t)))
+        elif token.type in ("blockquote_close", "bullet_list_close", "ordered_list_close", "list_item_close"):
+            stack.pop()
+        elif token.type == "heading_open":
+            level = int(token.tag[1])
+            content = tokens[i + 1].content
+            if token.markup.startswith("#"):
+                text = _heading_text(lines[token.map[0]]) if top else content
+                add(_Block("ATXHeader", [text], level))
+            elif "\n" not in content:
+                text = _detab(lines[token.map[0]]).lstrip(" ") if top else content
+                add(_Block("SetextHeader", [text], level))
+            else:
+                # The old parser only makes one-line setext headings
+                underline = _detab(lines[token.map[1] - 1]).strip() if top else token.markup * 3
+                paragraph = source(token.map[0], token.map[1] - 1) if top else content.split("\n")
+                paragraph = [line.lstrip(" ") for line in paragraph]
+                if _HRULE.match(underline):
+                    add(_Block("Paragraph", paragraph))
+                    add(_Block("HorizontalRule"))
+                else:
+                    add(_Block("Paragraph", paragraph + [underline]))
+        elif token.type == "paragraph_open":
+            if top:
+                strings = pending + [line.lstrip(" ") for line in source(token.map[0], token.map[1])]
+            else:
+                strings = [_detab(line).lstrip(" ") for line in tokens[i + 1].content.split("\n")]
+                # markdown-it trims the paragraph; the old parser keeps trailing spaces
+                last = _detab(lines[token.map[1] - 1])
+                strings[-1] += last[len(last.rstrip()):]
+            add(_Block("Paragraph", strings))
+        elif token.type == "fence":
+            block = add(_Block("FencedCode"))
+            block.code = "\n".join(_detab(line) for line in token.content.split("\n"))
+        elif token.type == "code_block":
+            # The old parser keeps the blank lines after indented code in the block
+            end = token.map[1]
+            while end < len(lines) and not lines[end].strip():
+                end += 1
+            if top:
+                covered = end
+                strings = [line[4:] if line.startswith("    ") else line.lstrip(" ") for line in source(token.map[0], end)]
+            else:
+                strings = token.content.rstrip("\n").split("\n") + [""] * (end - token.map[1])
+            add(_Block("IndentedCode", strings))
+        elif token.type == "html_block":
+            if not top:
+                add(_Block("HtmlBlock", token.content.rstrip("\n").split("\n")))
+                continue
+            start = end = token.map[0]
+            if _HTML_OPEN.match(_detab(lines[start])):
+                while end < len(lines) and lines[end].strip():
+                    end += 1
+                add(_Block("HtmlBlock", source(start, end)))
+            else:
+                # Not an HTML block for the old parser: a paragraph up to a blank or block-starting line
+                end += 1
+                while end < len(lines) and lines[end].strip() and not _interrupts(lines[end]):
+                    end += 1
+                add(_Block("Paragraph", [line.lstrip(" ") for line in source(start, end)]))
+            if end != token.map[1]:
+                return root.children, end
+        elif token.type == "hr":
+            add(_Block("HorizontalRule"))
+
+    pending = uncovered(len(lines))
+    if pending:
+        add(_Block("Paragraph", pending))
+    return root.children, None
+
+
+def _render(block: _Block) -> Any:
+    if block.t == "FencedCode":
+        return "```\n" + block.code + "```"
+    if block.t == "List":
+        rendered: List[Any] = []
+        for item in block.children:
+            rendered += _render(item)
+        return rendered
+    if block.strings:
+        return "\n".join(block.strings)
+    return [_render(child) for child in block.children]
+
+
+def _value(blocks: Any) -> Any:
+    if isinstance(blocks, dict):
+        return _stringify(blocks)
+    if not blocks:
+        return ""
+    if blocks[0].t == "List":
+        return _render(blocks[0])
+    return "\n\n".join(str(_render(block)) for block in blocks)
+
+
+def _stringify(nested: Any) -> Dict[str, Any]:
+    if isinstance(nested, dict):
+        out: Dict[str, Any] = {}
+        for heading, blocks in nested.values():
+            out[_render(heading)] = _value(blocks)
+        return out
+    return {"root": [_render(block) for block in nested]}
+
+
+def _nest(blocks: List[_Block], level: int) -> Any:
+    if not any(block.t == "ATXHeader" and block.level == level for block in blocks):
+        return blocks
+    nested: Dict[int, Any] = {}
+    heading, children = None, []
+    for block in blocks:
+        if block.t == "ATXHeader" and block.level == level:
+            if heading is not None:
+                nested[id(heading)] = (heading, _nest(children, level + 1))
+            heading, children = block, []
+        else:
+            children.append(block)
+    nested[id(heading)] = (heading, _nest(children, level + 1))
+    return nested
+
+
+def dictify(markdown_str: str) -> Dict[str, Any]:
+    """Nested heading -> content dict, as markdown_to_json.dictify would return it."""
+    lines = re.split(r"\r\n|\n|\r", re.sub(r"\n$", "", markdown_str))
+    blocks: List[_Block] = []
+    start: Optional[int] = 0
+    while start is not None:
+        lines = lines[start:]
+        part, start = _build(lines)
+        blocks += part
+    if not blocks:
+        return {"root": []}
+    levels = [block.level for block in blocks if block.level is not None]
+    return _stringify(_nest(blocks, min(levels) if levels else 100000))
+
+
+def markdown_to_dict(markdown_str: str, backend: str = "markdown_to_json") -> Dict[str, Any]:
+    """Heading dict of `markdown_str` from one of MARKDOWN_BACKENDS."""
+    if backend not in MARKDOWN_BACKENDS:
+        raise ValueError(f"Unsupported markdown backend '{backend}'. Supported backends: {', '.join(MARKDOWN_BACKENDS)}.")
+    if backend == "markdown_it":
+        return dictify(markdown_str)
+    return markdown_to_json.dictify(markdown_str)
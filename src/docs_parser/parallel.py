@@ -0,0 +1,22 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Any, Callable, List, Sequence
+
+
+def resolve_workers(workers: int) -> int:
+    """`workers` < 1 means one per CPU core."""
+    return workers if workers >= 1 else (os.cpu_count() or 1)
+
+
+def map_files(func: Callable[..., Any], file_paths: Sequence[str], workers: int = 1, *args: Any) -> List[Any]:
+    """
+    `[func(path, *args) for path in file_paths]`, fanned out to a process pool when
+    `workers` > 1. Results keep the order of `file_paths`; `func` must be picklable.
+    """
+    workers = min(resolve_workers(workers), len(file_paths))
+    if workers <= 1:
+        return [func(path, *args) for path in file_paths]
+    chunksize = max(1, len(file_paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(func, file_paths, *(repeat(arg) for arg in args), chunksize=chunksize))
@@ -0,0 +1,254 @@
+"""
+Per-file parse cache and change-only output writes for incremental re-parses.
+
+parse_cache.json (next to the parsed output) maps each markdown file, relative
+to the input directory, to the sha256 of its bytes and its parsed result. A
+`salt` covers every other input of the parse (parser options, module tree,
+markdown_to_json version); a different salt discards the whole cache.
+
+The page content of a result, its bulk, is not copied into the cache when the
+page is in the written structured_docs.json: the entry keeps the page's node id
+and the content's chunk hash instead, and a hit reads the content back from the
+previous output (blocks expanded, hash checked).
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import config
+
+from docs_parser.json_writer import write_json_if_changed
+from docs_parser.parallel import map_files
+from docs_parser.docs_blocks import BLOCKS_FILENAME, dedup_blocks, expand_tree, load_blocks
+from docs_parser.doc_tree import NODE_IDS_FILENAME
+from docs_parser.docs_chunks import CHUNK_INDEX_FILENAME, CHUNK_INDEX_VERSION, ChunkStore, build_chunk_index, chunk_hash
+from docs_parser.docs_shards import PAGES_DIRNAME, shards_are_current, write_page_shards
+from docs_parser.json_io import load_json
+
+PARSE_CACHE_FILENAME = "parse_cache.json"
+PARSE_CACHE_VERSION = 2
+
+
+def write_parsed_docs(
+    output_dir: str,
+    docs_tree: Any,
+    node_ids: Dict[str, Any],
+    structured_docs: Dict[str, Any],
+    compact: bool = False,
+    chunk_store: Optional[str] = None,
+    shards: bool = False,
+) -> bool:
+    """
+    Stream the parser outputs to disk (without indentation when `compact`), leaving
+    unchanged files (and their mtimes) alone. Returns True if anything was rewritten.
+    Content sections are also added to the `chunk_store` directory when given.
+    The pages/ shards are written with `shards` or the "pages" docs backend;
+    otherwise DocsNavigator builds them the first time it opens that backend.
+    Only the serialized text is streamed: the chunk index, dedup and page shards
+    work on the whole in-memory `structured_docs`.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    # content hashes are taken before dedup, whose block ids depend on page order
+    chunk_index = build_chunk_index(structured_docs, node_ids)
+    if chunk_store:
+        ChunkStore(chunk_store).put_sections(structured_docs, node_ids, chunk_index)
+    # store repeated paragraphs (shared intros, diagrams, inlined SVGs) once
+    structured_docs, blocks = dedup_blocks(structured_docs)
+    indent = None if compact else 2
+
+    def write(file_name: str, obj: Any, indent: Optional[int] = indent) -> bool:
+        return write_json_if_changed(os.path.join(output_dir, file_name), obj, indent, compact)
+
+    changed = [
+        write("docs_tree.json", docs_tree),
+        # node id -> navigation path table for the docs_navigator tool
+        write(NODE_IDS_FILENAME, node_ids, indent=None),
+        write(CHUNK_INDEX_FILENAME, {"version": CHUNK_INDEX_VERSION, "nodes": chunk_index}, indent=None),
+        write(BLOCKS_FILENAME, blocks),
+        write("structured_docs.json", structured_docs),
+    ]
+    if not (shards or config.DOCS_BACKEND == "pages"):
+        return any(changed)
+    structured_docs_path = os.path.join(output_dir, "structured_docs.json")
+    if any(changed) or not shards_are_current(os.path.join(output_dir, PAGES_DIRNAME), structured_docs_path):
+        # one file per page + manifest, for navigators that load pages on demand
+        write_page_shards(structured_docs, output_dir, blocks)
+        return True
+    return False
+
+
+def _with_content(result: Any, content_key: Union[int, str], content: Any) -> Any:
+    """Copy of a parsed result (tuple, list or dict) with its page content replaced."""
+    result = list(result) if isinstance(result, (list, tuple)) else dict(result)
+    result[content_key] = content
+    return result
+
+
+def _content_hash(content: Any) -> str:
+    # hashed as a content subtree, so no key is taken for a positional page field
+    return chunk_hash(content, path=("content",))
+
+
+class ParseCache:
+    """
+    File path + content hash -> parsed fragment, loaded from and saved to `output_dir`.
+    `content_key` is where a result holds its page content (index or dict key).
+    """
+
+    def __init__(
+        self,
+        input_dir: str,
+        output_dir: str,
+        salt: str = "",
+        enabled: bool = True,
+        content_key: Union[int, str] = "content",
+    ):
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.content_key = content_key
+        self.path = os.path.join(output_dir, PARSE_CACHE_FILENAME)
+        self.salt = f"{PARSE_CACHE_VERSION}:{salt}"
+        self.enabled = enabled
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.used: Dict[str, Dict[str, Any]] = {}
+        self._digests: Dict[str, Optional[str]] = {}
+        # (structured_docs, blocks, node_ids) written by the previous parse, loaded on the first hit
+        self._output: Optional[Tuple[Any, Dict[str, str], Dict[str, List[Any]]]] = None
+        self.hits = 0
+        if enabled:
+            try:
+                cached = load_json(self.path)
+                if cached.get("salt") == self.salt:
+                    self.entries = cached.get("files", {})
+            except (FileNotFoundError, json.JSONDecodeError, AttributeError):
+                pass
+
+    def _key(self, file_path: str) -> str:
+        return os.path.relpath(file_path, self.input_dir)
+
+    def digest(self, file_path: str) -> Optional[str]:
+        if file_path not in self._digests:
+            try:
+                with open(file_path, "rb") as f:
+                    self._digests[file_path] = hashlib.sha256(f.read()).hexdigest()
+            except OSError:
+                self._digests[file_path] = None
+        return self._digests[file_path]
+
+    def _previous_content(self, node_id: str, content_hash: str) -> Optional[Any]:
+        """Content of page `node_id` in the existing output, if it still has `content_hash`."""
+        if self._output is None:
+            try:
+                self._output = (
+                    load_json(os.path.join(self.output_dir, "structured_docs.json")),
+                    load_blocks(self.output_dir),
+                    load_json(os.path.join(self.output_dir, NODE_IDS_FILENAME)),
+                )
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._output = ({}, {}, {})
+        node, blocks, node_ids = self._output
+        if node_id not in node_ids:
+            return None
+        try:
+            for key in node_ids[node_id]:
+                node = node[key]
+            content = expand_tree(node["content"], blocks)
+        except (KeyError, IndexError, TypeError):
+            return None
+        return content if _content_hash(content) == content_hash else None
+
+    def get(self, file_path: str) -> Tuple[bool, Any]:
+        """(True, result) when the file is unchanged since it was cached, else (False, None)."""
+        if not self.enabled:
+            return False, None
+        digest = self.digest(file_path)
+        entry = self.entries.get(self._key(file_path))
+        if digest is None or entry is None or entry["hash"] != digest:
+            return False, None
+        result = entry["result"]
+        if "node" in entry:
+            content = self._previous_content(entry["node"], entry["content_hash"])
+            if content is None:
+                return False, None
+            result = _with_content(result, self.content_key, content)
+        self.used[self._key(file_path)] = {"hash": digest, "result": result}
+        self.hits += 1
+        return True, result
+
+    def put(self, file_path: str, result: Any, digest: Optional[str] = None) -> None:
+        """Cache `result` for the file; pass `digest` (sha256 of its bytes) to skip reading it."""
+        if digest is not None:
+            self._digests[file_path] = digest
+        digest = self.digest(file_path) if self.enabled else None
+        if digest is not None:
+            self.used[self._key(file_path)] = {"hash": digest, "result": result}
+
+    def map(
+        self,
+        func: Callable[..., Any],
+        file_paths: Sequence[str],
+        workers: int = 1,
+        *args: Any,
+        cacheable: Optional[Callable[[str], bool]] = None,
+    ) -> List[Any]:
+        """
+        map_files over the files missing from the cache, in input order; call save()
+        once the outputs are written. Results must be JSON-serialisable; files
+        failing `cacheable` are always parsed.
+        """
+        results: List[Any] = [None] * len(file_paths)
+        use_cache = [cacheable is None or cacheable(file_path) for file_path in file_paths]
+        misses = []
+        for i, file_path in enumerate(file_paths):
+            hit, result = self.get(file_path) if use_cache[i] else (False, None)
+            if hit:
+                results[i] = result
+            else:
+                misses.append(i)
+        parsed = map_files(func, [file_paths[i] for i in misses], workers, *args)
+        for i, result in zip(misses, parsed):
+            results[i] = result
+            if use_cache[i]:
+                self.put(file_paths[i], result)
+        return results
+
+    def save(self, structured_docs: Any = None, node_ids: Optional[Dict[str, List[Any]]] = None) -> None:
+        """
+        Keep only files seen in this run, so deleted files drop out of the cache. Pass
+        the structured_docs (before dedup) and node ids just written to store results
+        whose page is in them by reference; others are stored whole.
+        """
+        if not self.enabled:
+            return
+        pages: Dict[int, str] = {}
+        if structured_docs is not None and node_ids:
+            ids_by_path = {tuple(path): node_id for node_id, path in node_ids.items()}
+
+            def walk(page: Dict[str, Any], path: Tuple[Any, ...]) -> None:
+                content = page.get("content")
+                if content and isinstance(content, (dict, list)) and path in ids_by_path:
+                    # the parsers put each result's content object into its page as is
+                    pages[id(content)] = ids_by_path[path]
+                for i, subpage in enumerate(page.get("subpages") or []):
+                    walk(subpage, path + ("subpages", i))
+
+            walk(structured_docs, ())
+
+        files = {}
+        for key, entry in self.used.items():
+            result = entry["result"]
+            content = result[self.content_key] if result is not None else None
+            node_id = pages.get(id(content)) if content is not None else None
+            if node_id is None:
+                files[key] = entry
+                continue
+            files[key] = {
+                "hash": entry["hash"],
+                "node": node_id,
+                "content_hash": _content_hash(content),
+                "result": _with_content(result, self.content_key, None),
+            }
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        write_json_if_changed(self.path, {"salt": self.salt, "files": files}, indent=None, default=str)
@@ -4,98 +4,24 @@ import os
 from typing import Any, Dict, List, Optional, Tuple
 
 import markdown_to_json
-from pydantic import BaseModel
 
-SUPPORTED_ADAPTERS = {"deepwiki", "codewiki"}
-
-class DocPage(BaseModel):
-    title: Optional[str] = None
-    description: Optional[str] = None
-    content: Dict[str, Any] = {}
-    metadata: Dict[str, Any] = {}
-    subpages: List['DocPage'] = []
-
-def convert_to_dict(obj):
-    """Convert Pydantic models to dictionaries for JSON serialization"""
-    if isinstance(obj, DocPage):
-        return obj.model_dump()
-    elif isinstance(obj, list):
-        return [convert_to_dict(item) for item in obj]
-    elif isinstance(obj, dict):
-        return {key: convert_to_dict(value) for key, value in obj.items()}
-    else:
-        return obj
+from docs_parser.doc_tree import DocPage, build_docs
+from docs_parser.markdown_sections import MARKDOWN_BACKENDS, markdown_to_dict
+from docs_parser.parse_cache import ParseCache, write_parsed_docs
+from docs_parser.json_io import json_exists, load_json
 
-def generate_detailed_keys_tree(obj, path=None):
-    """
-    Generate a detailed tree structure showing only keys until reaching string values.
-    Traverses the complete structure and returns only the key hierarchy.
-    Includes path information for DocPage objects.
-    """
-    if path is None:
-        path = []
-    
-    if isinstance(obj, DocPage):
-        result = {}
-        if obj.title:
-            result["title"] = obj.title
-        if obj.description:
-            result["description"] = obj.description
-        # Add path information
-        if path:
-            result["path"] = json.dumps(path.copy())
-        if obj.content:
-            result["content"] = generate_detailed_keys_tree(obj.content, path)
-        # if obj.metadata:
-        #     result["metadata"] = generate_detailed_keys_tree(obj.metadata, path)
-        if obj.subpages:
-            result["subpages"] = generate_detailed_keys_tree(obj.subpages, path + ["subpages"])
-        return result
-    elif isinstance(obj, list):
-        if not obj:
-            return []
-        # Show structure of first item and indicate it's a list
-        result = []
-        if isinstance(obj[0], str):
-            return "<detail_content>"#json.dumps(obj, indent=2)
-        for i, item in enumerate(obj):
-            result.append(generate_detailed_keys_tree(item, path + [i]))
-        return result
-    elif isinstance(obj, dict):
-        if not obj:
-            return {}
-        result = {}
-        for key, value in obj.items():
-            if key == "On this page":
-                continue
-            if isinstance(value, str):
-                # Stop at string values, just indicate it's a string
-                result[key] = "<detail_content>"
-            elif isinstance(value, (int, float, bool)):
-                # Stop at primitive values
-                result[key] = f"<{type(value).__name__}>"
-            elif value is None:
-                result[key] = None
-            else:
-                # Continue traversing for complex objects
-                result[key] = generate_detailed_keys_tree(value, path)
-        return result
-    elif isinstance(obj, str):
-        return "<detail_content>"
-    elif isinstance(obj, (int, float, bool)):
-        return f"<{type(obj).__name__}>"
-    elif obj is None:
-        return None
-    else:
-        return f"<{type(obj).__name__}>"
+SUPPORTED_ADAPTERS = {"deepwiki", "codewiki"}
 
-def process_markdown_file(file_path: str, title_index: Dict[str, List[int]]) -> tuple[str, Dict[str, Any], list]:
+def process_markdown_file(
+    file_path: str, title_index: Dict[str, List[int]], markdown_backend: str = "markdown_to_json"
+) -> tuple[str, Dict[str, Any], list]:
     """
     Process a single markdown file and extract title, content, and index information.
     
     Args:
         file_path (str): Path to the markdown file
         title_index (Dict[str, List[int]]): Title index
+        markdown_backend (str): Markdown -> dict backend, one of MARKDOWN_BACKENDS
     
     Returns:
         tuple: (title, content, sub_indexes) or None if file doesn't match expected format
@@ -106,7 +32,13 @@ def process_markdown_file(file_path: str, title_index: Dict[str, List[int]]) ->
     except (UnicodeDecodeError, FileNotFoundError) as e:
         print(f"Warning: Could not read {file_path}: {e}")
         return None
-    
+    return process_markdown_text(content, file_path, title_index, markdown_backend)
+
+
+def process_markdown_text(
+    content: str, file_path: str, title_index: Dict[str, List[int]], markdown_backend: str = "markdown_to_json"
+) -> tuple[str, Dict[str, Any], list]:
+    """process_markdown_file for markdown already in memory; `file_path` names the page (and its module)."""
     if not title_index:
         first_line = content.split("\n")[0]
         title = first_line.split("/")[-1].strip()
@@ -133,7 +65,7 @@ def process_markdown_file(file_path: str, title_index: Dict[str, List[int]]) ->
             return None
 
     try:
-        content = json.loads((markdown_to_json.jsonify(content)))
+        content = markdown_to_dict(content, markdown_backend)
     except (json.JSONDecodeError, Exception) as e:
         print(f"Warning: Could not parse markdown content in {file_path}: {e}")
         return None
@@ -155,44 +87,14 @@ def process_markdown_file(file_path: str, title_index: Dict[str, List[int]]) ->
     return title, content, sub_indexs
 
 
-def parse_deepwiki(path: str, project_name: Optional[str] = None, output_dir: Optional[str] = None) -> Tuple[DocPage, Dict[str, Any]]:
-    """
-    Recursively parse deepwiki documentation from markdown files and generate structured output.
-    
-    Args:
-        path (str): Path to the directory containing markdown files (supports nested directories)
-        project_name (str): Name of the project
-        output_dir (str, optional): Directory to save output files. If None, saves to the input path.
-    
-    Returns:
-        tuple: (structured_docs, detailed_keys_tree)
-    """
-    project_name = project_name or os.path.basename(os.path.abspath(os.path.join(path, os.pardir)))
-    if output_dir is None:
-        output_dir = path
+def deepwiki_cache_salt(title_index: Dict[str, List[int]], markdown_backend: str) -> str:
+    """Parse cache salt: everything besides the file itself that changes a processed page."""
+    return json.dumps([title_index, markdown_to_json.__version__, markdown_backend])
 
-    module_tree_path = os.path.join(path, "module_tree.json")
-    if os.path.exists(module_tree_path):
-        with open(module_tree_path, "r", encoding='utf-8') as f:
-            module_tree = json.load(f)
-        module_tree = {**{"overview": {}}, **module_tree}
-    else:
-        module_tree = {}
 
-    # build {index: title} dict from module_tree
-    title_index = {}
-    def build_index_title(module_info: Dict[str, Any], indexes: List[int]):
-        i = 1
-        for module_name, sub_module_info in module_info.items():
-            sub_indexes = indexes + [i]
-            title_index[module_name] = sub_indexes
-            i += 1
-
-            if "children" in sub_module_info and sub_module_info["children"]:
-                build_index_title(sub_module_info["children"], sub_indexes)
-    
-    # Create root documentation structure
-    root_page = DocPage(
+def deepwiki_root_page(project_name: str, path: str) -> DocPage:
+    """Root page of a DeepWiki/CodeWiki docs tree read from `path`."""
+    return DocPage(
         title=project_name,
         description=f"Documentation for {project_name}",
         content={},
@@ -201,37 +103,11 @@ def parse_deepwiki(path: str, project_name: Optional[str] = None, output_dir: Op
     )
 
 
+def add_deepwiki_pages(root_page: DocPage, results: List[Optional[tuple]]) -> None:
+    """Nest processed pages ((title, content, sub_indexes) or None) under `root_page` by their indexes."""
     temp_structure = {}
 
-    try:
-        dir_items = os.listdir(path)
-    except (PermissionError, FileNotFoundError) as e:
-        print(f"Warning: Could not access directory {path}: {e}")
-        return
-    
-    # Separate files and directories
-    files = []
-    
-    for item in dir_items:
-        item_path = os.path.join(path, item)
-        if os.path.isfile(item_path) and item.endswith(".md"):
-            files.append(item_path)
-
-    if module_tree:
-        for file_path in files:
-            title = file_path.split("/")[-1].replace(".md", "")
-            if title not in title_index:
-                module_tree[title] = {}
-                
-        build_index_title(module_tree, [])
-        
-
-
-    
-    # Process markdown files
-    for file_path in files:
-        
-        result = process_markdown_file(file_path, title_index)
+    for result in results:
         if result is None:
             continue
             
@@ -299,24 +175,112 @@ def parse_deepwiki(path: str, project_name: Optional[str] = None, output_dir: Op
         section_page = convert_temp_to_docpage(section_data)
         root_page.subpages.append(section_page)
 
-    # Generate detailed keys tree
-    detailed_keys_tree = generate_detailed_keys_tree(root_page)
 
-    # Save outputs
-    os.makedirs(output_dir, exist_ok=True)
+def parse_deepwiki(
+    path: str,
+    project_name: Optional[str] = None,
+    output_dir: Optional[str] = None,
+    workers: int = 1,
+    use_cache: bool = True,
+    compact: bool = False,
+    markdown_backend: str = "markdown_to_json",
+    chunk_store: Optional[str] = None,
+    shards: bool = False,
+) -> Tuple[DocPage, Dict[str, Any]]:
+    """
+    Recursively parse deepwiki documentation from markdown files and generate structured output.
+    
+    Args:
+        path (str): Path to the directory containing markdown files (supports nested directories)
+        project_name (str): Name of the project
+        output_dir (str, optional): Directory to save output files. If None, saves to the input path.
+        workers (int): Processes used to parse markdown files (< 1: one per CPU core)
+        use_cache (bool): Reuse results for unchanged files from parse_cache.json in output_dir
+        compact (bool): Write JSON outputs without indentation
+        markdown_backend (str): "markdown_to_json" or the faster "markdown_it" section extractor
+        chunk_store (str, optional): Content-addressed directory that also receives every parsed section
+        shards (bool): Also write the pages/ shards (always written with the "pages" docs backend)
+    
+    Returns:
+        tuple: (structured_docs, detailed_keys_tree)
+    """
+    project_name = project_name or os.path.basename(os.path.abspath(os.path.join(path, os.pardir)))
+    if output_dir is None:
+        output_dir = path
+
+    module_tree_path = os.path.join(path, "module_tree.json")
+    if json_exists(module_tree_path):
+        module_tree = load_json(module_tree_path)
+        module_tree = {**{"overview": {}}, **module_tree}
+    else:
+        module_tree = {}
 
-    # save detailed_keys_tree to a json file
-    with open(os.path.join(output_dir, "docs_tree.json"), "w", encoding='utf-8') as f:
-        json.dump(detailed_keys_tree, f, indent=2, ensure_ascii=False)
+    # build {index: title} dict from module_tree
+    title_index = {}
+    def build_index_title(module_info: Dict[str, Any], indexes: List[int]):
+        i = 1
+        for module_name, sub_module_info in module_info.items():
+            sub_indexes = indexes + [i]
+            title_index[module_name] = sub_indexes
+            i += 1
 
-    # save structured_docs to a json file
-    with open(os.path.join(output_dir, "structured_docs.json"), "w", encoding='utf-8') as f:
-        json.dump(convert_to_dict(root_page), f, indent=2, ensure_ascii=False)
+            if "children" in sub_module_info and sub_module_info["children"]:
+                build_index_title(sub_module_info["children"], sub_indexes)
+    
+    try:
+        dir_items = os.listdir(path)
+    except (PermissionError, FileNotFoundError) as e:
+        print(f"Warning: Could not access directory {path}: {e}")
+        return
+    
+    # Separate files and directories
+    files = []
+    
+    for item in dir_items:
+        item_path = os.path.join(path, item)
+        if os.path.isfile(item_path) and item.endswith(".md"):
+            files.append(item_path)
+
+    if module_tree:
+        for file_path in files:
+            title = file_path.split("/")[-1].replace(".md", "")
+            if title not in title_index:
+                module_tree[title] = {}
+                
+        build_index_title(module_tree, [])
+        
+
+
+    
+    # Process markdown files (new or changed ones only, in parallel, assembled in listing order)
+    cache = ParseCache(path, output_dir, deepwiki_cache_salt(title_index, markdown_backend), use_cache, content_key=1)
+    results = cache.map(process_markdown_file, files, workers, title_index, markdown_backend)
+
+    root_page = deepwiki_root_page(project_name, path)
+    add_deepwiki_pages(root_page, results)
+
+    # Generate detailed keys tree, node ids and structured docs in one pass
+    detailed_keys_tree, node_ids, structured_docs = build_docs(root_page)
+
+    # Save outputs (files whose content did not change are left untouched)
+    write_parsed_docs(output_dir, detailed_keys_tree, node_ids, structured_docs, compact, chunk_store, shards)
+    cache.save(structured_docs, node_ids)
     
     return root_page, detailed_keys_tree
 
 
-def parse_docs(adapter: str, repo_name: str, input_dir: str, output_dir: Optional[str] = None):
+def parse_docs(
+    adapter: str,
+    repo_name: str,
+    input_dir: str,
+    output_dir: Optional[str] = None,
+    workers: int = 1,
+    use_cache: bool = True,
+    compact: bool = False,
+    markdown_backend: str = "markdown_to_json",
+    chunk_store: Optional[str] = None,
+    shards: bool = False,
+):
     """
     Dispatch parsing based on adapter name.
     Currently deepwiki/codewiki share the same parser.
@@ -325,7 +289,9 @@ def parse_docs(adapter: str, repo_name: str, input_dir: str, output_dir: Optiona
     if adapter_lower not in SUPPORTED_ADAPTERS:
         raise ValueError(f"Unsupported adapter '{adapter}'. Supported adapters: {', '.join(sorted(SUPPORTED_ADAPTERS))}.")
 
-    return parse_deepwiki(input_dir, repo_name, output_dir)
+    return parse_deepwiki(
+        input_dir, repo_name, output_dir, workers, use_cache, compact, markdown_backend, chunk_store, shards
+    )
 
 
 def _infer_repo_name_from_input(input_dir: str) -> str:
@@ -345,13 +311,32 @@ def main():
     parser.add_argument("--output-dir", type=str, help="Where parsed docs_tree.json/structured_docs.json should go")
     parser.add_argument("--adapter", type=str, default="deepwiki", help="Adapter name (default: deepwiki)")
     parser.add_argument("--repo-name", type=str, help="Repository name (auto-inferred when omitted)")
+    parser.add_argument("--workers", type=int, default=1, help="Processes for markdown parsing (0: one per CPU core)")
+    parser.add_argument("--no-cache", action="store_true", help="Re-parse every file, ignoring parse_cache.json")
+    parser.add_argument("--compact", action="store_true", help="Write JSON outputs without indentation")
+    parser.add_argument(
+        "--markdown-backend", choices=MARKDOWN_BACKENDS, default="markdown_to_json", help="Markdown section extractor"
+    )
+    parser.add_argument("--chunk-store", type=str, help="Directory of sections by content hash, shared across parses")
+    parser.add_argument("--shards", action="store_true", help="Also write per-page shards (pages/)")
     args = parser.parse_args()
 
     input_dir = args.input_dir
     output_dir = args.output_dir
     repo_name = args.repo_name or _infer_repo_name_from_input(input_dir)
 
-    parse_docs(args.adapter, repo_name, input_dir, output_dir)
+    parse_docs(
+        args.adapter,
+        repo_name,
+        input_dir,
+        output_dir,
+        args.workers,
+        not args.no_cache,
+        args.compact,
+        args.markdown_backend,
+        args.chunk_store,
+        args.shards,
+    )
 
 
 if __name__ == "__main__":
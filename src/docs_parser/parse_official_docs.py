@@ -3,124 +3,107 @@ import json
 import yaml
 import markdown_to_json
 from typing import Any, List, Dict, Optional
-from pydantic import BaseModel
 import re
 
-class DocPage(BaseModel):
-    title: Optional[str] = None
-    description: Optional[str] = None
-    content: Dict[str, Any] = {}
-    metadata: Dict[str, Any] = {}
-    subpages: List['DocPage'] = []
+from docs_parser.doc_tree import DocPage, build_docs
+from docs_parser.markdown_sections import MARKDOWN_BACKENDS, markdown_to_dict
+from docs_parser.parse_cache import ParseCache, write_parsed_docs
+
+# Markdown image syntax with SVG files
+SVG_PATTERN = r'!\[([^\]]*)\]\(([^)]*\.svg)\)'
+
+SVG_MODES = ("inline", "placeholder")
+
+
+# Directories under the SVG roots that are never indexed (dependencies, build output)
+SKIPPED_ASSET_DIRS = {'node_modules', 'build', 'dist', 'vendor', '__pycache__'}
 
-def convert_to_dict(obj, path=None):
-    """Convert Pydantic models to dictionaries for JSON serialization"""
-    if path is None:
-        path = []
-    
-    if isinstance(obj, DocPage):
-        result = obj.model_dump()
-        # Add path information
-        if path:
-            result["path"] = json.dumps(path.copy())
-        # Update subpages with path information
-        if result.get("subpages"):
-            result["subpages"] = [convert_to_dict(subpage, path + ["subpages", i]) 
-                                for i, subpage in enumerate(obj.subpages)]
-        return result
-    elif isinstance(obj, list):
-        return [convert_to_dict(item, path + [i]) for i, item in enumerate(obj)]
-    elif isinstance(obj, dict):
-        return {key: convert_to_dict(value, path + [key]) for key, value in obj.items()}
-    else:
-        return obj
 
-def generate_detailed_keys_tree(obj, path=None):
+class SvgAssets:
     """
-    Generate a detailed tree structure showing only keys until reaching string values.
-    Traverses the complete structure and returns only the key hierarchy.
-    Includes path information for DocPage objects.
+    Local SVG files for one parse of a docs root. The roots the candidate paths can
+    point into (docs_root, which holds docs_root/static, and parent/static) are
+    indexed once with os.scandir (path -> size), skipping hidden and
+    SKIPPED_ASSET_DIRS directories. Within one process every SVG is read at most
+    once per parse. Pickling (for parse workers) builds the index first and drops
+    the contents, so each chunk of files sent to a worker reads its SVGs again.
     """
-    if path is None:
-        path = []
-    
-    if isinstance(obj, DocPage):
-        result = {}
-        if obj.title:
-            result["title"] = obj.title
-        if obj.description:
-            result["description"] = obj.description
-        # Add path information
-        if path:
-            result["path"] = json.dumps(path.copy())
-        if obj.content:
-            result["content"] = generate_detailed_keys_tree(obj.content, path)
-        # if obj.metadata:
-        #     result["metadata"] = generate_detailed_keys_tree(obj.metadata, path)
-        if obj.subpages:
-            result["subpages"] = generate_detailed_keys_tree(obj.subpages, path + ["subpages"])
-        return result
-    elif isinstance(obj, list):
-        if not obj:
-            return []
-        # Show structure of first item and indicate it's a list
-        result = []
-        if isinstance(obj[0], str):
-            return "<detail_content>"#json.dumps(obj, indent=2)
-        for i, item in enumerate(obj):
-            result.append(generate_detailed_keys_tree(item, path + [i]))
-        return result
-    elif isinstance(obj, dict):
-        if not obj:
-            return {}
-        result = {}
-        for key, value in obj.items():
-            if key == "On this page":
+
+    def __init__(self, docs_root: str):
+        self.docs_root = docs_root
+        parent = os.path.dirname(docs_root)
+        self.roots = [os.path.normpath(docs_root)]
+        static_root = os.path.normpath(os.path.join(parent, 'static'))
+        if not self._under(static_root):
+            self.roots.append(static_root)
+        self._sizes: Optional[Dict[str, int]] = None
+        self._contents: Dict[str, Optional[str]] = {}
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {**self.__dict__, '_sizes': self._index(), '_contents': {}}
+
+    def _under(self, path: str) -> bool:
+        """True if `path` lies in an indexed part of the roots."""
+        for root in self.roots:
+            rel = os.path.relpath(path, root)
+            if rel == '.' or rel == os.pardir or rel.startswith(os.pardir + os.sep):
                 continue
-            if isinstance(value, str):
-                # Stop at string values, just indicate it's a string
-                result[key] = "<detail_content>"
-            elif isinstance(value, (int, float, bool)):
-                # Stop at primitive values
-                result[key] = f"<{type(value).__name__}>"
-            elif value is None:
-                result[key] = None
-            else:
-                # Continue traversing for complex objects
-                result[key] = generate_detailed_keys_tree(value, path)
-        return result
-    elif isinstance(obj, str):
-        return "<detail_content>"
-    elif isinstance(obj, (int, float, bool)):
-        return f"<{type(obj).__name__}>"
-    elif obj is None:
+            return not any(part.startswith('.') or part in SKIPPED_ASSET_DIRS for part in rel.split(os.sep)[:-1])
+        return False
+
+    def _index(self) -> Dict[str, int]:
+        if self._sizes is None:
+            self._sizes = {}
+            stack = list(self.roots)
+            while stack:
+                try:
+                    with os.scandir(stack.pop()) as entries:
+                        for entry in entries:
+                            if entry.is_dir(follow_symlinks=False):
+                                if not entry.name.startswith('.') and entry.name not in SKIPPED_ASSET_DIRS:
+                                    stack.append(entry.path)
+                            elif entry.name.endswith('.svg') and entry.is_file():
+                                self._sizes[os.path.normpath(entry.path)] = entry.stat().st_size
+                except OSError:
+                    continue
+        return self._sizes
+
+    def _is_file(self, path: str) -> bool:
+        path = os.path.normpath(path)
+        if path in self._index():
+            return True
+        # Only paths outside the indexed roots (e.g. parent/img, "../") still need a stat
+        return not self._under(path) and os.path.isfile(path) and path.endswith('.svg')
+
+    def find(self, svg_path: str) -> Optional[str]:
+        # Remove leading slash if present
+        if svg_path.startswith('/'):
+            svg_path = svg_path[1:]
+        docs_root = self.docs_root
+        
+        # Possible locations to search for the SVG file
+        possible_paths = [
+            os.path.join(docs_root, svg_path),
+            os.path.join(docs_root, 'static', svg_path.replace('static/', '')),
+            os.path.join(docs_root, svg_path.replace('static/', '')),
+            os.path.join(os.path.dirname(docs_root), svg_path),
+            os.path.join(os.path.dirname(docs_root), 'static', svg_path.replace('static/', '')),
+        ]
+        for path in possible_paths:
+            if self._is_file(path):
+                return path
         return None
-    else:
-        return f"<{type(obj).__name__}>"
 
-def find_svg_file(svg_path: str, docs_root: str) -> Optional[str]:
-    """
-    Find the actual SVG file path given a reference path.
-    Handles both absolute and relative paths within the docs directory.
-    """
-    # Remove leading slash if present
-    if svg_path.startswith('/'):
-        svg_path = svg_path[1:]
-    
-    # Possible locations to search for the SVG file
-    possible_paths = [
-        os.path.join(docs_root, svg_path),
-        os.path.join(docs_root, 'static', svg_path.replace('static/', '')),
-        os.path.join(docs_root, svg_path.replace('static/', '')),
-        os.path.join(os.path.dirname(docs_root), svg_path),
-        os.path.join(os.path.dirname(docs_root), 'static', svg_path.replace('static/', '')),
-    ]
-    
-    for path in possible_paths:
-        if os.path.isfile(path) and path.endswith('.svg'):
-            return path
-    
-    return None
+    def size(self, path: str) -> int:
+        size = self._index().get(os.path.normpath(path))
+        return size if size is not None else os.path.getsize(path)
+
+    def read(self, path: str) -> Optional[str]:
+        key = os.path.normpath(path)
+        if key not in self._contents:
+            self._contents[key] = read_svg_content(path)
+        return self._contents[key]
+
 
 def read_svg_content(svg_path: str) -> Optional[str]:
     """Read and return SVG file content."""
@@ -134,14 +117,21 @@ def read_svg_content(svg_path: str) -> Optional[str]:
         print(f"Warning: Could not read SVG file {svg_path}: {e}")
     return None
 
-def replace_svg_references(content: str, docs_root: str) -> str:
+def replace_svg_references(
+    content: str,
+    docs_root: str,
+    svg_mode: str = "inline",
+    max_svg_bytes: Optional[int] = None,
+    assets: Optional[SvgAssets] = None,
+) -> str:
     """
     Replace SVG image references in markdown content with actual SVG content.
     Handles patterns like: ![alt_text](/static/img/file.svg) or ![alt_text](file.svg)
+    In "placeholder" mode, or for SVGs larger than max_svg_bytes, a short note replaces the SVG.
+    Pass the parse's `assets` to share its index and reads across files.
     """
-    # Pattern to match markdown image syntax with SVG files
-    svg_pattern = r'!\[([^\]]*)\]\(([^)]*\.svg)\)'
-    
+    assets = assets or SvgAssets(docs_root)
+
     def replace_svg(match):
         alt_text = match.group(1)
         svg_ref = match.group(2)
@@ -152,10 +142,13 @@ def replace_svg_references(content: str, docs_root: str) -> str:
             return match.group(0)
         
         # Find the actual SVG file
-        svg_path = find_svg_file(svg_ref, docs_root)
+        svg_path = assets.find(svg_ref)
         
         if svg_path:
-            svg_content = read_svg_content(svg_path)
+            size = assets.size(svg_path)
+            if svg_mode == "placeholder" or (max_svg_bytes is not None and size > max_svg_bytes):
+                return f"<!-- Original: ![{alt_text}]({svg_ref}) -->\n[SVG diagram not inlined: {alt_text or os.path.basename(svg_ref)}, {size} bytes]"
+            svg_content = assets.read(svg_path)
             if svg_content:
                 # Return the SVG content directly, optionally with a comment indicating the original reference
                 return f"<!-- Original: ![{alt_text}]({svg_ref}) -->\n{svg_content}"
@@ -164,7 +157,7 @@ def replace_svg_references(content: str, docs_root: str) -> str:
         print(f"Warning: Could not find or read local SVG: {svg_ref}")
         return match.group(0)
     
-    return re.sub(svg_pattern, replace_svg, content)
+    return re.sub(SVG_PATTERN, replace_svg, content)
 
 def parse_frontmatter(content: str) -> tuple[Dict[str, Any], str]:
     """Parse YAML frontmatter from markdown content"""
@@ -183,7 +176,14 @@ def parse_frontmatter(content: str) -> tuple[Dict[str, Any], str]:
     
     return frontmatter, markdown_content
 
-def parse_markdown_file(file_path: str, docs_root: str) -> DocPage:
+def parse_markdown_file(
+    file_path: str,
+    docs_root: str,
+    svg_mode: str = "inline",
+    max_svg_bytes: Optional[int] = None,
+    markdown_backend: str = "markdown_to_json",
+    assets: Optional[SvgAssets] = None,
+) -> DocPage:
     """Parse a single markdown or MDX file"""
     with open(file_path, 'r', encoding='utf-8') as file:
         content = file.read()
@@ -192,11 +192,11 @@ def parse_markdown_file(file_path: str, docs_root: str) -> DocPage:
     frontmatter, markdown_content = parse_frontmatter(content)
     
     # Replace SVG references with actual SVG content
-    markdown_content = replace_svg_references(markdown_content, docs_root)
+    markdown_content = replace_svg_references(markdown_content, docs_root, svg_mode, max_svg_bytes, assets)
     
     # Convert markdown to JSON structure
     try:
-        content_json = json.loads(markdown_to_json.jsonify(markdown_content))
+        content_json = markdown_to_dict(markdown_content, markdown_backend)
     except:
         # If markdown_to_json fails, store as plain content
         content_json = {"content": markdown_content}
@@ -227,7 +227,43 @@ def parse_markdown_file(file_path: str, docs_root: str) -> DocPage:
         subpages=[]
     )
 
-def parse_docs_directory(path: str, project_name: str = None, output_dir: str = None) -> tuple[DocPage, Dict]:
+def _parse_file_or_none(
+    file_path: str,
+    docs_root: str,
+    svg_mode: str = "inline",
+    max_svg_bytes: Optional[int] = None,
+    markdown_backend: str = "markdown_to_json",
+    assets: Optional[SvgAssets] = None,
+) -> Optional[Dict[str, Any]]:
+    """parse_markdown_file for the worker pool and parse cache: a failed file is reported and skipped."""
+    try:
+        return parse_markdown_file(file_path, docs_root, svg_mode, max_svg_bytes, markdown_backend, assets).to_dict()
+    except Exception as e:
+        print(f"Warning: Could not parse {file_path}: {e}")
+        return None
+
+def _without_local_svgs(file_path: str) -> bool:
+    """Files that inline local SVGs also depend on those files, so they are not cached."""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            refs = re.findall(SVG_PATTERN, file.read())
+    except (IOError, UnicodeDecodeError):
+        return False
+    return all(ref.startswith(('http://', 'https://')) for _, ref in refs)
+
+def parse_docs_directory(
+    path: str,
+    project_name: str = None,
+    output_dir: str = None,
+    workers: int = 1,
+    use_cache: bool = True,
+    compact: bool = False,
+    svg_mode: str = "inline",
+    max_svg_bytes: Optional[int] = None,
+    markdown_backend: str = "markdown_to_json",
+    chunk_store: Optional[str] = None,
+    shards: bool = False,
+) -> tuple[DocPage, Dict]:
     """
     Parse documentation from markdown files in a directory structure and generate structured output.
     
@@ -235,6 +271,14 @@ def parse_docs_directory(path: str, project_name: str = None, output_dir: str =
         path (str): Path to the directory containing markdown files
         project_name (str, optional): Name of the project. If None, uses directory name.
         output_dir (str, optional): Directory to save output files. If None, saves to the input path.
+        workers (int): Processes used to parse markdown files (< 1: one per CPU core)
+        use_cache (bool): Reuse results for unchanged files from parse_cache.json in output_dir
+        compact (bool): Write JSON outputs without indentation
+        svg_mode (str): "inline" embeds local SVGs, "placeholder" replaces them with a short note
+        max_svg_bytes (int, optional): SVGs larger than this get the placeholder even when inlining
+        markdown_backend (str): "markdown_to_json" or the faster "markdown_it" section extractor
+        chunk_store (str, optional): Content-addressed directory that also receives every parsed section
+        shards (bool): Also write the pages/ shards (always written with the "pages" docs backend)
     
     Returns:
         tuple: (structured_docs, detailed_keys_tree)
@@ -246,16 +290,15 @@ def parse_docs_directory(path: str, project_name: str = None, output_dir: str =
         project_name = os.path.basename(path.rstrip('/'))
     
     docs_root = path  # Store the root docs path for SVG resolution
+    file_paths = []  # every markdown file, in the order pages are attached
     
-    def process_directory(dir_path: str, current_page: DocPage) -> None:
-        """Recursively process directory and its subdirectories"""
-        items = []
-        
+    def list_directory(dir_path: str) -> Optional[Dict[str, Any]]:
+        """Recursively collect sorted markdown files and subdirectories"""
         # Get all items in directory and sort them
         try:
             dir_items = os.listdir(dir_path)
         except (PermissionError, FileNotFoundError):
-            return
+            return None
         
         # Separate files and directories
         files = []
@@ -272,16 +315,25 @@ def parse_docs_directory(path: str, project_name: str = None, output_dir: str =
         files.sort(key=lambda x: x[0])
         directories.sort(key=lambda x: x[0])
         
+        file_paths.extend(file_path for _, file_path in files)
+        return {
+            "files": [file_path for _, file_path in files],
+            "directories": [(dirname, sub_path, list_directory(sub_path)) for dirname, sub_path in directories],
+        }
+    
+    def process_directory(listing: Optional[Dict[str, Any]], current_page: DocPage) -> None:
+        """Recursively attach parsed files and subdirectories to the page"""
+        if listing is None:
+            return
+        
         # Process files first
-        for filename, file_path in files:
-            try:
-                doc_page = parse_markdown_file(file_path, docs_root)
-                current_page.subpages.append(doc_page)
-            except Exception as e:
-                print(f"Warning: Could not parse {file_path}: {e}")
+        for file_path in listing["files"]:
+            doc_page = parsed[file_path]
+            if doc_page is not None:
+                current_page.subpages.append(DocPage.from_dict(doc_page))
         
         # Process subdirectories
-        for dirname, dir_path in directories:
+        for dirname, dir_path, sub_listing in listing["directories"]:
             # Create a new page for the directory
             dir_page = DocPage(
                 title=dirname.replace('-', ' ').replace('_', ' ').title(),
@@ -292,7 +344,7 @@ def parse_docs_directory(path: str, project_name: str = None, output_dir: str =
             )
             
             # Recursively process the subdirectory
-            process_directory(dir_path, dir_page)
+            process_directory(sub_listing, dir_page)
             
             # Only add the directory page if it has content
             if dir_page.subpages:
@@ -307,22 +359,32 @@ def parse_docs_directory(path: str, project_name: str = None, output_dir: str =
         subpages=[]
     )
     
-    # Process the root directory
-    process_directory(path, root_page)
-    
-    # Generate detailed keys tree
-    detailed_keys_tree = generate_detailed_keys_tree(root_page)
+    # Parse new or changed files up front (in parallel when workers > 1), then build the tree
+    listing = list_directory(path)
+    salt = json.dumps([markdown_to_json.__version__, markdown_backend])
+    cache = ParseCache(path, output_dir, salt, enabled=use_cache)
+    results = cache.map(
+        _parse_file_or_none,
+        file_paths,
+        workers,
+        docs_root,
+        svg_mode,
+        max_svg_bytes,
+        markdown_backend,
+        SvgAssets(docs_root),
+        cacheable=_without_local_svgs,
+    )
+    parsed = dict(zip(file_paths, results))
     
-    # Save outputs
-    os.makedirs(output_dir, exist_ok=True)
+    # Process the root directory
+    process_directory(listing, root_page)
     
-    # Save detailed keys tree
-    with open(os.path.join(output_dir, "docs_tree.json"), "w", encoding='utf-8') as f:
-        json.dump(detailed_keys_tree, f, indent=2, ensure_ascii=False)
+    # Generate detailed keys tree, node ids and structured docs in one pass
+    detailed_keys_tree, node_ids, structured_docs = build_docs(root_page, page_paths=True)
     
-    # Save structured docs
-    with open(os.path.join(output_dir, "structured_docs.json"), "w", encoding='utf-8') as f:
-        json.dump(convert_to_dict(root_page), f, indent=2, ensure_ascii=False)
+    # Save outputs (files whose content did not change are left untouched)
+    write_parsed_docs(output_dir, detailed_keys_tree, node_ids, structured_docs, compact, chunk_store, shards)
+    cache.save(structured_docs, node_ids)
     
     return root_page, detailed_keys_tree
 
@@ -333,6 +395,14 @@ if __name__ == "__main__":
     # Set up command line argument parsing
     parser = argparse.ArgumentParser(description='Parse documentation for a repository')
     parser.add_argument('--repo_name', required=True, help='Name of the repository to parse documentation for')
+    parser.add_argument('--workers', type=int, default=1, help='Processes for markdown parsing (0: one per CPU core)')
+    parser.add_argument('--no-cache', action='store_true', help='Re-parse every file, ignoring parse_cache.json')
+    parser.add_argument('--compact', action='store_true', help='Write JSON outputs without indentation')
+    parser.add_argument('--svg-mode', choices=SVG_MODES, default='inline', help='Inline local SVGs or replace them with a placeholder')
+    parser.add_argument('--max-svg-bytes', type=int, help='Use the placeholder for SVGs larger than this')
+    parser.add_argument('--markdown-backend', choices=MARKDOWN_BACKENDS, default='markdown_to_json', help='Markdown section extractor')
+    parser.add_argument('--chunk-store', help='Directory of sections by content hash, shared across parses')
+    parser.add_argument('--shards', action='store_true', help='Also write per-page shards (pages/)')
     args = parser.parse_args()
     
     # Get repository name from command line argument
@@ -352,7 +422,19 @@ if __name__ == "__main__":
         exit(1)
     
     # Parse the documentation
-    structured_docs, keys_tree = parse_docs_directory(docs_path, project_name, output_dir=target_path)
+    structured_docs, keys_tree = parse_docs_directory(
+        docs_path,
+        project_name,
+        output_dir=target_path,
+        workers=args.workers,
+        use_cache=not args.no_cache,
+        compact=args.compact,
+        svg_mode=args.svg_mode,
+        max_svg_bytes=args.max_svg_bytes,
+        markdown_backend=args.markdown_backend,
+        chunk_store=args.chunk_store,
+        shards=args.shards,
+    )
     
     print(f"Successfully parsed documentation for {project_name}")
     print(f"Generated files: docs_tree.json and structured_docs.json in {target_path}")
@@ -0,0 +1,66 @@
+"""
+Rendered-JSON token counts of docs nodes, shared by the page shard writer and the
+navigator. The tokenizer is loaded on first use, so importing this (and the
+parsers) does not need tiktoken's encoding files.
+"""
+
+import json
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from docs_parser.docs_blocks import expand_blocks
+
+# Same encoding as llm_proxy.enc
+TOKENIZER_MODEL = "gpt-4"
+# Rough cost of the punctuation and indentation around one dict/list entry.
+ENTRY_OVERHEAD_TOKENS = 3
+
+
+@lru_cache(maxsize=1)
+def get_encoder():
+    import tiktoken
+
+    return tiktoken.encoding_for_model(TOKENIZER_MODEL)
+
+
+def compute_token_counts(root: Any, blocks: Optional[Dict[str, str]] = None) -> Dict[int, int]:
+    """
+    Count the rendered JSON tokens of every node once, keyed by id(node).
+
+    The documents are never mutated after loading, so node ids stay valid for
+    the navigator's lifetime. Strings are counted with content `blocks` expanded.
+    """
+    enc = get_encoder()
+    counts: Dict[int, int] = {}
+
+    def walk(value: Any) -> int:
+        if isinstance(value, dict):
+            total = 2
+            for key, item in value.items():
+                total += len(enc.encode(json.dumps(str(key)))) + ENTRY_OVERHEAD_TOKENS + walk(item)
+        elif isinstance(value, list):
+            total = 2
+            for item in value:
+                total += ENTRY_OVERHEAD_TOKENS + walk(item)
+        elif isinstance(value, str):
+            total = len(enc.encode(json.dumps(expand_blocks(value, blocks))))
+        else:
+            return 1
+        counts[id(value)] = total
+        return total
+
+    walk(root)
+    return counts
+
+
+def node_tokens(node: Any, counts: Dict[int, int]) -> int:
+    """
+    Rendered tokens of a node: precomputed on store views, else looked up by id, else
+    (a node that was never counted, e.g. from an evicted shard) counted now.
+    """
+    tokens = getattr(node, "tokens", None)
+    if tokens is None:
+        tokens = counts.get(id(node))
+    if tokens is None:
+        tokens = compute_token_counts(node).get(id(node))
+    return tokens or 1
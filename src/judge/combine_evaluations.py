@@ -1,13 +1,13 @@
 import json
 import argparse
 import os
-import glob
 from pathlib import Path
 from typing import List, Dict, Any
 import statistics
 from collections import Counter
 import math
 import config
+from docs_parser.json_io import dump_json, glob_json, load_json
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Combine evaluation results from multiple LLMs")
@@ -219,7 +219,7 @@ def load_evaluation_files(repo_name: str, reference: str) -> List[Dict]:
     
     file_pattern = os.path.join(base_path, "*.json")
     
-    all_files = glob.glob(file_pattern)
+    all_files = glob_json(base_path)
     evaluation_files = [f for f in all_files if "combined" not in os.path.basename(f)]
     
     if not evaluation_files:
@@ -232,10 +232,9 @@ def load_evaluation_files(repo_name: str, reference: str) -> List[Dict]:
     evaluations = []
     for file_path in evaluation_files:
         try:
-            with open(file_path, "r") as f:
-                evaluation = json.load(f)
-                evaluations.append(evaluation)
-                print(f"✓ Loaded: {os.path.basename(file_path)}")
+            evaluation = load_json(file_path)
+            evaluations.append(evaluation)
+            print(f"✓ Loaded: {os.path.basename(file_path)}")
         except Exception as e:
             print(f"✗ Error loading {file_path}: {e}")
     
@@ -327,8 +326,7 @@ def combine_evaluations_for_repo(
         result = combined_rubrics
         result["combination_metadata"] = combination_metadata
 
-    with open(output_path, "w") as f:
-        json.dump(result, f, indent=2)
+    output_path = dump_json(result, output_path, indent=2)
 
     overall_score = 0
     overall_std = 0
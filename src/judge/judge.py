@@ -2,6 +2,7 @@ import json
 import asyncio
 import argparse
 import os
+import time
 from pathlib import Path
 from tqdm import tqdm
 import traceback
@@ -14,8 +15,11 @@ except Exception as e:
     print(f"Failed to configure logfire: {e}")
 
 from pydantic_ai import Agent
-from tools import AgentDeps, docs_navigator_tool
-from llm_proxy import get_llm, run_llm_natively
+from tools import AgentDeps, docs_navigator_tool, docs_search_tool
+from tools.docs_navigator import RENDER_CACHE
+from docs_parser.json_io import dump_json, json_exists, load_json, resolve_json_path
+from tools.run_journal import record_run
+from llm_proxy import count_tokens, get_llm, run_llm_natively
 import config
 
 
@@ -23,14 +27,14 @@ def detect_docs_source(base_path: str) -> str:
     preferred = ["codewiki", "deepwiki", "original"]
     for candidate in preferred:
         docs_tree = os.path.join(base_path, candidate, "docs_tree.json")
-        if os.path.isfile(docs_tree):
+        if json_exists(docs_tree):
             return candidate
 
     if os.path.isdir(base_path):
         for name in sorted(os.listdir(base_path)):
             candidate_path = os.path.join(base_path, name)
             docs_tree = os.path.join(candidate_path, "docs_tree.json")
-            if os.path.isdir(candidate_path) and os.path.isfile(docs_tree):
+            if os.path.isdir(candidate_path) and json_exists(docs_tree):
                 return name
 
     raise FileNotFoundError(
@@ -82,6 +86,23 @@ For each criteria evaluated, respond with:
 """.strip()
 
 
+def build_evaluation_prompt(requirement: str, docs_tree) -> str:
+    """Build the per-leaf evaluation prompt sent to the judge."""
+    return f"""
+Evaluate this criteria against the documentation:
+
+Criteria: "{requirement}"
+
+Documentation tree:
+```json
+{json.dumps(docs_tree, indent=2)}
+```
+
+First, you need to find the relevant documentation section that covers this criteria through the `docs_search` and `docs_navigator` tools (pass node ids from the tree such as "n12", or navigation paths).
+Then, you need to evaluate if the criteria is mentioned. Respond with the exact JSON format specified.
+""".strip()
+
+
 def is_leaf_node(rubric_item):
     """Check if a rubric item is a leaf node (has no sub_tasks)"""
     return "sub_tasks" not in rubric_item or not rubric_item["sub_tasks"]
@@ -168,7 +189,7 @@ IMPORTANT: You must respond with valid JSON in exactly this format:
   "evidence": "Specific documentation sections or content that support the score"
 }}
 
-First, you need to find the relevant documentation section that covers this criteria through `docs_navigator` tool.
+First, you need to find the relevant documentation section that covers this criteria through the `docs_search` and `docs_navigator` tools (pass node ids from the tree such as "n12", or navigation paths).
 Then, you need to evaluate if the criteria is mentioned.
 """.strip()
             if agent is None:
@@ -269,6 +290,7 @@ async def evaluate_leaf_requirements(
     max_retries=2,
     model: str = None,
     system_prompt: str = None,
+    journal_dir: str = None,
 ):
     """Evaluate all leaf requirements against the documentation using batch processing"""
     evaluations = {}
@@ -276,27 +298,29 @@ async def evaluate_leaf_requirements(
     async def evaluate_single_requirement(leaf):
         """Evaluate a single requirement"""
         try:
-            prompt = f"""
-Evaluate this criteria against the documentation:
-
-Criteria: "{leaf['requirement']}"
-
-Documentation tree:
-```json
-{json.dumps(docs_tree, indent=2)}
-```
-
-First, you need to find the relevant documentation section that covers this criteria through `docs_navigator` tool.
-Then, you need to evaluate if the criteria is mentioned. Respond with the exact JSON format specified.
-""".strip()
+            prompt = build_evaluation_prompt(leaf['requirement'], docs_tree)
             
+            started = time.monotonic()
+            usage = None
             if agent is None:
                 final_output = await run_llm_natively(model, messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": prompt}])
             else:
                 result = await agent.run(prompt, deps=deps)
                 final_output = result.output
-            input_tokens = 0  # Token counting would need to be implemented separately
-            output_tokens = 0
+                usage = result.usage()
+            input_tokens = usage.input_tokens if usage else 0
+            output_tokens = usage.output_tokens if usage else 0
+            if journal_dir:
+                record_run(
+                    journal_dir,
+                    "eval",
+                    model,
+                    usage,
+                    prompt_tokens=count_tokens(system_prompt or "") + count_tokens(prompt),
+                    elapsed=time.monotonic() - started,
+                    use_tools=agent is not None,
+                    output_tokens=count_tokens(final_output or "") if usage is None else 0,
+                )
             
             # Parse evaluation result
             try:
@@ -464,21 +488,19 @@ async def run(args):
     Path(output_dir).mkdir(parents=True, exist_ok=True)
     
     # Load docs tree
-    with open(docs_tree_path, "r") as f:
-        docs_tree = json.load(f)
+    docs_tree = load_json(docs_tree_path)
     
     # New evaluation logic
     # Load existing rubrics
     rubrics_file = args.rubrics_file or os.path.join(output_dir, "rubrics", "combined_rubrics.json")
     
-    if not os.path.exists(rubrics_file):
+    if not json_exists(rubrics_file):
         print(f"Rubrics file not found: {rubrics_file}")
         return
     
-    with open(rubrics_file, "r") as f:
-        rubrics = json.load(f)
-        if "rubrics" in rubrics:
-            rubrics = rubrics["rubrics"]
+    rubrics = load_json(rubrics_file)
+    if "rubrics" in rubrics:
+        rubrics = rubrics["rubrics"]
 
     print(f"Loaded rubrics from: {rubrics_file}")
     print(f"Using documentation source: {docs_source}")
@@ -491,15 +513,15 @@ async def run(args):
     sanitized_model = args.model.replace("/", "_") if args.model else "default"
     evaluation_file = os.path.join(evaluation_folder, f"{sanitized_model}.json")
     
-    if os.path.exists(evaluation_file):
-        print(f"Evaluation file already exists: {evaluation_file}")
+    if json_exists(evaluation_file):
+        print(f"Evaluation file already exists: {resolve_json_path(evaluation_file)}")
         return
 
     # Setup evaluation agent
-    deps = AgentDeps(docs_path)
+    deps = AgentDeps(docs_path, output_format=config.get_tool_output_format("eval"))
     
     if args.use_tools:
-        tools = [docs_navigator_tool]
+        tools = [docs_search_tool, docs_navigator_tool]
         agent = Agent(
             model=get_llm(args.model),
             deps_type=AgentDeps,
@@ -528,6 +550,7 @@ async def run(args):
         args.max_retries,
         args.model,
         EVALUATION_SYSTEM_PROMPT,
+        journal_dir=output_dir,
     )
 
     # Calculate scores bottom-up
@@ -535,15 +558,15 @@ async def run(args):
     scored_rubrics = calculate_scores_bottom_up(rubrics, leaf_evaluations)
     
     # Save results
-    with open(evaluation_file, "w") as f:
-        json.dump(scored_rubrics, f, indent=2)
+    evaluation_file = dump_json(scored_rubrics, evaluation_file, indent=2)
     
     print(f"Evaluation results saved to: {evaluation_file}")
     
     # Calculate and display summary statistics
     total_tokens = sum(eval_data.get("tokens", {}).get("input", 0) + eval_data.get("tokens", {}).get("output", 0) 
                       for eval_data in leaf_evaluations.values())
-    total_cost = sum(eval_data.get("tokens", {}).get("input", 0) * 3/1e6 + eval_data.get("tokens", {}).get("output", 0) * 15/1e6 
+    pricing = config.get_model_pricing(args.model)
+    total_cost = sum(eval_data.get("tokens", {}).get("input", 0) * pricing["input"]/1e6 + eval_data.get("tokens", {}).get("output", 0) * pricing["output"]/1e6 
                     for eval_data in leaf_evaluations.values())
     
     # Count retry statistics
@@ -558,6 +581,8 @@ async def run(args):
     print(f"Requirements with final errors: {error_count}")
     print(f"Total tokens used: {total_tokens}")
     print(f"Total cost: ${total_cost:.4f}")
+    cache_stats = RENDER_CACHE.stats()
+    print(f"Navigator render cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
     
     # Calculate overall score
     overall_score = sum(item["score"] * item["weight"] for item in scored_rubrics) / sum(item["weight"] for item in scored_rubrics)
@@ -15,6 +15,7 @@ import os
 from pathlib import Path
 from typing import Dict, List, Any
 import config
+from docs_parser.json_io import glob_json, json_exists, load_json, plain_json_path
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Visualize rubric evaluation results")
@@ -215,12 +216,12 @@ def visualize_results(
             data_dir = Path(config.get_data_path(repo_name))
             for candidate in preferred:
                 docs_tree = data_dir / candidate / "docs_tree.json"
-                if docs_tree.exists():
+                if json_exists(str(docs_tree)):
                     detected_reference = candidate
                     print(f"Detected reference docs: {candidate}")
                     break
             if not detected_reference:
-                candidates = [d for d in data_dir.iterdir() if d.is_dir() and (d / "docs_tree.json").exists()]
+                candidates = [d for d in data_dir.iterdir() if d.is_dir() and json_exists(str(d / "docs_tree.json"))]
                 if candidates:
                     detected_reference = candidates[0].name
                     print(f"Using first available reference docs: {detected_reference}")
@@ -232,9 +233,9 @@ def visualize_results(
 
         default_path = Path(config.get_data_path(repo_name, reference, "evaluation_results"))
         results_file = os.path.join(default_path, "combined_evaluation_results.json")
-        if not os.path.exists(results_file):
+        if not json_exists(results_file):
             individual_files = [
-                f for f in os.listdir(default_path) if f.endswith(".json") and not f.startswith("combined")
+                os.path.basename(f) for f in glob_json(str(default_path)) if not os.path.basename(f).startswith("combined")
             ]
             if len(individual_files) == 1:
                 results_file = os.path.join(default_path, individual_files[0])
@@ -247,8 +248,8 @@ def visualize_results(
                 print(f"No evaluation result files found in {default_path}")
                 return None
 
-    with open(results_file, "r") as f:
-        data = json.load(f)
+    data = load_json(results_file)
+    results_file = plain_json_path(results_file)
 
     if isinstance(data, dict) and "rubrics" in data:
         scored_rubrics = data["rubrics"]
@@ -1,9 +1,10 @@
 import asyncio
-from typing import Any, Awaitable, Callable, Dict, List
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 from openai import AsyncOpenAI
 from pydantic_ai.models.openai import OpenAIChatModel, OpenAIChatModelSettings
 from pydantic_ai.providers.openai import OpenAIProvider
+from pydantic_ai.usage import RunUsage
 import tiktoken
 
 import config
@@ -11,6 +12,10 @@ import config
 
 enc = tiktoken.encoding_for_model("gpt-4")
 
+def count_tokens(text: str) -> int:
+    """Count the number of tokens in a text."""
+    return len(enc.encode(text))
+
 def truncate_tokens(text: str) -> str:
     """
     Count the number of tokens in a text.
@@ -81,6 +86,7 @@ async def run_chat_with_tools(
     messages: List[Dict[str, Any]],
     tools: List[Dict[str, Any]],
     handle_tool_call: Callable[[Dict[str, Any]], Awaitable[str]],
+    usage: Optional[RunUsage] = None,
 ) -> str:
     """
     Execute a Chat Completions conversation that supports tool calls (e.g., GPT-OSS on Ollama).
@@ -96,6 +102,8 @@ async def run_chat_with_tools(
     handle_tool_call:
         Coroutine invoked for each tool_call payload. It receives the raw tool_call dict and
         must return a string result that will be passed back to the model as a tool message.
+    usage:
+        Optional RunUsage that is updated with the requests and tokens of every completion.
 
     Returns
     -------
@@ -115,6 +123,11 @@ async def run_chat_with_tools(
             tool_choice="auto",
             parallel_tool_calls=False,
         )
+        if usage is not None:
+            usage.requests += 1
+            if response.usage is not None:
+                usage.input_tokens += response.usage.prompt_tokens or 0
+                usage.output_tokens += response.usage.completion_tokens or 0
         message = response.choices[0].message
 
         if message.tool_calls:
@@ -9,6 +9,7 @@ from collections import Counter
 
 import config
 from llm_proxy import get_embeddings
+from docs_parser.json_io import dump_json, glob_json, json_exists, load_json
 
 
 class RubricReliabilityAssessor:
@@ -21,9 +22,8 @@ class RubricReliabilityAssessor:
     async def assess_reliability(self, combined_rubrics_path: str) -> Dict:
         """Main method to assess rubric reliability"""
         
-        with open(combined_rubrics_path, 'r') as f:
-            combined_data = json.load(f)
-            rubrics = combined_data.get("rubrics", combined_data)
+        combined_data = load_json(combined_rubrics_path)
+        rubrics = combined_data.get("rubrics", combined_data)
         
         assessment_results = {
             "inter_model_consistency": await self._assess_inter_model_consistency(),
@@ -39,13 +39,12 @@ class RubricReliabilityAssessor:
         
         # Load all individual model rubrics
         individual_rubrics = []
-        rubrics_files = [f for f in os.listdir(self.base_path) 
-                        if f.endswith('.json') and 'combined' not in f and 'assessment' not in f]
+        rubrics_files = [os.path.basename(f) for f in glob_json(self.base_path)]
+        rubrics_files = [f for f in rubrics_files if 'combined' not in f and 'assessment' not in f]
         
         for file in rubrics_files:
-            with open(os.path.join(self.base_path, file), 'r') as f:
-                rubrics = json.load(f)
-                individual_rubrics.append((file, rubrics))
+            rubrics = load_json(os.path.join(self.base_path, file))
+            individual_rubrics.append((file, rubrics))
         
         if len(individual_rubrics) < 2:
             return {"error": "Need at least 2 individual rubrics files for consistency analysis"}
@@ -251,7 +250,7 @@ async def main():
     else:
         rubrics_path = os.path.join(assessor.base_path, "combined_rubrics.json")
     
-    if not os.path.exists(rubrics_path):
+    if not json_exists(rubrics_path):
         print(f"Rubrics file not found: {rubrics_path}")
         return
     
@@ -262,8 +261,7 @@ async def main():
     
     # Save results
     assessment_file = os.path.join(assessor.base_path, "reliability_assessment.json")
-    with open(assessment_file, 'w') as f:
-        json.dump(results, f, indent=2)
+    assessment_file = dump_json(results, assessment_file, indent=2)
     
     print(f"Assessment results saved to: {assessment_file}")
     
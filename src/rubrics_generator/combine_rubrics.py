@@ -1,12 +1,12 @@
 import json
 import argparse
 import os
-import glob
 from typing import List, Dict
 import statistics
 from collections import Counter
 import config
 from llm_proxy import run_llm_natively
+from docs_parser.json_io import dump_json, glob_json, json_exists, load_json, resolve_json_path
 from time import sleep
 import asyncio
 
@@ -177,8 +177,7 @@ def load_rubrics_files(repo_name: str) -> List[Dict]:
     if not os.path.exists(base_path):
         raise ValueError(f"Rubrics directory not found: {base_path}")
     
-    file_pattern = os.path.join(base_path, "*.json")
-    rubrics_files = [f for f in glob.glob(file_pattern) if "combined" not in os.path.basename(f) and "embeddings" not in os.path.basename(f)]
+    rubrics_files = [f for f in glob_json(base_path) if "combined" not in os.path.basename(f) and "embeddings" not in os.path.basename(f)]
     
     if not rubrics_files:
         raise ValueError(f"No rubrics files found in: {base_path}")
@@ -190,10 +189,9 @@ def load_rubrics_files(repo_name: str) -> List[Dict]:
     all_rubrics = []
     for file_path in rubrics_files:
         try:
-            with open(file_path, "r") as f:
-                rubrics = json.load(f)
-                all_rubrics.append(rubrics)
-                print(f"✓ Loaded: {os.path.basename(file_path)}")
+            rubrics = load_json(file_path)
+            all_rubrics.append(rubrics)
+            print(f"✓ Loaded: {os.path.basename(file_path)}")
         except Exception as e:
             print(f"✗ Error loading {file_path}: {e}")
     
@@ -240,7 +238,8 @@ async def combine_rubrics_for_repo(
     output_file = output_file or "combined_rubrics.json"
     output_path = os.path.join(base_path, output_file)
 
-    if os.path.exists(output_path):
+    if json_exists(output_path):
+        output_path = resolve_json_path(output_path)
         print(f"Combined rubrics already exists: {output_path}")
         return output_path
 
@@ -279,8 +278,7 @@ async def combine_rubrics_for_repo(
     }
 
     os.makedirs(base_path, exist_ok=True)
-    with open(output_path, "w") as f:
-        json.dump(result, f, indent=2)
+    output_path = dump_json(result, output_path, indent=2)
 
     print(f"Combined rubrics saved to: {output_path}")
     print("-" * 100)
@@ -2,19 +2,24 @@ import json
 import asyncio
 import argparse
 import os
+import time
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from pydantic_ai import Agent
+from pydantic_ai.usage import RunUsage
 
 from llm_proxy import (
+    count_tokens,
     get_llm,
     is_gpt_oss_model,
     run_chat_with_tools,
-    truncate_tokens,
 )
 import config
-from tools import AgentDeps, docs_navigator_tool
+from tools import AgentDeps, docs_navigator_tool, docs_search_tool
+from tools.docs_navigator import MAX_SEARCH_RESULTS, search_docs
+from docs_parser.json_io import dump_json, json_exists, load_json
+from tools.run_journal import record_run
 from rubrics_generator.visualize_rubrics import visualize_rubrics
 
 
@@ -22,14 +27,14 @@ def detect_docs_source(base_path: str) -> str:
     preferred = ["codewiki", "deepwiki", "original"]
     for candidate in preferred:
         docs_tree = os.path.join(base_path, candidate, "docs_tree.json")
-        if os.path.isfile(docs_tree):
+        if json_exists(docs_tree):
             return candidate
 
     if os.path.isdir(base_path):
         for name in sorted(os.listdir(base_path)):
             candidate_path = os.path.join(base_path, name)
             docs_tree = os.path.join(candidate_path, "docs_tree.json")
-            if os.path.isdir(candidate_path) and os.path.isfile(docs_tree):
+            if os.path.isdir(candidate_path) and json_exists(docs_tree):
                 return name
 
     raise FileNotFoundError(
@@ -124,7 +129,8 @@ Use the following JSON format to represent the rubrics:
 </GUIDELINES>
 
 <TOOLS>
-- You have access to a `docs_navigator` tool that retrieves real documentation snippets. Each call accepts a JSON array of navigation paths (e.g., `["subpages", 0, "content", "Overview"]`).
+- You have access to a `docs_navigator` tool that retrieves real documentation snippets. Each call accepts a JSON array of node ids from the docs tree (e.g., `"n12"`) or navigation paths (e.g., `["subpages", 0, "content", "Overview"]`).
+- Use the `docs_search` tool to find where a topic is documented. It returns ranked navigation paths with short snippets that you can pass straight to `docs_navigator`.
 - **Never** emit placeholders like "TODO" or invent facts. If information is missing, pause and call `docs_navigator` again until you gather the necessary evidence.
 - Cite the sections you inspected in the rubric references to prove coverage.
 </TOOLS>
@@ -199,6 +205,23 @@ Return the rubrics in the following **nested JSON format**, where:
 - Treat the documentation as evidence from which you infer **the design intent and system structure**.
 """.strip()
 
+
+def build_rubrics_prompt(docs_tree) -> str:
+    """Build the user prompt for rubric generation."""
+    return f"""
+Given the docs tree:
+\"\"\"
+{json.dumps(docs_tree, indent=2)}
+\"\"\"
+
+Use the docs_search tool to locate topics and the docs_navigator tool to inspect any sections you need. Each path is a node id from the tree (for example: "n12") or a JSON array of keys/indices (for example: ["subpages", 0, "content", "Overview"]). Do **not** produce placeholder text; keep calling docs_navigator until you have enough evidence to write complete rubrics that cite specific documentation paths.
+""".strip()
+
+
+def get_system_prompt(use_tools: bool) -> str:
+    return SYSTEM_PROMPT if use_tools else SYSTEM_PROMPT_WO_TOOLS
+
+
 # --- GPT-OSS helpers ---
 
 def _docs_navigator_tool_definition() -> List[Dict[str, Any]]:
@@ -209,8 +232,8 @@ def _docs_navigator_tool_definition() -> List[Dict[str, Any]]:
             "function": {
                 "name": "docs_navigator",
                 "description": (
-                    "Look up content from structured_docs.json using JSON-style navigation paths. "
-                    "Each path is a list of keys/indices such as ['subpages', 0, 'content', 'Overview']."
+                    "Look up content from structured_docs.json by node id from the docs tree (e.g. 'n12') "
+                    "or by a list of keys/indices such as ['subpages', 0, 'content', 'Overview']."
                 ),
                 "parameters": {
                     "type": "object",
@@ -218,42 +241,64 @@ def _docs_navigator_tool_definition() -> List[Dict[str, Any]]:
                         "paths": {
                             "type": "array",
                             "minItems": 1,
-                            "description": "Collection of navigation paths to inspect.",
+                            "description": "Collection of node ids or navigation paths to inspect.",
                             "items": {
-                                "type": "array",
-                                "items": {
-                                    "anyOf": [{"type": "string"}, {"type": "integer"}]
-                                },
-                                "description": "Path describing where to fetch content.",
+                                "anyOf": [
+                                    {"type": "string"},
+                                    {
+                                        "type": "array",
+                                        "items": {
+                                            "anyOf": [{"type": "string"}, {"type": "integer"}]
+                                        },
+                                    },
+                                ],
+                                "description": "Node id or path describing where to fetch content.",
                             },
                         }
                     },
                     "required": ["paths"],
                 },
             },
-        }
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "docs_search",
+                "description": (
+                    "Full-text search over the documentation. Returns ranked navigation paths with short "
+                    "snippets; pass a returned path to docs_navigator to read the section."
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "query": {
+                            "type": "string",
+                            "description": "Keywords to look for; wrap exact phrases in double quotes.",
+                        },
+                        "top_k": {
+                            "type": "integer",
+                            "minimum": 1,
+                            "maximum": MAX_SEARCH_RESULTS,
+                            "description": "Maximum number of sections to return (default 8).",
+                        },
+                        "semantic": {
+                            "type": "boolean",
+                            "description": "Match by meaning instead of keywords (default false).",
+                        },
+                    },
+                    "required": ["query"],
+                },
+            },
+        },
     ]
 
 
 def _format_docs_navigator_output(paths: List[List[Any]], deps: AgentDeps) -> str:
     """Mirror the existing docs_navigator tool output and keep it token-limited."""
-    chunks: List[str] = []
     for path in paths:
-        if not isinstance(path, list):
-            raise ValueError("Each entry in 'paths' must be a list that represents the navigation path.")
-        result = deps.docs_navigator.get_content(path)
-        content = json.dumps(result.get("content"), indent=2)
-        chunk = [
-            "--------------------------------",
-            f"Path: {path}",
-            f"Content: \n{content}",
-        ]
-        if result.get("error"):
-            chunk.append(f"Error: {result['error']}")
-        chunk.append("--------------------------------")
-        chunks.append("\n".join(chunk))
-
-    return truncate_tokens("\n".join(chunks))
+        if not isinstance(path, (list, str)):
+            raise ValueError("Each entry in 'paths' must be a node id or a list that represents the navigation path.")
+    return deps.docs_navigator.render_paths(paths, fmt=deps.output_format)
 
 
 async def _run_gpt_oss_with_tools(
@@ -262,19 +307,33 @@ async def _run_gpt_oss_with_tools(
     prompt: str,
     system_prompt: str,
     deps: AgentDeps,
+    usage: Optional[RunUsage] = None,
 ) -> str:
     """Execute the cookbook tool loop manually for GPT-OSS models hosted in Ollama."""
 
     async def handle_tool_call(tool_call: Dict[str, Any]) -> str:
         function = tool_call.get("function", {})
         name = function.get("name")
-        if name != "docs_navigator":
+        if name not in ("docs_navigator", "docs_search"):
             return f"Unsupported tool '{name}'"
         arguments_raw = function.get("arguments") or "{}"
         try:
             arguments = json.loads(arguments_raw)
         except json.JSONDecodeError as exc:
-            return f"Invalid JSON passed to docs_navigator: {exc}"
+            return f"Invalid JSON passed to {name}: {exc}"
+
+        if name == "docs_search":
+            query = arguments.get("query")
+            if not isinstance(query, str) or not query.strip():
+                return "docs_search requires a non-empty 'query' string."
+            try:
+                top_k = int(arguments.get("top_k") or 8)
+            except (TypeError, ValueError):
+                return "docs_search 'top_k' must be an integer."
+            print(f"[docs_search] Query: {query}")
+            return await search_docs(
+                deps.docs_navigator, query, top_k=top_k, semantic=bool(arguments.get("semantic"))
+            )
 
         paths = arguments.get("paths")
         if not isinstance(paths, list):
@@ -295,6 +354,7 @@ async def _run_gpt_oss_with_tools(
         messages=messages,
         tools=_docs_navigator_tool_definition(),
         handle_tool_call=handle_tool_call,
+        usage=usage,
     )
 
 # --- Run ---
@@ -304,7 +364,7 @@ async def run(args):
     docs_source = args.docs_source or detect_docs_source(base_path)
     docs_path = os.path.join(base_path, docs_source)
     docs_tree_path = os.path.join(docs_path, "docs_tree.json")
-    if not os.path.exists(docs_tree_path):
+    if not json_exists(docs_tree_path):
         raise FileNotFoundError(
             f"docs_tree.json not found at {docs_tree_path}. "
             "Did you parse documentation into that folder or pass the correct --docs-source?"
@@ -316,7 +376,7 @@ async def run(args):
     print(f"Using documentation source: {docs_source}")
 
     #check if output file already exists
-    if os.path.exists(os.path.join(output_dir, f"{sanitized_model}.json")):
+    if json_exists(os.path.join(output_dir, f"{sanitized_model}.json")):
         print(f"Rubrics already generated for {args.model}")
         return
     
@@ -324,36 +384,26 @@ async def run(args):
     Path(output_dir).mkdir(parents=True, exist_ok=True)
     
     # Load docs tree
-    with open(docs_tree_path, "r") as f:
-        docs_tree = json.load(f)
+    docs_tree = load_json(docs_tree_path)
 
-    prompt = f"""
-Given the docs tree:
-\"\"\"
-{json.dumps(docs_tree, indent=2)}
-\"\"\"
-
-Use the docs_navigator tool to inspect any sections you need. Each path must be a JSON array of keys/indices (for example: ["subpages", 0, "content", "Overview"]). Do **not** produce placeholder text; keep calling docs_navigator until you have enough evidence to write complete rubrics that cite specific documentation paths.
-""".strip()
+    prompt = build_rubrics_prompt(docs_tree)
+    system_prompt = get_system_prompt(args.use_tools)
     
-    
-    # Setup tools and agent
-    if args.use_tools:
-        system_prompt = SYSTEM_PROMPT
-    else:
-        system_prompt = SYSTEM_PROMPT_WO_TOOLS
-    
-    deps = AgentDeps(docs_path)
+    deps = AgentDeps(docs_path, output_format=config.get_tool_output_format("rubrics"))
 
+    prompt_tokens = count_tokens(system_prompt) + count_tokens(prompt)
+    started = time.monotonic()
     if args.use_tools and is_gpt_oss_model(model_name):
+        usage = RunUsage()
         final_output = await _run_gpt_oss_with_tools(
             model=model_name,
             prompt=prompt,
             system_prompt=system_prompt,
             deps=deps,
+            usage=usage,
         )
     else:
-        tools = [docs_navigator_tool] if args.use_tools else []
+        tools = [docs_search_tool, docs_navigator_tool] if args.use_tools else []
         agent = Agent(
             model=get_llm(model_name),
             deps_type=AgentDeps,
@@ -363,6 +413,16 @@ Use the docs_navigator tool to inspect any sections you need. Each path must be
 
         agent_output = await agent.run(prompt, deps=deps)
         final_output = agent_output.output
+        usage = agent_output.usage()
+    record_run(
+        base_path,
+        "rubrics",
+        model_name,
+        usage,
+        prompt_tokens=prompt_tokens,
+        elapsed=time.monotonic() - started,
+        use_tools=args.use_tools,
+    )
     
     # Parse and save rubrics
     try:
@@ -376,8 +436,7 @@ Use the docs_navigator tool to inspect any sections you need. Each path must be
             
             # Save rubrics to file
             rubrics_file = os.path.join(output_dir, f"{sanitized_model}.json")
-            with open(rubrics_file, "w") as f:
-                json.dump(rubrics, f, indent=2)
+            rubrics_file = dump_json(rubrics, rubrics_file, indent=2)
             
             print(f"Rubrics saved to: {rubrics_file}")
             # visualize rubrics
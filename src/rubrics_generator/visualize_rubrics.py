@@ -4,6 +4,8 @@ from pydantic import BaseModel, Field
 from typing import List, Any
 import json
 
+from docs_parser.json_io import load_json
+
 class Rubric(BaseModel):
     requirements: str = Field(description="The requirements of the rubric")
     weight: int = Field(description="The weight that represents its importance: 3: Essential rubric, 2: Important but not essential, 1: Non-essential or supportive")
@@ -127,8 +129,7 @@ def get_graph_statistics(graph: nx.DiGraph) -> dict:
     return stats
 
 def visualize_rubrics(path: str) -> None:
-    with open(path, "r") as f:
-        rubrics = json.load(f)
+    rubrics = load_json(path)
 
     if isinstance(rubrics, dict) and "rubrics" in rubrics:
         rubrics = rubrics["rubrics"]
@@ -153,10 +154,9 @@ if __name__ == "__main__":
     parser.add_argument("--rubrics-path", type=str, default="ragflow/rubrics.json")
     args = parser.parse_args()
     
-    with open(args.rubrics_path, "r") as f:
-        rubrics = json.load(f)
-        if isinstance(rubrics, dict) and "rubrics" in rubrics:
-            rubrics = rubrics["rubrics"]
+    rubrics = load_json(args.rubrics_path)
+    if isinstance(rubrics, dict) and "rubrics" in rubrics:
+        rubrics = rubrics["rubrics"]
     
     root = Rubric(
         requirements="root rubric",
@@ -19,13 +19,26 @@ NC='\033[0m' # No Color
 DEFAULT_REPO_NAME=""
 DEFAULT_REFERENCE=""
 
+# Existing variant of a JSON artifact: name, name.zst or name.gz (see docs_parser/json_io.py)
+json_variant() {
+    local path="$1"
+    local variant
+    for variant in "$path" "$path.zst" "$path.gz"; do
+        if [[ -f "$variant" ]]; then
+            echo "$variant"
+            return 0
+        fi
+    done
+    return 1
+}
+
 detect_reference_folder() {
     local data_dir="$1"
     local preferred=("codewiki" "deepwiki" "original")
 
     for candidate in "${preferred[@]}"; do
         local candidate_path="$data_dir/$candidate/docs_tree.json"
-        if [[ -f "$candidate_path" ]]; then
+        if json_variant "$candidate_path" > /dev/null; then
             echo "$candidate"
             return 0
         fi
@@ -34,7 +47,7 @@ detect_reference_folder() {
     for entry in "$data_dir"/*; do
         if [[ -d "$entry" ]]; then
             local docs_tree_path="$entry/docs_tree.json"
-            if [[ -f "$docs_tree_path" ]]; then
+            if json_variant "$docs_tree_path" > /dev/null; then
                 echo "$(basename "$entry")"
                 return 0
             fi
@@ -214,7 +227,7 @@ fi
 
 # Check if docs tree exists
 DOCS_TREE="$DATA_DIR/$REFERENCE/docs_tree.json"
-if [[ ! -f "$DOCS_TREE" ]]; then
+if ! json_variant "$DOCS_TREE" > /dev/null; then
     print_error "Documentation tree not found: $DOCS_TREE"
     print_error "Please run the documentation parsing step first"
     exit 1
@@ -345,7 +358,7 @@ print_status "Results location: $DATA_DIR"
 # List output files
 echo ""
 print_status "Generated files:"
-for file in "$DATA_DIR"/*.json; do
+for file in "$DATA_DIR"/*.json "$DATA_DIR"/*.json.zst "$DATA_DIR"/*.json.gz; do
     if [[ -f "$file" ]]; then
         filename=$(basename "$file")
         filesize=$(du -h "$file" | cut -f1)
@@ -355,10 +368,10 @@ done
 
 # Display final scores if available
 echo ""
-if [[ -f "$DATA_DIR/evaluation_results_combined.json" ]]; then
-    print_status "Combined evaluation results are available in evaluation_results_combined.json"
+if json_variant "$DATA_DIR/evaluation_results_combined.json" > /dev/null; then
+    print_status "Combined evaluation results are available in $(basename "$(json_variant "$DATA_DIR/evaluation_results_combined.json")")"
 else
-    result_file=$(find "$DATA_DIR" -name "evaluation_results_*.json" | head -1)
+    result_file=$(find "$DATA_DIR" \( -name "evaluation_results_*.json" -o -name "evaluation_results_*.json.zst" -o -name "evaluation_results_*.json.gz" \) | head -1)
     if [[ -f "$result_file" ]]; then
         filename=$(basename "$result_file")
         print_status "Evaluation results are available in $filename"
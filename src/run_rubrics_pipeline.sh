@@ -23,6 +23,19 @@ DEFAULT_TEMPERATURE=0.1
 DEFAULT_MAX_RETRIES=3
 DEFAULT_DOCS_SOURCE=""
 
+# Existing variant of a JSON artifact: name, name.zst or name.gz (see docs_parser/json_io.py)
+json_variant() {
+    local path="$1"
+    local variant
+    for variant in "$path" "$path.zst" "$path.gz"; do
+        if [[ -f "$variant" ]]; then
+            echo "$variant"
+            return 0
+        fi
+    done
+    return 1
+}
+
 # Detect docs folder helper
 detect_docs_source() {
     local data_dir="$1"
@@ -30,7 +43,7 @@ detect_docs_source() {
 
     for candidate in "${preferred[@]}"; do
         local candidate_path="$data_dir/$candidate/docs_tree.json"
-        if [[ -f "$candidate_path" ]]; then
+        if json_variant "$candidate_path" > /dev/null; then
             echo "$candidate"
             return 0
         fi
@@ -39,7 +52,7 @@ detect_docs_source() {
     for entry in "$data_dir"/*; do
         if [[ -d "$entry" ]]; then
             local docs_tree_path="$entry/docs_tree.json"
-            if [[ -f "$docs_tree_path" ]]; then
+            if json_variant "$docs_tree_path" > /dev/null; then
                 echo "$(basename "$entry")"
                 return 0
             fi
@@ -195,7 +208,7 @@ fi
 
 # Check if docs tree exists for the selected folder
 DOCS_TREE="$DATA_DIR/$DOCS_SOURCE/docs_tree.json"
-if [[ ! -f "$DOCS_TREE" ]]; then
+if ! json_variant "$DOCS_TREE" > /dev/null; then
     print_error "Documentation tree not found: $DOCS_TREE"
     print_error "Please run the documentation parsing step first"
     exit 1
@@ -292,7 +305,7 @@ if [[ "$VISUALIZE" == true ]]; then
     
     # Check if visualization script exists and combined rubrics exists
     COMBINED_RUBRICS="$DATA_DIR/rubrics/combined_rubrics.json"
-    if [[ -f "rubrics_generator/visualize_rubrics.py" ]] && [[ -f "$COMBINED_RUBRICS" ]]; then
+    if [[ -f "rubrics_generator/visualize_rubrics.py" ]] && json_variant "$COMBINED_RUBRICS" > /dev/null; then
         python rubrics_generator/visualize_rubrics.py --rubrics-path "$COMBINED_RUBRICS"
         if [[ $? -eq 0 ]]; then
             print_status "✓ Visualization completed"
@@ -303,7 +316,7 @@ if [[ "$VISUALIZE" == true ]]; then
         if [[ ! -f "rubrics_generator/visualize_rubrics.py" ]]; then
             print_warning "Visualization script not found: rubrics_generator/visualize_rubrics.py"
         fi
-        if [[ ! -f "$COMBINED_RUBRICS" ]]; then
+        if ! json_variant "$COMBINED_RUBRICS" > /dev/null; then
             print_warning "Combined rubrics not found: $COMBINED_RUBRICS"
         fi
     fi
@@ -318,7 +331,7 @@ echo ""
 print_status "Generated files:"
 RUBRICS_DIR="$DATA_DIR/rubrics"
 if [[ -d "$RUBRICS_DIR" ]]; then
-    for file in "$RUBRICS_DIR"/*.json; do
+    for file in "$RUBRICS_DIR"/*.json "$RUBRICS_DIR"/*.json.zst "$RUBRICS_DIR"/*.json.gz; do
         if [[ -f "$file" ]]; then
             filename=$(basename "$file")
             filesize=$(du -h "$file" | cut -f1)
@@ -332,16 +345,15 @@ fi
 # Display final status
 echo ""
 COMBINED_RUBRICS="$DATA_DIR/rubrics/combined_rubrics.json"
-if [[ -f "$COMBINED_RUBRICS" ]]; then
-    print_status "Combined rubrics are available in combined_rubrics.json"
+if json_variant "$COMBINED_RUBRICS" > /dev/null; then
+    print_status "Combined rubrics are available in $(basename "$(json_variant "$COMBINED_RUBRICS")")"
     
     # Try to extract basic stats from the combined rubrics
     if command -v python3 &> /dev/null; then
         stats=$(python3 -c "
-import json
 try:
-    with open('$COMBINED_RUBRICS', 'r') as f:
-        data = json.load(f)
+    from docs_parser.json_io import load_json
+    data = load_json('$COMBINED_RUBRICS')
     if 'combination_metadata' in data and 'statistics' in data['combination_metadata']:
         stats = data['combination_metadata']['statistics']
         print(f\"Total items: {stats.get('total_items', 'N/A')}\")
@@ -355,7 +367,7 @@ except Exception as e:
         fi
     fi
 else
-    result_file=$(find "$RUBRICS_DIR" -name "*.json" | head -1)
+    result_file=$(find "$RUBRICS_DIR" \( -name "*.json" -o -name "*.json.zst" -o -name "*.json.gz" \) | head -1)
     if [[ -f "$result_file" ]]; then
         filename=$(basename "$result_file")
         print_status "Rubrics are available in $filename"
@@ -1,5 +1,5 @@
 """Shared tooling (docs navigator, agent dependencies, etc.)."""
 
-from .docs_navigator import AgentDeps, docs_navigator_tool
+from .docs_navigator import AgentDeps, docs_navigator_tool, docs_search_tool
 
-__all__ = ["AgentDeps", "docs_navigator_tool"]
+__all__ = ["AgentDeps", "docs_navigator_tool", "docs_search_tool"]
@@ -0,0 +1,161 @@
+import heapq
+import math
+import re
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from docs_parser.docs_blocks import expand_blocks
+from tools.docs_render import is_mapping, is_sequence
+
+TOKEN_RE = re.compile(r"\w+")
+PHRASE_RE = re.compile(r'"([^"]+)"')
+SKIPPED_KEYS = {"title", "description", "content", "subpages", "metadata"}
+
+
+def tokenize(text: str) -> List[str]:
+    return [token.lower() for token in TOKEN_RE.findall(text)]
+
+
+def parse_query_terms(query: str) -> Tuple[List[str], List[List[str]]]:
+    """Split a query into free terms and quoted phrases (both tokenized)."""
+    phrases = [tokenize(p) for p in PHRASE_RE.findall(query)]
+    return tokenize(PHRASE_RE.sub(" ", query)), [p for p in phrases if p]
+
+
+class DocsSearchIndex:
+    """
+    Inverted index with BM25 ranking over the text sections of structured_docs.
+
+    Every title, description and string leaf is one section. Postings keep token
+    positions so quoted phrases can be matched exactly.
+    """
+
+    def __init__(self, structured_docs: Any, k1: float = 1.2, b: float = 0.75, blocks: Optional[Dict[str, str]] = None):
+        self.k1 = k1
+        self.b = b
+        self.blocks = blocks
+        self.paths: List[List[Any]] = []
+        self.match_types: List[str] = []
+        self.texts: List[str] = []
+        self.lengths: List[int] = []
+        self.postings: Dict[str, Dict[int, List[int]]] = defaultdict(dict)
+        self._collect(structured_docs, [])
+        avg_length = sum(self.lengths) / len(self.lengths) if self.lengths else 1.0
+        # BM25 length normalisation is fixed per section, so compute it once.
+        self.norms = [k1 * (1 - b + b * length / (avg_length or 1.0)) for length in self.lengths]
+
+    def _add(self, path: List[Any], match_type: str, text: str) -> None:
+        doc_id = len(self.texts)
+        text = expand_blocks(text, self.blocks)
+        tokens = tokenize(text)
+        self.paths.append(path)
+        self.match_types.append(match_type)
+        self.texts.append(text)
+        self.lengths.append(len(tokens))
+        for position, token in enumerate(tokens):
+            self.postings[token].setdefault(doc_id, []).append(position)
+
+    def _collect(self, node: Any, path: List[Any]) -> None:
+        if is_mapping(node):
+            if isinstance(node.get("title"), str):
+                self._add(path + ["title"], "title", node["title"])
+            if isinstance(node.get("description"), str):
+                self._add(path + ["description"], "description", node["description"])
+            if "content" in node:
+                self._collect(node["content"], path + ["content"])
+            if is_sequence(node.get("subpages")):
+                for i, subpage in enumerate(node["subpages"]):
+                    self._collect(subpage, path + ["subpages", i])
+            for key, value in node.items():
+                if key not in SKIPPED_KEYS:
+                    self._collect(value, path + [key])
+        elif is_sequence(node):
+            for i, item in enumerate(node):
+                self._collect(item, path + [i])
+        elif isinstance(node, str) and node != "<detail_content>":
+            self._add(path, "content", node)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def _idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.texts) - df + 0.5) / (df + 0.5))
+
+    def _has_phrase(self, doc_id: int, terms: List[str]) -> bool:
+        starts = self.postings[terms[0]].get(doc_id, [])
+        following = [set(self.postings[t].get(doc_id, ())) for t in terms[1:]]
+        return any(all(start + i + 1 in positions for i, positions in enumerate(following)) for start in starts)
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        match_types: Optional[set] = None,
+        snippet_chars: int = 240,
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank sections for a query. Quoted parts ("event stream") must match as phrases;
+        the remaining terms are scored with BM25 (any-term match).
+        """
+        free_terms, phrases = parse_query_terms(query)
+        if any(t not in self.postings for p in phrases for t in p):
+            return []
+        terms = [t for t in dict.fromkeys(free_terms + [t for p in phrases for t in p]) if t in self.postings]
+        if not terms:
+            return []
+
+        allowed = None
+        if phrases:
+            # Phrase terms must co-occur: intersect their postings, rarest first.
+            phrase_terms = sorted({t for p in phrases for t in p}, key=lambda t: len(self.postings[t]))
+            allowed = set(self.postings[phrase_terms[0]])
+            for term in phrase_terms[1:]:
+                allowed &= self.postings[term].keys()
+            allowed = {d for d in allowed if all(self._has_phrase(d, p) for p in phrases)}
+            if match_types is not None:
+                allowed = {d for d in allowed if self.match_types[d] in match_types}
+
+        scores: Dict[int, float] = defaultdict(float)
+        norms = self.norms
+        for term in terms:
+            boost = self._idf(term) * (self.k1 + 1)
+            for doc_id, positions in self.postings[term].items():
+                if allowed is not None and doc_id not in allowed:
+                    continue
+                tf = len(positions)
+                scores[doc_id] += boost * tf / (tf + norms[doc_id])
+
+        if match_types is not None and allowed is None:
+            scored = ((d, score) for d, score in scores.items() if self.match_types[d] in match_types)
+        else:
+            scored = scores.items()
+        ranked = heapq.nlargest(top_k, scored, key=lambda item: item[1])
+        return [
+            {
+                "path": self.paths[doc_id],
+                "match_type": self.match_types[doc_id],
+                "score": round(score, 4),
+                "snippet": self.snippet(doc_id, terms, snippet_chars),
+            }
+            for doc_id, score in ranked
+        ]
+
+    def snippet(self, doc_id: int, terms: List[str], width: int = 240) -> str:
+        """Return a whitespace-collapsed window of the section text around its first query term."""
+        text = self.texts[doc_id]
+        if len(text) <= width:
+            return " ".join(text.split())
+        wanted = set(terms)
+        start = 0
+        for match in TOKEN_RE.finditer(text):
+            if match.group().lower() in wanted:
+                start = max(match.start() - width // 4, 0)
+                break
+        end = min(start + width, len(text))
+        start = max(end - width, 0)
+        if start > 0:
+            start = text.rfind(" ", 0, start) + 1
+        prefix = "..." if start > 0 else ""
+        suffix = "..." if end < len(text) else ""
+        return prefix + " ".join(text[start:end].split()) + suffix
@@ -1,11 +1,29 @@
+import asyncio
 import json
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 import os
+import weakref
+from contextlib import nullcontext
 from dataclasses import dataclass
 
 from pydantic_ai import RunContext, Tool
 
-from llm_proxy import truncate_tokens
+import config
+from docs_parser.docs_blocks import expand_blocks, load_blocks
+from docs_parser.doc_tree import NODE_IDS_FILENAME
+from docs_parser.docs_chunks import POSITIONAL_KEYS, load_chunk_index
+from docs_parser.docs_shards import PAGES_DIRNAME, PageShards, shards_are_current, write_page_shards
+from docs_parser.json_io import json_exists, load_json, resolve_json_path
+from tools.docs_index import DocsSearchIndex
+from tools.docs_paths import DocsPathIndex
+from tools.docs_render import RenderCache, TokenBudgetWriter, compute_token_counts, is_mapping, is_sequence, render_budgeted
+from tools.docs_store import DocsStore
+
+# Shared by every navigator in the process, so concurrent models reuse renders.
+RENDER_CACHE = RenderCache(config.RENDER_CACHE_SIZE)
+
+# Upper bound on docs_search results, whatever top_k the model asks for.
+MAX_SEARCH_RESULTS = 50
 
 
 class DocsNavigator:
@@ -14,32 +32,119 @@ class DocsNavigator:
     Allows agents to retrieve specific content nodes from parsed documentation.
     """
     
-    def __init__(self, docs_tree_path: str, structured_docs_path: str):
+    def __init__(self, docs_tree_path: str, structured_docs_path: str, backend: Optional[str] = None):
         """
         Initialize the DocsNavigator with paths to the tree and structured docs files.
         
         Args:
             docs_tree_path: Path to the docs_tree.json file
             structured_docs_path: Path to the structured_docs.json file
+            backend: "json" to load the files, "store" to memory-map the compiled
+                     docs_store.bin, "pages" to read page shards on demand
+                     (defaults to config.DOCS_BACKEND)
         """
         self.docs_tree_path = docs_tree_path
         self.structured_docs_path = structured_docs_path
+        self.backend = backend or config.DOCS_BACKEND
         self.docs_tree = None
         self.structured_docs = None
+        self.store = None
+        self.shards = None
+        self.blocks = {}
+        self._search_index = None
+        self._path_index = None
+        self._semantic_index = None
+        self._node_ids = None
+        self._chunk_hashes = None
+        self._block_ids = {}
+        # asyncio.Lock binds to the loop it is first contended in; the navigator is
+        # shared across asyncio.run calls, so keep one lock per event loop
+        self._semantic_locks = weakref.WeakKeyDictionary()
+        self.token_counts = {}
         self._load_documents()
+        stat = os.stat(resolve_json_path(structured_docs_path))
+        # Identifies this exact version of the docs in render cache keys.
+        self.source_key = (os.path.abspath(structured_docs_path), stat.st_mtime_ns, stat.st_size)
     
     def _load_documents(self):
-        """Load the documentation files into memory."""
+        """Load the documentation files into memory, or map the shared store."""
+        # Repeated paragraphs stored once by the parser's dedup pass.
+        self.blocks = load_blocks(os.path.dirname(self.structured_docs_path))
+        self._block_ids = {text: block_id for block_id, text in self.blocks.items()}
+        if self.backend == "store":
+            # Store views carry precomputed token counts, nothing to count here.
+            self.store = DocsStore.open_or_build(self.docs_tree_path, self.structured_docs_path)
+            self.docs_tree = self.store.docs_tree
+            self.structured_docs = self.store.structured_docs
+            return
+
+        pages_dir = os.path.join(os.path.dirname(self.structured_docs_path), PAGES_DIRNAME)
         try:
-            with open(self.docs_tree_path, 'r', encoding='utf-8') as f:
-                self.docs_tree = json.load(f)
+            self.docs_tree = load_json(self.docs_tree_path)
+
+            if self.backend == "pages":
+                if not shards_are_current(pages_dir, self.structured_docs_path):
+                    # Not written by this parse (shards are opt-in): build them once now.
+                    write_page_shards(load_json(self.structured_docs_path), os.path.dirname(pages_dir), self.blocks)
+                self.shards = PageShards(pages_dir, config.PAGE_CACHE_SIZE, self.blocks)
+                self.structured_docs = self.shards.root
+                self.token_counts = self.shards.counts
+                return
             
-            with open(self.structured_docs_path, 'r', encoding='utf-8') as f:
-                self.structured_docs = json.load(f)
+            self.structured_docs = load_json(self.structured_docs_path)
         except FileNotFoundError as e:
             raise FileNotFoundError(f"Documentation files not found: {e}")
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON in documentation files: {e}")
+
+        self.token_counts = compute_token_counts(self.structured_docs, self.blocks)
+
+    def _plain_docs(self) -> Any:
+        """structured_docs for whole-tree passes; shards are read from disk, not through their LRU."""
+        return self.shards.read_tree() if self.shards is not None else self.structured_docs
+
+    @property
+    def search_index(self) -> DocsSearchIndex:
+        """BM25 index, built on the first search so navigation-only workers skip it."""
+        if self._search_index is None:
+            self._search_index = DocsSearchIndex(self._plain_docs(), blocks=self.blocks)
+        return self._search_index
+
+    @property
+    def node_ids(self) -> Dict[str, List[Any]]:
+        """Node id -> path table from the parser; empty for docs parsed before ids existed."""
+        if self._node_ids is None:
+            ids_path = os.path.join(os.path.dirname(self.structured_docs_path), NODE_IDS_FILENAME)
+            try:
+                self._node_ids = load_json(ids_path)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._node_ids = {}
+        return self._node_ids
+
+    @property
+    def chunk_hashes(self) -> Dict[Tuple[Any, ...], str]:
+        """Navigation path -> content hash (chunk_index.json); empty for docs parsed before hashes existed."""
+        if self._chunk_hashes is None:
+            index = load_chunk_index(os.path.dirname(self.structured_docs_path))
+            self._chunk_hashes = {
+                tuple(path): index[node_id] for node_id, path in self.node_ids.items() if node_id in index
+            }
+        return self._chunk_hashes
+
+    def expand_node_id(self, path: Union[str, List[Any]]) -> List[Any]:
+        """Turn "n12" or ["n12", "Overview"] into the full navigation path."""
+        if isinstance(path, str):
+            path = [path]
+        if path and isinstance(path[0], str) and path[0] in self.node_ids:
+            return self.node_ids[path[0]] + list(path[1:])
+        return path
+
+    @property
+    def path_index(self) -> DocsPathIndex:
+        """Heading index for correcting bad paths, built on the first miss."""
+        if self._path_index is None:
+            self._path_index = DocsPathIndex(self.structured_docs, source=self._plain_docs())
+        return self._path_index
     
     def list_sections(self, path: Optional[List[str]] = None) -> List[Dict[str, str]]:
         """
@@ -55,7 +160,7 @@ class DocsNavigator:
         current_node = self._navigate_to_path(self.docs_tree, path or [])
         sections = []
         
-        if isinstance(current_node, dict):
+        if is_mapping(current_node):
             if 'subpages' in current_node:
                 for i, subpage in enumerate(current_node['subpages']):
                     sections.append({
@@ -68,7 +173,7 @@ class DocsNavigator:
             
             if 'content' in current_node:
                 content = current_node['content']
-                if isinstance(content, dict):
+                if is_mapping(content):
                     for key, value in content.items():
                         sections.append({
                             'key': key,
@@ -80,201 +185,314 @@ class DocsNavigator:
         
         return sections
     
-    def get_content(self, path: List[str]) -> Dict[str, Any]:
+    def get_content(self, path: Union[str, List[Any]]) -> Dict[str, Any]:
         """
         Retrieve the actual content for a specific path in the documentation.
         
         Args:
-            path: List of keys/indices to navigate to the desired content
-                  (e.g., ['Usage', 'How To', 0, 'content', 'Getting Started'])
+            path: Node id from docs_tree (e.g., 'n12') or list of keys/indices to navigate
+                  to the desired content (e.g., ['Usage', 'How To', 0, 'content', 'Getting Started'])
         
         Returns:
-            Dictionary containing the content and metadata
+            Dictionary containing the content and metadata; `resolved_path` is set
+            when an invalid path was corrected to the closest valid one
         """
         try:
             # Navigate in the structured docs to get actual content
-            content_node = self._navigate_to_path(self.structured_docs, path)
+            content_node, key, resolved = self._lookup(path)
             
             # Also get the tree structure for context
-            tree_node = self._navigate_to_path(self.docs_tree, path)
+            tree_node = self._navigate_to_path(self.docs_tree, list(key))
             
-            return {
+            result = {
                 # 'path': path,
                 'content': content_node,
                 'tree_structure': tree_node,
                 'content_type': type(content_node).__name__
             }
+            if resolved:
+                result['resolved_path'] = list(key)
+            return result
         except (KeyError, IndexError, TypeError) as e:
             return {
                 # 'path': path,
-                'error': f"Content not found at path {' -> '.join(map(str, path))}: {str(e)}",
+                'error': f"Content not found at path {_path_label(path)}: {str(e)}",
                 'content': None
             }
     
-    def search_content(self, query: str, search_titles: bool = True, search_descriptions: bool = True) -> List[Dict[str, Any]]:
+    def search_content(
+        self,
+        query: str,
+        search_titles: bool = True,
+        search_descriptions: bool = True,
+        top_k: int = 20,
+    ) -> List[Dict[str, Any]]:
         """
-        Search for content containing the specified query string.
+        Search the documentation with BM25 ranking over the inverted index.
         
         Args:
-            query: The text to search for
+            query: Free-text query; quoted parts ("event stream") must match as phrases
             search_titles: Whether to search in section titles
             search_descriptions: Whether to search in section descriptions
+            top_k: Maximum number of results to return
         
         Returns:
-            List of matching sections with their paths and content previews
+            Ranked list of matching sections with their paths and snippets
         """
+        match_types = {"content"}
+        if search_titles:
+            match_types.add("title")
+        if search_descriptions:
+            match_types.add("description")
+
         results = []
-        query_lower = query.lower()
+        for hit in self.search_index.search(query, top_k=top_k, match_types=match_types):
+            results.append({
+                'path': hit['path'],
+                'match_type': hit['match_type'],
+                'score': hit['score'],
+                'content': hit['snippet'],
+                'context': f"{hit['match_type'].title()} at {' -> '.join(map(str, hit['path']))}"
+            })
+        return results
+    
+    async def semantic_search(self, query: str, top_k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Rank content sections by embedding similarity to the query.
         
-        def _search_recursive(node: Any, current_path: List[str]):
-            if isinstance(node, dict):
-                # Check title and description
-                if search_titles and 'title' in node:
-                    title = str(node['title']).lower()
-                    if query_lower in title:
-                        results.append({
-                            'path': current_path + ['title'],
-                            'match_type': 'title',
-                            'content': node['title'],
-                            'context': f"Title: {node['title']}"
-                        })
-                
-                if search_descriptions and 'description' in node:
-                    desc = str(node['description']).lower()
-                    if query_lower in desc:
-                        results.append({
-                            'path': current_path + ['description'],
-                            'match_type': 'description',
-                            'content': node['description'],
-                            'context': f"Description: {node['description'][:200]}..."
-                        })
-                
-                # Search in content
-                if 'content' in node:
-                    _search_recursive(node['content'], current_path + ['content'])
-                
-                # Search in subpages
-                if 'subpages' in node:
-                    for i, subpage in enumerate(node['subpages']):
-                        _search_recursive(subpage, current_path + ['subpages', i])
-                
-                # Search in other dict items
-                for key, value in node.items():
-                    if key not in ['title', 'description', 'content', 'subpages', 'metadata']:
-                        _search_recursive(value, current_path + [key])
-            
-            elif isinstance(node, list):
-                for i, item in enumerate(node):
-                    _search_recursive(item, current_path + [i])
-            
-            elif isinstance(node, str) and node != '<detail_content>':
-                if query_lower in node.lower():
-                    results.append({
-                        'path': current_path,
-                        'match_type': 'content',
-                        'content': node[:500] + '...' if len(node) > 500 else node,
-                        'context': f"Content at {' -> '.join(map(str, current_path))}"
-                    })
+        Section vectors are embedded on first use (or loaded from semantic_index.npz
+        next to the docs) and queried with one matrix product. Needs numpy.
         
-        _search_recursive(self.structured_docs, [])
+        Returns:
+            Ranked sections in the same shape as search_content
+        """
+        from llm_proxy import get_embeddings
+        from tools.docs_semantic import CACHE_FILENAME, DocsSemanticIndex
+
+        loop = asyncio.get_running_loop()
+        lock = self._semantic_locks.get(loop)
+        if lock is None:
+            lock = self._semantic_locks[loop] = asyncio.Lock()
+        async with lock:
+            if self._semantic_index is None:
+                self._semantic_index = await DocsSemanticIndex.build(
+                    self.search_index,
+                    cache_path=os.path.join(os.path.dirname(self.structured_docs_path), CACHE_FILENAME),
+                )
+        [query_vector] = await get_embeddings([query])
+
+        results = []
+        for hit in self._semantic_index.search(query_vector, top_k=top_k):
+            text = " ".join(hit['text'].split())
+            results.append({
+                'path': hit['path'],
+                'match_type': 'semantic',
+                'score': hit['score'],
+                'content': text[:240] + ("..." if len(text) > 240 else ""),
+                'context': f"Semantic match at {' -> '.join(map(str, hit['path']))}"
+            })
         return results
     
-    def _navigate_to_path(self, data: Any, path: List[str], max_depth: int = 15) -> Any:
+    def _navigate_to_path(self, data: Any, path: List[str]) -> Any:
         """
-        Navigate to a specific path in the data structure and limit content depth from the final node.
+        Navigate to a specific path in the data structure.
         
         Args:
             data: The data structure to navigate
             path: List of keys/indices to follow
-            max_depth: Maximum depth of content to return from the final node (default: 3)
         
         Returns:
-            The node at the specified path, with content limited to max_depth levels
+            The live node at the specified path (not a copy; do not mutate it)
         """
+        return self._resolve_path(data, path)[0]
+
+    def _resolve_path(self, data: Any, path: List[Any]) -> Tuple[Any, Tuple[Any, ...]]:
+        """Navigate like _navigate_to_path and also return the normalized path (list indices as ints)."""
         current = data
+        normalized = []
         
         # Navigate to the full path
         for key in path:
-            if isinstance(current, dict):
+            if is_mapping(current):
                 current = current[key]
-            elif isinstance(current, list):
+            elif is_sequence(current):
                 try:
-                    index = int(key)
-                    current = current[index]
+                    key = int(key)
+                    current = current[key]
                 except (ValueError, IndexError):
                     raise KeyError(f"Invalid list index: {key}")
             else:
                 raise KeyError(f"Cannot navigate further from {type(current)} with key {key}")
+            normalized.append(key)
         
-        # Limit the depth of the content from this final node
-        # max_depth = 3 if len(path) <=2 else len(path)*2
-        return self._limit_content_depth(current, max_depth)
-    
-    def _limit_content_depth(self, data: Any, max_depth: int, current_depth: int = 0) -> Any:
+        return current, tuple(normalized)
+
+    def _lookup(self, path: Union[str, List[Any]]) -> Tuple[Any, Tuple[Any, ...], bool]:
         """
-        Recursively limit the depth of a data structure.
-        
-        Args:
-            data: The data to limit
-            max_depth: Maximum allowed depth
-            current_depth: Current recursion depth
+        Navigate to `path` (node ids are expanded first), falling back to the closest valid path.
         
-        Returns:
-            Data structure limited to max_depth levels
+        Returns (node, normalized path, whether the path was corrected) and re-raises
+        the navigation error when nothing close enough exists.
         """
-        if current_depth >= max_depth:
-            if isinstance(data, dict):
-                return {"...": f"<content truncated at depth {max_depth}>"}
-            elif isinstance(data, list):
-                return [f"<list with {len(data)} items truncated at depth {max_depth}>"]
-            else:
-                return data
+        path = self.expand_node_id(path)
+        try:
+            node, key = self._resolve_path(self.structured_docs, path)
+            return node, key, False
+        except (KeyError, IndexError, TypeError):
+            resolved = self.path_index.resolve(path)
+            if resolved is None:
+                raise
+        node, key = self._resolve_path(self.structured_docs, list(resolved))
+        return node, key, True
+
+    def render_paths(
+        self,
+        paths: List[Union[str, List[Any]]],
+        max_tokens: Optional[int] = None,
+        max_depth: int = 15,
+        fmt: str = "json",
+    ) -> str:
+        """
+        Render the content at several paths into one tool response.
         
-        if isinstance(data, dict):
-            result = {}
-            for key, value in data.items():
-                result[key] = self._limit_content_depth(value, max_depth, current_depth + 1)
-            return result
-        elif isinstance(data, list):
-            return [self._limit_content_depth(item, max_depth, current_depth + 1) for item in data]
-        else:
-            return data
+        Nodes are streamed straight from the loaded documents into a shared token
+        budget, so the cost follows the size of the output rather than the subtree.
+        Each remaining path gets an equal share of the budget left; a node larger
+        than its share is rendered breadth first (all headings, then excerpts).
+        Rendered blocks are cached in RENDER_CACHE by (content hash, share), or by
+        (docs, path, share) for nodes without a hash in chunk_index.json. Invalid
+        paths are corrected to the closest valid node and the response says so.
+        Deduplicated content blocks are printed once per response, then referenced.
+        
+        Args:
+            paths: Node ids or navigation paths to render
+            max_tokens: Token budget for the whole response (defaults to config)
+            max_depth: Maximum depth rendered below each target node
+            fmt: "json" or "markdown" (compact: keys as headings, raw text values)
+        """
+        writer = TokenBudgetWriter(max_tokens or config.MAX_TOKENS_PER_TOOL_RESPONSE)
+        printed = set()
+        # shards loaded for this response stay in memory (with their counts) until it is done
+        with self.shards.pinned() if self.shards is not None else nullcontext():
+            for i, path in enumerate(paths):
+                writer.write("--------------------------------\n")
+                writer.write(f"Path: {path}\n")
+                try:
+                    node, key, resolved = self._lookup(path)
+                except (KeyError, IndexError, TypeError) as e:
+                    writer.write("Content: \n")
+                    writer.write("null\n")
+                    writer.write(f"Error: Content not found at path {_path_label(path)}: {str(e)}\n")
+                else:
+                    if resolved:
+                        writer.write(f"Resolved path: {json.dumps(list(key), ensure_ascii=False)} (closest match; use it in later calls)\n")
+                    writer.write("Content: \n")
+                    writer.flush()
+                    share = max(writer.remaining // (len(paths) - i) - 50, 0)
+                    content_hash = self.chunk_hashes.get(key)
+                    # pages render their positional fields, so their hash alone does not identify the output
+                    positional = is_mapping(node) and any(k in node for k in POSITIONAL_KEYS)
+                    node_key = ("chunk", content_hash, key if positional else None) if content_hash else (self.source_key, key)
+                    cache_key = (node_key, share, max_depth, fmt)
+                    # Output after a printed content block depends on it, so skip the cache then.
+                    rendered = None if printed else RENDER_CACHE.get(cache_key)
+                    if rendered is None:
+                        block_printed = set(printed)
+                        text = (
+                            (lambda t, shown_chars=None: expand_blocks(t, self.blocks, block_printed, shown_chars))
+                            if self.blocks
+                            else None
+                        )
+                        block_writer = TokenBudgetWriter(writer.remaining)
+                        render_budgeted(node, block_writer, self.token_counts, share, max_depth=max_depth, fmt=fmt, text=text)
+                        # Printed blocks are kept as text: block ids differ between docs versions.
+                        rendered = (
+                            block_writer.getvalue(notice=False),
+                            writer.remaining - block_writer.remaining,
+                            frozenset(self.blocks[block_id] for block_id in block_printed - printed),
+                        )
+                        # A block cut by the overall budget depends on what came before it, and
+                        # back-references name this version's block ids.
+                        shareable = not content_hash or "[repeated block " not in rendered[0]
+                        if not block_writer.exhausted and not printed and shareable:
+                            RENDER_CACHE.put(cache_key, rendered)
+                    printed |= {self._block_ids[text] for text in rendered[2] if text in self._block_ids}
+                    if not writer.write_counted(rendered[0], rendered[1]):
+                        break
+                    writer.write("\n")
+                if not writer.write("--------------------------------\n"):
+                    break
+        return writer.getvalue()
+
+
+def _path_label(path: Union[str, List[Any]]) -> str:
+    return path if isinstance(path, str) else ' -> '.join(map(str, path))
+
+
+# One navigator per docs source in this process: abspath -> (file signature, navigator).
+_NAVIGATORS: Dict[str, Tuple[Tuple[Any, ...], DocsNavigator]] = {}
+
+
+def _docs_signature(tree_path: str, structured_path: str) -> Tuple[Any, ...]:
+    tree_stat = os.stat(resolve_json_path(tree_path))
+    structured_stat = os.stat(resolve_json_path(structured_path))
+    return (
+        tree_stat.st_mtime_ns, tree_stat.st_size,
+        structured_stat.st_mtime_ns, structured_stat.st_size,
+        config.DOCS_BACKEND,
+    )
+
+
+def get_docs_navigator(docs_path: str) -> DocsNavigator:
+    """
+    Return the shared navigator for a docs folder, loading it on first use.
+    
+    The navigator is rebuilt when either JSON file changes size or mtime, so a
+    long-lived process parses each docs set once and still picks up re-parses.
+    """
+    key = os.path.abspath(docs_path)
+    tree_path = os.path.join(key, "docs_tree.json")
+    structured_path = os.path.join(key, "structured_docs.json")
+    signature = _docs_signature(tree_path, structured_path)
+    cached = _NAVIGATORS.get(key)
+    if cached is None or cached[0] != signature:
+        _NAVIGATORS[key] = (signature, DocsNavigator(tree_path, structured_path))
+    return _NAVIGATORS[key][1]
 
 
 @dataclass
 class AgentDeps:
-    docs_navigator: DocsNavigator
+    docs_path: str
+    output_format: str
 
-    def __init__(self, docs_path: str):
+    def __init__(self, docs_path: str, output_format: str = "json"):
 
         tree_path = os.path.join(docs_path, "docs_tree.json")
         structured_path = os.path.join(docs_path, "structured_docs.json")
         
-        if not os.path.exists(tree_path):
+        if not json_exists(tree_path):
             raise FileNotFoundError(f"docs_tree.json not found at {tree_path}")
-        if not os.path.exists(structured_path):
+        if not json_exists(structured_path):
             raise FileNotFoundError(f"structured_docs.json not found at {structured_path}")
         
-        self.docs_navigator = DocsNavigator(tree_path, structured_path)
+        self.docs_path = docs_path
+        self.output_format = output_format
+
+    @property
+    def docs_navigator(self) -> DocsNavigator:
+        """Loaded on the first tool call and shared through the registry."""
+        return get_docs_navigator(self.docs_path)
 
 
-async def run_docs_navigator(ctx: RunContext[AgentDeps], paths: List[List[Any]]) -> str:
+async def run_docs_navigator(ctx: RunContext[AgentDeps], paths: List[Union[str, List[Any]]]) -> str:
     """
     Navigate to specific paths in the documentation tree and return the content.
     
     Args:
-        paths: List of lists of keys/indices to navigate to the desired content (e.g., [['subpages', 2, 'subpages', 0, 'content', 'Getting Started'], ['subpages', 2, 'subpages', 1, 'content', 'Getting Started']]). Each list is a path to a specific content node in the documentation tree.
+        paths: Node ids from the documentation tree (e.g., ['n12', 'n40']) or lists of keys/indices to navigate to the desired content (e.g., [['subpages', 2, 'subpages', 0, 'content', 'Getting Started']]). A path may also start with an id (e.g., ['n7', 'content', 'Overview']).
     """
 
-    formatted_results = ""
-    for path in paths:
-        result = ctx.deps.docs_navigator.get_content(path)
-        formatted_results += "--------------------------------\n"
-        formatted_results += f"Path: {path}\n"
-        formatted_results += f"Content: \n{json.dumps(result['content'], indent=2)}\n"
-        formatted_results += "--------------------------------\n"
-
-    return truncate_tokens(formatted_results)
+    return ctx.deps.docs_navigator.render_paths(paths, fmt=ctx.deps.output_format)
 
 
 docs_navigator_tool = Tool(
@@ -285,7 +503,51 @@ docs_navigator_tool = Tool(
 )
 
 
-async def test_run_docs_navigator(docs_navigator: DocsNavigator, paths: List[List[Any]]) -> str:
+def format_search_results(query: str, results: List[Dict[str, Any]]) -> str:
+    """Render ranked search hits as path + snippet lines for an agent."""
+    if not results:
+        return f"No documentation sections match '{query}'. Try fewer or different terms."
+
+    lines = [f"Top {len(results)} sections for '{query}':"]
+    for rank, result in enumerate(results, start=1):
+        lines.append(f"{rank}. Path: {json.dumps(result['path'], ensure_ascii=False)} ({result['match_type']}, score {result['score']})")
+        lines.append(f"   {result['content']}")
+    return "\n".join(lines)
+
+
+async def search_docs(navigator: DocsNavigator, query: str, top_k: int = 8, semantic: bool = False) -> str:
+    """Keyword or semantic search, formatted for an agent."""
+    top_k = max(1, min(top_k, MAX_SEARCH_RESULTS))
+    if not semantic:
+        return format_search_results(query, navigator.search_content(query, top_k=top_k))
+    try:
+        results = await navigator.semantic_search(query, top_k=top_k)
+    except ImportError:
+        return "Semantic search is unavailable (install the 'semantic' extra); retry with semantic=false."
+    return format_search_results(query, results)
+
+
+async def run_docs_search(ctx: RunContext[AgentDeps], query: str, top_k: int = 8, semantic: bool = False) -> str:
+    """
+    Search over the documentation, ranked by relevance.
+    
+    Args:
+        query: Keywords to look for; wrap exact phrases in double quotes (e.g. '"event stream" reconnect').
+        top_k: Maximum number of sections to return.
+        semantic: Match by meaning instead of keywords; use it when the wording of the docs may differ from yours.
+    """
+    return await search_docs(ctx.deps.docs_navigator, query, top_k=top_k, semantic=semantic)
+
+
+docs_search_tool = Tool(
+    name="docs_search",
+    description="Search the documentation and return ranked section paths with short snippets. Pass a returned path to docs_navigator to read the section. Set semantic=true to match by meaning when keywords miss.",
+    function=run_docs_search,
+    takes_ctx=True
+)
+
+
+async def test_run_docs_navigator(docs_navigator: DocsNavigator, paths: List[Union[str, List[Any]]], fmt: str = "json") -> str:
     """
     Navigate to specific paths in the documentation tree and return the content.
     
@@ -293,15 +555,7 @@ async def test_run_docs_navigator(docs_navigator: DocsNavigator, paths: List[Lis
         paths: List of lists of keys/indices to navigate to the desired content (e.g., [['subpages', 2, 'subpages', 0, 'content', 'Getting Started'], ['subpages', 2, 'subpages', 1, 'content', 'Getting Started']]). Each list is a path to a specific content node in the documentation tree.
     """
 
-    formatted_results = ""
-    for path in paths:
-        result = docs_navigator.get_content(path)
-        formatted_results += "--------------------------------\n"
-        formatted_results += f"Path: {path}\n"
-        formatted_results += f"Content: \n{json.dumps(result['content'], indent=2)}\n"
-        formatted_results += "--------------------------------\n"
-
-    return truncate_tokens(formatted_results)
+    return docs_navigator.render_paths(paths, fmt=fmt)
 
 
 if __name__ == "__main__":
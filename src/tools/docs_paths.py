@@ -0,0 +1,147 @@
+import difflib
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from tools.docs_render import is_mapping, is_sequence
+
+# Keys that structure a page rather than name a section.
+STRUCTURAL_KEYS = {"title", "description", "content", "subpages", "metadata", "path"}
+
+
+def normalize_heading(text: Any) -> str:
+    return " ".join(str(text).split()).lower()
+
+
+def _flatten(path: List[Any]) -> List[Any]:
+    """Agents sometimes wrap a path in an extra list: [['subpages', 0]]."""
+    flat = []
+    for key in path:
+        if isinstance(key, (list, tuple)):
+            flat.extend(_flatten(list(key)))
+        else:
+            flat.append(key)
+    return flat
+
+
+class DocsPathIndex:
+    """
+    Resolve invalid navigator paths to the closest valid node.
+
+    A path is first repaired step by step (string indices, heading case, a missing
+    `content` or `subpages` hop, near-miss headings). If that fails, its last heading
+    is looked up in an index of every page title and section heading.
+    """
+
+    def __init__(self, structured_docs: Any, cutoff: float = 0.6, source: Any = None):
+        """`source`: the same docs as plain dicts to collect headings from (default: structured_docs)."""
+        self.root = structured_docs
+        self.cutoff = cutoff
+        self.headings: Dict[str, List[Tuple[Any, ...]]] = defaultdict(list)
+        self._collect(structured_docs if source is None else source, ())
+
+    def _collect(self, node: Any, path: Tuple[Any, ...]) -> None:
+        if is_mapping(node):
+            title = node.get("title")
+            if isinstance(title, str):
+                self.headings[normalize_heading(title)].append(path)
+            for key, value in node.items():
+                if key not in STRUCTURAL_KEYS:
+                    self.headings[normalize_heading(key)].append(path + (key,))
+                self._collect(value, path + (key,))
+        elif is_sequence(node):
+            for i, item in enumerate(node):
+                self._collect(item, path + (i,))
+
+    def _match(self, wanted: Any, candidates: Dict[str, Any]) -> Optional[Any]:
+        """Exact match on the normalized heading, else the closest by edit ratio."""
+        wanted = normalize_heading(wanted)
+        if wanted in candidates:
+            return candidates[wanted]
+        close = difflib.get_close_matches(wanted, list(candidates), n=1, cutoff=self.cutoff)
+        return candidates[close[0]] if close else None
+
+    def _step(self, node: Any, key: Any) -> Optional[List[Any]]:
+        """Keys that lead from `node` towards what `key` meant, or None."""
+        if is_mapping(node):
+            if isinstance(key, str) and key in node:
+                return [key]
+            try:
+                index = int(key)
+            except (TypeError, ValueError):
+                index = None
+            subpages = node.get("subpages")
+            if index is not None and is_sequence(subpages) and -len(subpages) <= index < len(subpages):
+                return ["subpages", index % len(subpages)]
+            own = {normalize_heading(k): k for k in node}
+            content = node.get("content")
+            inner = {normalize_heading(k): k for k in content} if is_mapping(content) else {}
+            wanted = normalize_heading(key)
+            # Exact headings (here, then behind a missing `content` hop) before fuzzy ones.
+            if wanted in own:
+                return [own[wanted]]
+            if wanted in inner:
+                return ["content", inner[wanted]]
+            match = self._match(key, own)
+            if match is not None:
+                return [match]
+            match = self._match(key, inner) if inner else None
+            if match is not None:
+                return ["content", match]
+            if is_sequence(subpages):
+                step = self._step(subpages, key)
+                if step is not None:
+                    return ["subpages"] + step
+            return None
+        if is_sequence(node):
+            try:
+                index = int(key)
+                if -len(node) <= index < len(node):
+                    return [index % len(node)]
+            except (TypeError, ValueError):
+                pass
+            titles = {
+                normalize_heading(item["title"]): i
+                for i, item in enumerate(node)
+                if is_mapping(item) and isinstance(item.get("title"), str)
+            }
+            match = self._match(key, titles) if titles else None
+            return None if match is None else [match]
+        return None
+
+    def _repair(self, path: List[Any]) -> Optional[Tuple[Any, ...]]:
+        node, resolved = self.root, []
+        for key in path:
+            step = self._step(node, key)
+            if step is None:
+                return None
+            for k in step:
+                node = node[k]
+                resolved.append(k)
+        return tuple(resolved)
+
+    def _by_heading(self, path: List[Any]) -> Optional[Tuple[Any, ...]]:
+        headings = [k for k in path if isinstance(k, str) and k not in STRUCTURAL_KEYS]
+        if not headings:
+            return None
+        wanted = normalize_heading(headings[-1])
+        if wanted not in self.headings:
+            close = difflib.get_close_matches(wanted, list(self.headings), n=1, cutoff=self.cutoff)
+            if not close:
+                return None
+            wanted = close[0]
+
+        def shared_prefix(candidate: Tuple[Any, ...]) -> int:
+            count = 0
+            for a, b in zip(candidate, path):
+                if normalize_heading(a) != normalize_heading(b):
+                    break
+                count += 1
+            return count
+
+        return max(self.headings[wanted], key=shared_prefix)
+
+    def resolve(self, path: List[Any]) -> Optional[Tuple[Any, ...]]:
+        """Closest valid path for `path`, or None when nothing is similar enough."""
+        path = _flatten(list(path))
+        resolved = self._repair(path)
+        return resolved if resolved is not None else self._by_heading(path)
@@ -0,0 +1,317 @@
+import json
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from docs_parser.docs_blocks import expand_blocks
+from docs_parser.token_counts import ENTRY_OVERHEAD_TOKENS, compute_token_counts, get_encoder, node_tokens
+
+TRUNCATION_NOTICE = "\n... [truncated because it exceeds the max tokens limit, try deeper paths]"
+
+
+# Documents are plain JSON dicts/lists or the lazy views of tools.docs_store.
+def is_mapping(value: Any) -> bool:
+    return isinstance(value, Mapping)
+
+
+def is_sequence(value: Any) -> bool:
+    return isinstance(value, Sequence) and not isinstance(value, str)
+
+
+class TokenBudgetWriter:
+    """
+    Collect rendered output until a token budget is spent.
+
+    Text is buffered and tokenized in chunks; once the budget is reached the last
+    chunk is cut at the exact token and every further write is ignored.
+    """
+
+    def __init__(self, max_tokens: int, flush_chars: int = 2048):
+        self.remaining = max_tokens
+        self.flush_chars = flush_chars
+        self.exhausted = False
+        self._parts: List[str] = []
+        self._buffer: List[str] = []
+        self._buffered = 0
+
+    def write(self, text: str) -> bool:
+        """Queue text; returns False once the budget is exhausted."""
+        if self.exhausted:
+            return False
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self.flush_chars:
+            self.flush()
+        return not self.exhausted
+
+    def flush(self) -> None:
+        if not self._buffer or self.exhausted:
+            return
+        chunk = "".join(self._buffer)
+        self._buffer = []
+        self._buffered = 0
+        enc = get_encoder()
+        tokens = enc.encode(chunk)
+        if len(tokens) > self.remaining:
+            self._parts.append(enc.decode(tokens[:self.remaining]))
+            self.remaining = 0
+            self.exhausted = True
+            return
+        self._parts.append(chunk)
+        self.remaining -= len(tokens)
+
+    def write_counted(self, text: str, tokens: int) -> bool:
+        """Append text whose token count is already known, skipping the tokenizer when it fits."""
+        self.flush()
+        if self.exhausted or tokens > self.remaining:
+            self.write(text)
+            self.flush()
+            return not self.exhausted
+        self._parts.append(text)
+        self.remaining -= tokens
+        return True
+
+    def getvalue(self, notice: bool = True) -> str:
+        self.flush()
+        text = "".join(self._parts)
+        return text + TRUNCATION_NOTICE if self.exhausted and notice else text
+
+
+class RenderCache:
+    """Bounded LRU of rendered blocks: key -> (text, tokens, content blocks printed)."""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[str, int, frozenset]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Tuple[str, int, frozenset]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Hashable, entry: Tuple[str, int, frozenset]) -> None:
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+def render_json(
+    node: Any,
+    writer: TokenBudgetWriter,
+    max_depth: int = 15,
+    indent: int = 2,
+    text: Optional[Callable[[str], str]] = None,
+) -> bool:
+    """
+    Write `node` as indented JSON (same layout as json.dumps(indent=2)) without copying it.
+
+    Containers nested deeper than `max_depth` are replaced by a short placeholder.
+    `text` transforms string values (e.g. expanding content blocks).
+    Returns False as soon as the writer's budget is exhausted.
+    """
+
+    def walk(value: Any, depth: int, pad: str) -> bool:
+        if is_mapping(value):
+            if depth >= max_depth:
+                return writer.write(json.dumps({"...": f"<content truncated at depth {max_depth}>"}))
+            if not value:
+                return writer.write("{}")
+            inner = pad + " " * indent
+            writer.write("{")
+            first = True
+            for key, item in value.items():
+                writer.write(("\n" if first else ",\n") + inner + json.dumps(str(key)) + ": ")
+                first = False
+                if not walk(item, depth + 1, inner):
+                    return False
+            return writer.write("\n" + pad + "}")
+        if is_sequence(value):
+            if depth >= max_depth:
+                return writer.write(json.dumps([f"<list with {len(value)} items truncated at depth {max_depth}>"]))
+            if not value:
+                return writer.write("[]")
+            inner = pad + " " * indent
+            writer.write("[")
+            for i, item in enumerate(value):
+                writer.write(("\n" if i == 0 else ",\n") + inner)
+                if not walk(item, depth + 1, inner):
+                    return False
+            return writer.write("\n" + pad + "]")
+        if text is not None and isinstance(value, str):
+            value = text(value)
+        return writer.write(json.dumps(value))
+
+    return walk(node, 0, "")
+
+
+# Rough cost of the " ...[+N tokens]" marker appended to an excerpt.
+EXCERPT_MARKER_TOKENS = 8
+
+
+def _excerpt_cap(lengths: List[int], budget: int) -> int:
+    """Largest per-string cap c with sum(min(length, c)) <= budget (water-filling)."""
+    if not lengths or sum(lengths) <= budget:
+        return max(lengths, default=0)
+    ordered = sorted(lengths)
+    spent = 0
+    for i, length in enumerate(ordered):
+        remaining = len(ordered) - i
+        if spent + length * remaining > budget:
+            return max((budget - spent) // remaining, 0)
+        spent += length
+    return ordered[-1]
+
+
+def _children(container: Any, counts: Dict[int, int]):
+    """Yield (key, item, item tokens) for a dict-like or list-like node."""
+    items = container.items() if is_mapping(container) else enumerate(container)
+    child_tokens = getattr(container, "child_tokens", None)
+    for key, item in items:
+        yield key, item, child_tokens(key) if child_tokens else node_tokens(item, counts)
+
+
+OUTPUT_FORMATS = ("json", "markdown")
+
+
+def render_budgeted(
+    node: Any,
+    writer: TokenBudgetWriter,
+    counts: Dict[int, int],
+    budget: int,
+    max_depth: int = 15,
+    min_excerpt_tokens: int = 8,
+    fmt: str = "json",
+    text: Optional[Callable[..., str]] = None,
+) -> bool:
+    """
+    Render `node` within `budget` tokens, breadth first.
+
+    Nodes that fit are rendered whole. Otherwise every heading down to the deepest
+    level that fits is kept, deeper sections are summarised, and the remaining
+    budget is spread over the text as equal-length leading excerpts, so sibling
+    sections are never silently dropped.
+
+    `fmt` is "json" (indented JSON) or "markdown" (keys as headings, raw text as
+    values). Budgets use the JSON token counts, which only overestimate Markdown.
+    `text(value, shown_chars=None)` transforms string values before they are cut
+    (e.g. expanding content blocks); `shown_chars` is how much of the result is kept.
+    """
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format '{fmt}'. Expected one of: {', '.join(OUTPUT_FORMATS)}")
+    fits = node_tokens(node, counts) <= budget
+    if fits and fmt == "json":
+        return render_json(node, writer, max_depth=max_depth, text=text)
+
+    open_depth = max_depth
+    cap = None
+    if not fits:
+        # 1. Open levels breadth first while their headings take at most half the budget.
+        heading_budget = budget // 2
+        open_depth = 0
+        level = [node] if is_mapping(node) or is_sequence(node) else []
+        spent = 0
+        strings: List[int] = []
+        while level and open_depth < max_depth:
+            cost = 0
+            next_level = []
+            level_strings = []
+            for container in level:
+                is_dict = is_mapping(container)
+                for key, item, tokens in _children(container, counts):
+                    cost += ENTRY_OVERHEAD_TOKENS + (len(str(key)) // 4 + 1 if is_dict else 0)
+                    if is_mapping(item) or is_sequence(item):
+                        next_level.append(item)
+                    elif isinstance(item, str):
+                        level_strings.append(tokens)
+            if open_depth > 0 and spent + cost > heading_budget:
+                break
+            spent += cost
+            strings.extend(level_strings)
+            open_depth += 1
+            level = next_level
+
+        # 2. Share what is left evenly across the visible text, keeping room for the
+        #    "[+N tokens]" markers and the summaries of closed sections.
+        text_budget = int((budget - spent) * 0.9) - EXCERPT_MARKER_TOKENS * len(strings)
+        cap = max(_excerpt_cap(strings, text_budget), min_excerpt_tokens)
+
+    def summary(value: Any) -> str:
+        kind = "sections" if is_mapping(value) else "items"
+        return f"<{len(value)} {kind}, ~{node_tokens(value, counts)} tokens; request a deeper path>"
+
+    def excerpt(value: Any, tokens: int) -> Any:
+        if not isinstance(value, str):
+            return value
+        if cap is not None and tokens > cap:
+            full = text(value, 0) if text is not None else value
+            encoded = get_encoder().encode(full)
+            if len(encoded) > cap:
+                kept = get_encoder().decode(encoded[:cap])
+                if text is not None:
+                    # only what is kept counts as shown (content blocks cut here stay unprinted)
+                    text(value, len(kept))
+                return kept + f" ...[+{len(encoded) - cap} tokens]"
+        return text(value) if text is not None else value
+
+    def walk(value: Any, depth: int, pad: str, tokens: int) -> bool:
+        is_dict = is_mapping(value)
+        if is_dict or is_sequence(value):
+            if depth >= open_depth:
+                return writer.write(json.dumps({"...": summary(value)} if is_dict else [summary(value)]))
+            if not value:
+                return writer.write("{}" if is_dict else "[]")
+            inner = pad + "  "
+            writer.write("{" if is_dict else "[")
+            for i, (key, item, item_tokens) in enumerate(_children(value, counts)):
+                writer.write(("\n" if i == 0 else ",\n") + inner + (json.dumps(str(key)) + ": " if is_dict else ""))
+                if not walk(item, depth + 1, inner, item_tokens):
+                    return False
+            return writer.write("\n" + pad + ("}" if is_dict else "]"))
+        return writer.write(json.dumps(excerpt(value, tokens)))
+
+    def walk_markdown(value: Any, depth: int, tokens: int) -> bool:
+        is_dict = is_mapping(value)
+        if is_dict or is_sequence(value):
+            if depth >= open_depth:
+                return writer.write(f"_{summary(value)}_\n\n")
+            if not value:
+                return writer.write("_(empty)_\n\n")
+            hashes = "#" * min(depth + 1, 6)
+            bullets = False
+            for key, item, item_tokens in _children(value, counts):
+                if item is None:
+                    continue
+                if not is_dict and not (is_mapping(item) or is_sequence(item)):
+                    # Plain list items become bullets.
+                    bullets = True
+                    line = str(excerpt(item, item_tokens)).strip().replace("\n", "\n  ")
+                    if not writer.write(f"- {line}\n"):
+                        return False
+                    continue
+                writer.write(f"{hashes} {key if is_dict else f'[{key}]'}\n\n")
+                if not walk_markdown(item, depth + 1, item_tokens):
+                    return False
+            return writer.write("\n") if bullets else True
+        value = excerpt(value, tokens)
+        body = value.strip() if isinstance(value, str) else json.dumps(value)
+        return writer.write(body + "\n\n")
+
+    if fmt == "markdown":
+        return walk_markdown(node, 0, node_tokens(node, counts))
+    return walk(node, 0, "", node_tokens(node, counts))
@@ -0,0 +1,99 @@
+"""
+Embedding search over structured_docs sections (needs the `semantic` extra: numpy).
+
+Every content leaf becomes one section, prefixed with its headings. Vectors are
+L2-normalised float32 rows of one matrix, so a query is a single matrix-vector
+product followed by a partial top-k sort. Vectors are cached next to the docs by
+a hash of each section's input text, so a re-parse only embeds new sections.
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+import config
+from llm_proxy import get_embeddings
+from tools.docs_index import SKIPPED_KEYS, DocsSearchIndex
+
+CACHE_FILENAME = "semantic_index.npz"
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def section_text(path: Sequence[Any], text: str, max_chars: int) -> str:
+    """Section text prefixed with its headings, so short leaves keep their context."""
+    headings = [key for key in path if isinstance(key, str) and key not in SKIPPED_KEYS]
+    return " > ".join(headings) + "\n" + text[:max_chars]
+
+
+class DocsSemanticIndex:
+    """Normalised float32 embedding matrix plus the navigation path of each row."""
+
+    def __init__(self, paths: List[List[Any]], texts: List[str], vectors: np.ndarray):
+        self.paths = paths
+        self.texts = texts
+        self.vectors = vectors
+
+    @classmethod
+    async def build(
+        cls,
+        search_index: DocsSearchIndex,
+        cache_path: Optional[str] = None,
+        batch_size: int = 64,
+        max_chars: int = 2000,
+    ) -> "DocsSemanticIndex":
+        """
+        Embed the content sections of a search index, reusing cached rows of sections
+        whose text is unchanged (wherever they moved) under the same embedding model.
+        """
+        ids = [i for i, match_type in enumerate(search_index.match_types) if match_type == "content"]
+        paths = [search_index.paths[i] for i in ids]
+        texts = [search_index.texts[i] for i in ids]
+
+        signature = json.dumps([config.EMBEDDING_MODEL, max_chars])
+        inputs = [section_text(path, text, max_chars) for path, text in zip(paths, texts)]
+        keys = [hashlib.sha256(text.encode("utf-8")).hexdigest()[:32] for text in inputs]
+        cached_rows: Dict[str, np.ndarray] = {}
+        if cache_path and os.path.exists(cache_path):
+            with np.load(cache_path, allow_pickle=False) as cached:
+                if str(cached["signature"]) == signature and "keys" in cached:
+                    cached_rows = dict(zip(json.loads(str(cached["keys"])), cached["vectors"]))
+        missing = sorted({key: i for i, key in enumerate(keys) if key not in cached_rows}.values())
+        rows: List[List[float]] = []
+        for start in range(0, len(missing), batch_size):
+            rows.extend(await get_embeddings([inputs[i] for i in missing[start:start + batch_size]]))
+        if missing:
+            new_rows = _normalize(np.asarray(rows, dtype=np.float32).reshape(len(missing), -1))
+            cached_rows.update((keys[i], row) for i, row in zip(missing, new_rows))
+        vectors = np.stack([cached_rows[key] for key in keys]) if keys else np.zeros((0, 0), dtype=np.float32)
+
+        # Rewritten when sections were added or removed, keeping only current rows.
+        if cache_path and (missing or len(cached_rows) != len(set(keys))):
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp.npz"
+            np.savez(tmp_path, vectors=vectors, keys=json.dumps(keys), signature=signature)
+            os.replace(tmp_path, cache_path)
+        return cls(paths, texts, vectors)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def search(self, query_vector: Sequence[float], top_k: int = 10) -> List[Dict[str, Any]]:
+        """Top-k sections by cosine similarity to an (unnormalised) query embedding."""
+        if not len(self.paths):
+            return []
+        query = _normalize(np.asarray(query_vector, dtype=np.float32))
+        scores = self.vectors @ query
+        top_k = min(top_k, len(scores))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            {"path": self.paths[i], "score": round(float(scores[i]), 4), "text": self.texts[i]}
+            for i in top
+        ]
+
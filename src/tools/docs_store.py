@@ -0,0 +1,207 @@
+"""
+Compiled, memory-mapped document store shared by every process on a machine.
+
+Layout of docs_store.bin (little endian):
+    header      magic, version, node count, structured_docs root, docs_tree root
+    node table  one fixed-size record per JSON value (see NODE)
+    string pool UTF-8 bytes for keys, strings and numbers
+
+Containers point at a contiguous run of child records, so a lookup only touches
+the records and strings it actually reads. The file is opened read-only with
+mmap, so N workers share one copy through the page cache.
+"""
+
+import json
+import mmap
+import os
+import struct
+from collections import deque
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, List, Optional
+
+from docs_parser.docs_blocks import BLOCKS_FILENAME, load_blocks
+from docs_parser.json_io import json_exists, load_json, resolve_json_path
+from docs_parser.token_counts import compute_token_counts
+
+STORE_FILENAME = "docs_store.bin"
+MAGIC = b"CWBS"
+VERSION = 1
+HEADER = struct.Struct("<4sIIII")
+# kind, key offset, key length, a, b, rendered tokens
+NODE = struct.Struct("<B3xIIIII")
+
+NULL, BOOL, NUMBER, STRING, DICT, LIST = range(6)
+
+
+def _compile(roots: List[Any], path: str, blocks: Optional[Dict[str, str]] = None) -> None:
+    """Write the JSON roots as one store file (atomically replaces `path`)."""
+    records: List[List[int]] = []
+    pool = bytearray()
+    interned: Dict[str, tuple] = {}
+
+    def intern(text: str) -> tuple:
+        # Keys and repeated strings are stored once in the pool.
+        if text not in interned:
+            data = text.encode("utf-8")
+            interned[text] = (len(pool), len(data))
+            pool.extend(data)
+        return interned[text]
+
+    counts: Dict[int, int] = {}
+    for root in roots:
+        counts.update(compute_token_counts(root, blocks))
+
+    queue = deque()
+    root_indices = []
+    for root in roots:
+        root_indices.append(len(records))
+        records.append([NULL, 0, 0, 0, 0, 0])
+        queue.append((root, root_indices[-1]))
+
+    while queue:
+        value, index = queue.popleft()
+        record = records[index]
+        record[5] = counts.get(id(value), 1)
+        if isinstance(value, dict):
+            first = len(records)
+            for key, item in value.items():
+                key_off, key_len = intern(str(key))
+                records.append([NULL, key_off, key_len, 0, 0, 0])
+                queue.append((item, len(records) - 1))
+            record[0], record[3], record[4] = DICT, first, len(value)
+        elif isinstance(value, list):
+            first = len(records)
+            for item in value:
+                records.append([NULL, 0, 0, 0, 0, 0])
+                queue.append((item, len(records) - 1))
+            record[0], record[3], record[4] = LIST, first, len(value)
+        elif isinstance(value, str):
+            record[0] = STRING
+            record[3], record[4] = intern(value)
+        elif isinstance(value, bool):
+            record[0], record[3] = BOOL, int(value)
+        elif isinstance(value, (int, float)):
+            record[0] = NUMBER
+            record[3], record[4] = intern(json.dumps(value))
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(records), root_indices[0], root_indices[1]))
+        for record in records:
+            f.write(NODE.pack(*record))
+        f.write(pool)
+    os.replace(tmp_path, path)
+
+
+class DocsStore:
+    """Read-only view over a compiled docs_store.bin."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.node_count, structured_root, tree_root = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Unsupported docs store format in {path}")
+        self._pool_offset = HEADER.size + self.node_count * NODE.size
+        self.structured_docs = self.value(structured_root)
+        self.docs_tree = self.value(tree_root)
+
+    @classmethod
+    def open_or_build(cls, docs_tree_path: str, structured_docs_path: str) -> "DocsStore":
+        """Open the store next to structured_docs.json, compiling it first if missing or stale."""
+        store_path = os.path.join(os.path.dirname(structured_docs_path), STORE_FILENAME)
+        sources = [resolve_json_path(docs_tree_path), resolve_json_path(structured_docs_path)]
+        # Expanded block text is compiled into the store, so a re-dedup makes it stale too.
+        blocks_path = os.path.join(os.path.dirname(structured_docs_path), BLOCKS_FILENAME)
+        if json_exists(blocks_path):
+            sources.append(resolve_json_path(blocks_path))
+        if not os.path.exists(store_path) or os.path.getmtime(store_path) < max(os.path.getmtime(p) for p in sources):
+            roots = [load_json(structured_docs_path), load_json(docs_tree_path)]
+            _compile(roots, store_path, load_blocks(os.path.dirname(structured_docs_path)))
+        return cls(store_path)
+
+    def record(self, index: int) -> tuple:
+        return NODE.unpack_from(self._mm, HEADER.size + index * NODE.size)
+
+    def text(self, offset: int, length: int) -> str:
+        start = self._pool_offset + offset
+        return str(self._mm[start:start + length], "utf-8")
+
+    def key(self, index: int) -> str:
+        _, key_off, key_len, _, _, _ = self.record(index)
+        return self.text(key_off, key_len)
+
+    def value(self, index: int) -> Any:
+        kind, _, _, a, b, tokens = self.record(index)
+        if kind == DICT:
+            return StoreDict(self, a, b, tokens)
+        if kind == LIST:
+            return StoreList(self, a, b, tokens)
+        if kind == STRING:
+            return self.text(a, b)
+        if kind == NUMBER:
+            return json.loads(self.text(a, b))
+        if kind == BOOL:
+            return bool(a)
+        return None
+
+    def tokens(self, index: int) -> int:
+        return self.record(index)[5]
+
+
+class StoreDict(Mapping):
+    """Lazy dict view of a store record; values are decoded on access."""
+
+    __slots__ = ("_store", "_first", "_count", "tokens", "_keys")
+
+    def __init__(self, store: DocsStore, first: int, count: int, tokens: int):
+        self._store = store
+        self._first = first
+        self._count = count
+        self.tokens = tokens
+        self._keys: Optional[Dict[str, int]] = None
+
+    def _key_index(self) -> Dict[str, int]:
+        if self._keys is None:
+            self._keys = {self._store.key(i): i for i in range(self._first, self._first + self._count)}
+        return self._keys
+
+    def __getitem__(self, key: str) -> Any:
+        return self._store.value(self._key_index()[key])
+
+    def __iter__(self):
+        return iter(self._key_index())
+
+    def __len__(self) -> int:
+        return self._count
+
+    def child_tokens(self, key: str) -> int:
+        return self._store.tokens(self._key_index()[key])
+
+
+class StoreList(Sequence):
+    """Lazy list view of a store record."""
+
+    __slots__ = ("_store", "_first", "_count", "tokens")
+
+    def __init__(self, store: DocsStore, first: int, count: int, tokens: int):
+        self._store = store
+        self._first = first
+        self._count = count
+        self.tokens = tokens
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("list index out of range")
+        return self._store.value(self._first + index)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def child_tokens(self, index: int) -> int:
+        return self._store.tokens(self._first + index)
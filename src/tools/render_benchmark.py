@@ -0,0 +1,58 @@
+"""
+Compare docs_navigator output tokens per call for the json and markdown formats.
+
+    cd src && python -m tools.render_benchmark --docs-path ../examples/OpenHands/codewiki
+"""
+
+import argparse
+import os
+import statistics
+from typing import Any, List
+
+import config
+from llm_proxy import count_tokens
+from tools.docs_navigator import DocsNavigator
+from tools.docs_render import OUTPUT_FORMATS, is_mapping, is_sequence
+
+
+def page_paths(node: Any, path: List[Any]) -> List[List[Any]]:
+    """Paths of every page content section, a typical docs_navigator request."""
+    paths = []
+    if is_mapping(node):
+        if node.get("content"):
+            paths.append(path + ["content"])
+        subpages = node.get("subpages")
+        if is_sequence(subpages):
+            for i, subpage in enumerate(subpages):
+                paths.extend(page_paths(subpage, path + ["subpages", i]))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs-path", default=os.path.join(str(config.PROJECT_ROOT.parent), "examples", "OpenHands", "codewiki"))
+    parser.add_argument("--max-tokens", type=int, default=config.MAX_TOKENS_PER_TOOL_RESPONSE)
+    args = parser.parse_args()
+
+    navigator = DocsNavigator(
+        os.path.join(args.docs_path, "docs_tree.json"),
+        os.path.join(args.docs_path, "structured_docs.json"),
+    )
+    paths = page_paths(navigator.structured_docs, [])
+    if not paths:
+        raise SystemExit(f"No pages found in {args.docs_path}")
+    tokens = {
+        fmt: [count_tokens(navigator.render_paths([path], max_tokens=args.max_tokens, fmt=fmt)) for path in paths]
+        for fmt in OUTPUT_FORMATS
+    }
+
+    print(f"{len(paths)} page calls from {args.docs_path} (budget {args.max_tokens} tokens)")
+    for fmt in OUTPUT_FORMATS:
+        print(f"  {fmt:<9} total={sum(tokens[fmt]):>8}  mean={statistics.mean(tokens[fmt]):>8.1f}  median={statistics.median(tokens[fmt]):>8.1f}")
+    savings = [1 - m / j for j, m in zip(tokens["json"], tokens["markdown"]) if j]
+    print(f"  markdown saves {1 - sum(tokens['markdown']) / sum(tokens['json']):.1%} overall, "
+          f"{statistics.median(savings):.1%} per call (median)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+JOURNAL_FILENAME = "run_journal.jsonl"
+
+
+def journal_path(repo_path: str) -> str:
+    """Return the journal file used for runs under data/<repo>."""
+    return os.path.join(repo_path, JOURNAL_FILENAME)
+
+
+def record_run(
+    repo_path: str,
+    stage: str,
+    model: Optional[str],
+    usage: Any = None,
+    prompt_tokens: int = 0,
+    elapsed: float = 0.0,
+    use_tools: bool = True,
+    output_tokens: int = 0,
+) -> None:
+    """
+    Append one model run (a judge leaf or a rubrics generation) to the repo journal.
+
+    Args:
+        repo_path: data/<repo> directory
+        stage: "eval" or "rubrics"
+        model: Model name used for the run
+        usage: pydantic-ai RunUsage (None for single native calls)
+        prompt_tokens: Tokens in the system + user prompt
+        elapsed: Wall time of the run in seconds
+        use_tools: Whether the model could call the docs tools
+        output_tokens: Tokens in the answer of a native call (used when usage is None)
+    """
+    entry = {
+        "stage": stage,
+        "model": model,
+        "requests": getattr(usage, "requests", 1) if usage is not None else 1,
+        "input_tokens": getattr(usage, "input_tokens", 0) if usage is not None else prompt_tokens,
+        "output_tokens": getattr(usage, "output_tokens", 0) if usage is not None else output_tokens,
+        "prompt_tokens": prompt_tokens,
+        "use_tools": use_tools,
+        "elapsed": round(elapsed, 3),
+        "timestamp": time.time(),
+    }
+    try:
+        os.makedirs(repo_path, exist_ok=True)
+        with open(journal_path(repo_path), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+    except OSError as e:
+        print(f"Warning: Could not write run journal: {e}")
+
+
+def load_runs(paths: Iterable[str], stage: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Load journal entries from the given files, optionally filtered by stage."""
+    entries = []
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if stage is None or entry.get("stage") == stage:
+                        entries.append(entry)
+        except OSError:
+            continue
+    return entries
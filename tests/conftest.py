@@ -0,0 +1,12 @@
+import pytest
+
+from docs_parser.token_counts import get_encoder
+
+
+@pytest.fixture(scope="session")
+def tokenizer():
+    """tiktoken's encoding, downloaded on first use; tests that count tokens skip without it."""
+    try:
+        return get_encoder()
+    except Exception as exc:
+        pytest.skip(f"tiktoken encoding unavailable: {exc}")
@@ -0,0 +1,79 @@
+"""
+Stand-in for the DeepWiki MCP server: serves the example DeepWiki pages over SSE
+for any repository except those with "missing" in their name.
+
+Usage: python mcp_standin_server.py PORT
+"""
+
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+DOCS_DIR = Path(__file__).resolve().parents[1] / "examples" / "OpenHands" / "deepwiki" / "docs"
+PAGES = sorted(DOCS_DIR.glob("content_*.md"), key=lambda path: int(path.stem.rsplit("_", 1)[1]))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int) -> subprocess.Popen:
+    """Run the stand-in on `port` and wait until it accepts connections."""
+    process = subprocess.Popen([sys.executable, __file__, str(port)])
+    deadline = time.monotonic() + 20
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("stand-in MCP server did not start")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    # uvicorn's graceful shutdown waits for open SSE streams; kill it like a crash
+    process.kill()
+    process.wait(timeout=10)
+
+
+def _page(path: Path):
+    title, _, body = path.read_text(encoding="utf-8").partition("\n\n")
+    return title, body
+
+
+def main(port: int) -> None:
+    from mcp.server.fastmcp import Context, FastMCP
+    from mcp.types import TextContent
+
+    mcp = FastMCP("deepwiki-standin", port=port, log_level="WARNING")
+
+    def check(repo_name: str) -> None:
+        if "missing" in repo_name:
+            raise ValueError(f"Repository {repo_name} is not indexed")
+
+    @mcp.tool()
+    def read_wiki_structure(repoName: str) -> str:
+        check(repoName)
+        titles = [_page(path)[0].replace("-", " ", 1) for path in PAGES]
+        return f"Available pages for {repoName}:\n\n" + "\n".join(f"- {title}" for title in titles)
+
+    @mcp.tool()
+    def read_wiki_contents(repoName: str) -> list[TextContent]:
+        check(repoName)
+        return [TextContent(type="text", text=_page(path)[1]) for path in PAGES]
+
+    @mcp.tool()
+    def session_id(ctx: Context) -> str:
+        """Identifies the server-side session, so tests can tell reuse from reconnection."""
+        return str(id(ctx.session))
+
+    mcp.run(transport="sse")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]))
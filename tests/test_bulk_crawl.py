@@ -0,0 +1,63 @@
+"""Bulk crawls against the stand-in MCP server record progress and resume from the manifest."""
+
+import pytest
+
+import config
+from docs_parser import bulk_crawl
+from docs_parser.bulk_crawl import crawl_repos_file, load_manifest
+from mcp_standin_server import PAGES, free_port, start_server, stop_server
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    port = free_port()
+    process = start_server(port)
+    yield f"http://127.0.0.1:{port}/sse"
+    stop_server(process)
+
+
+@pytest.fixture
+def crawled(tmp_path, monkeypatch):
+    """Repo names crawled during the test, with data/ redirected to tmp_path."""
+    monkeypatch.setattr(config, "DATA_DIR", tmp_path / "data")
+    crawled = []
+    crawl = bulk_crawl.crawl_deepwiki_docs
+
+    async def counting(url, output_dir, server_url=None):
+        crawled.append(url.rsplit("/", 1)[1])
+        await crawl(url, output_dir, server_url)
+
+    monkeypatch.setattr(bulk_crawl, "crawl_deepwiki_docs", counting)
+    return crawled
+
+
+def test_crawl_resumes_from_the_manifest(tmp_path, server_url, crawled):
+    repos_file = tmp_path / "repos.txt"
+    repos_file.write_text(
+        "# test corpus\n"
+        "https://github.com/acme/alpha\n"
+        "https://github.com/acme/beta   beta-docs\n"
+        "https://github.com/acme/missing\n"
+        "\n"
+        "https://deepwiki.com/acme/gamma\n",
+        encoding="utf-8",
+    )
+    options = {"concurrency": 2, "host_interval": 0, "server_url": server_url}
+
+    entries = crawl_repos_file(str(repos_file), **options)
+    assert sorted(crawled) == ["alpha", "beta", "gamma", "missing"]
+    statuses = {entry["repo"]: entry["status"] for entry in entries.values()}
+    assert statuses == {"alpha": "done", "beta-docs": "done", "missing": "failed", "gamma": "done"}
+    for repo in ("alpha", "beta-docs", "gamma"):
+        docs_dir = config.DATA_DIR / repo / "deepwiki" / "docs"
+        assert len(list(docs_dir.glob("content_*.md"))) == len(PAGES)
+    manifest_path = tmp_path / "repos.manifest.json"
+    assert load_manifest(str(manifest_path)) == entries
+
+    # a second run only retries the repo that failed
+    crawled.clear()
+    resumed = crawl_repos_file(str(repos_file), **options)
+    assert crawled == ["missing"]
+    assert {url: entry for url, entry in resumed.items() if entry["status"] == "done"} == {
+        url: entry for url, entry in entries.items() if entry["status"] == "done"
+    }
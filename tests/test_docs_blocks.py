@@ -0,0 +1,71 @@
+"""Repeated paragraphs are stored once and expand back to the original docs."""
+
+import copy
+import json
+from pathlib import Path
+
+import pytest
+
+from docs_parser.docs_blocks import BLOCK_RE, PARAGRAPH_SEP, dedup_blocks, expand_blocks, expand_tree
+from docs_parser.json_io import load_json
+
+DOCS_PATH = Path(__file__).resolve().parents[1] / "examples" / "OpenHands" / "codewiki" / "structured_docs.json"
+
+
+def _strings(node):
+    if isinstance(node, dict):
+        for value in node.values():
+            yield from _strings(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _strings(value)
+    elif isinstance(node, str):
+        yield node
+
+
+@pytest.fixture(scope="module")
+def structured_docs():
+    """The example docs with one long paragraph of the first page repeated on two other pages."""
+    docs = load_json(str(DOCS_PATH))
+    shared = next(
+        paragraph
+        for text in _strings(docs["subpages"][0]["content"])
+        for paragraph in text.split(PARAGRAPH_SEP)
+        if len(paragraph) >= 200
+    )
+    for page in docs["subpages"][1:3]:
+        page["content"]["Shared Overview"] = f"Intro for {page['title']}.{PARAGRAPH_SEP}{shared}"
+    return docs
+
+
+def test_example_docs_have_no_repeats():
+    assert dedup_blocks(load_json(str(DOCS_PATH)))[1] == {}
+
+
+def test_repeated_paragraph_is_stored_once(structured_docs):
+    original = copy.deepcopy(structured_docs)
+    deduped, blocks = dedup_blocks(structured_docs)
+    assert len(blocks) == 1
+    assert structured_docs == original  # the input is not modified
+    markers = [m for text in _strings(deduped) for m in BLOCK_RE.findall(text)]
+    assert markers == ["b0"] * 3
+    assert len(json.dumps(deduped)) < len(json.dumps(original))
+    assert expand_tree(deduped, blocks) == original
+
+
+def test_block_is_printed_once_per_response(structured_docs):
+    deduped, blocks = dedup_blocks(structured_docs)
+    first = deduped["subpages"][1]["content"]["Shared Overview"]
+    second = deduped["subpages"][2]["content"]["Shared Overview"]
+    printed = set()
+    assert expand_blocks(first, blocks, printed) == structured_docs["subpages"][1]["content"]["Shared Overview"]
+    assert printed == {"b0"}
+    assert expand_blocks(second, blocks, printed).endswith("[repeated block b0, shown above]")
+
+
+def test_block_cut_off_by_an_excerpt_is_not_counted_as_printed(structured_docs):
+    deduped, blocks = dedup_blocks(structured_docs)
+    text = deduped["subpages"][1]["content"]["Shared Overview"]
+    printed = set()
+    expand_blocks(text, blocks, printed, shown_chars=40)
+    assert printed == set()
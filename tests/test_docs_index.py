@@ -0,0 +1,64 @@
+"""BM25 search over the example CodeWiki docs, including quoted phrases."""
+
+from pathlib import Path
+
+import pytest
+
+from docs_parser.json_io import load_json
+from tools.docs_index import DocsSearchIndex, tokenize
+
+DOCS_PATH = Path(__file__).resolve().parents[1] / "examples" / "OpenHands" / "codewiki" / "structured_docs.json"
+
+
+@pytest.fixture(scope="module")
+def structured_docs():
+    return load_json(str(DOCS_PATH))
+
+
+@pytest.fixture(scope="module")
+def index(structured_docs):
+    return DocsSearchIndex(structured_docs)
+
+
+def _resolve(node, path):
+    for key in path:
+        node = node[key]
+    return node
+
+
+def test_results_are_ranked_and_point_at_matching_sections(index, structured_docs):
+    results = index.search("event stream", top_k=10)
+    assert results
+    scores = [r["score"] for r in results]
+    assert scores == sorted(scores, reverse=True)
+    for result in results:
+        words = tokenize(_resolve(structured_docs, result["path"]))
+        assert "event" in words or "stream" in words
+
+
+def test_phrase_query_requires_adjacent_terms(index, structured_docs):
+    results = index.search('"event stream"', top_k=50)
+    assert results
+    for result in results:
+        text = " ".join(tokenize(_resolve(structured_docs, result["path"])))
+        assert "event stream" in text
+    # "stream event" appears far less often than the two words separately
+    reversed_phrase = index.search('"stream event"', top_k=50)
+    assert len(reversed_phrase) < len(results)
+
+
+def test_unknown_terms_match_nothing(index):
+    assert index.search("qwxzvk") == []
+    assert index.search('"event qwxzvk"') == []
+
+
+def test_bm25_prefers_frequent_terms_in_short_sections():
+    docs = {
+        "title": "Runtime",
+        "content": {
+            "short": "sandbox sandbox runtime",
+            "long": "the sandbox is mentioned once among many other unrelated words in this section",
+        },
+    }
+    results = DocsSearchIndex(docs).search("sandbox")
+    assert [r["path"] for r in results] == [["content", "short"], ["content", "long"]]
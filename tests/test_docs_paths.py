@@ -0,0 +1,42 @@
+"""Invalid navigator paths are corrected to the closest node of the example docs."""
+
+from pathlib import Path
+
+import pytest
+
+from docs_parser.json_io import load_json
+from tools.docs_paths import DocsPathIndex
+
+DOCS_PATH = Path(__file__).resolve().parents[1] / "examples" / "OpenHands" / "codewiki" / "structured_docs.json"
+PURPOSE = ("subpages", 1, "content", "Core Agent System", "Purpose")
+
+
+@pytest.fixture(scope="module")
+def index():
+    return DocsPathIndex(load_json(str(DOCS_PATH)))
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        list(PURPOSE),
+        ["subpages", "1", "content", "Core Agent System", "Purpose"],
+        ["subpages", 1, "content", "core  agent system", "PURPOSE"],
+        ["subpages", 1, "Core Agent System", "Purpose"],
+        ["subpages", 1, "content", "Core Agent Sytem", "Purpose"],
+        ["subpages", "core_agent_system", "content", "Core Agent System", "Purpose"],
+        [["subpages", 1], ["content", "Core Agent System", "Purpose"]],
+    ],
+    ids=["valid", "string-index", "case", "missing-content", "typo", "page-title", "nested"],
+)
+def test_path_is_repaired_step_by_step(index, path):
+    assert index.resolve(path) == PURPOSE
+
+
+def test_unreachable_path_falls_back_to_heading_lookup(index):
+    resolved = index.resolve(["subpages", 99, "Events and Actions Module"])
+    assert resolved == ("subpages", 3, "content", "Events and Actions Module")
+
+
+def test_nothing_similar_resolves_to_none(index):
+    assert index.resolve(["subpages", 99, "qwxzvk"]) is None
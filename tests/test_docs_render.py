@@ -0,0 +1,54 @@
+"""Budgeted rendering: exact truncation and breadth-first excerpts of the example docs."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from docs_parser.json_io import load_json
+from tools.docs_render import TRUNCATION_NOTICE, TokenBudgetWriter, compute_token_counts, render_budgeted
+
+DOCS_PATH = Path(__file__).resolve().parents[1] / "examples" / "OpenHands" / "codewiki" / "structured_docs.json"
+
+
+@pytest.fixture(scope="module")
+def page():
+    return load_json(str(DOCS_PATH))["subpages"][0]
+
+
+def _render(node, budget, fmt="json"):
+    writer = TokenBudgetWriter(budget)
+    render_budgeted(node, writer, compute_token_counts(node), budget, fmt=fmt)
+    return writer
+
+
+def test_writer_cuts_at_the_exact_token(tokenizer):
+    writer = TokenBudgetWriter(10)
+    writer.write("word " * 100)
+    text = writer.getvalue()
+    assert writer.exhausted
+    assert not writer.write("more")
+    assert text.endswith(TRUNCATION_NOTICE)
+    assert len(tokenizer.encode(text[: -len(TRUNCATION_NOTICE)])) == 10
+
+
+def test_node_that_fits_renders_as_plain_json(tokenizer):
+    node = {"title": "Runtime", "content": {"Overview": "Runs actions in a sandbox.", "Steps": ["build", "run"]}}
+    writer = _render(node, 1000)
+    assert not writer.exhausted
+    assert writer.getvalue() == json.dumps(node, indent=2)
+
+
+@pytest.mark.parametrize("fmt", ["json", "markdown"])
+def test_large_page_keeps_every_section_within_budget(tokenizer, page, fmt):
+    budget = 1500
+    assert sum(len(tokenizer.encode(json.dumps(value))) for value in page.values()) > budget
+    writer = _render(page, budget, fmt)
+    text = writer.getvalue(notice=False)
+    assert len(tokenizer.encode(text)) <= budget
+    # breadth first: sibling sections are excerpted, never dropped
+    for key, value in page.items():
+        assert value is None or key in text
+    for heading in page["content"]:
+        assert heading in text
+    assert "...[+" in text
@@ -0,0 +1,77 @@
+"""Page shards: lossless layout, bounded lazy loading and rendering parity with the JSON backend."""
+
+import os
+import shutil
+import time
+from pathlib import Path
+
+import pytest
+
+import config
+from docs_parser.docs_shards import PAGES_DIRNAME, PageShards, shards_are_current, write_page_shards
+from docs_parser.json_io import load_json
+from tools.docs_navigator import RENDER_CACHE, DocsNavigator
+from tools.docs_render import compute_token_counts
+
+DOCS_DIR = Path(__file__).resolve().parents[1] / "examples" / "OpenHands" / "codewiki"
+
+
+@pytest.fixture
+def docs_dir(tmp_path):
+    for name in ("docs_tree.json", "structured_docs.json"):
+        shutil.copy(DOCS_DIR / name, tmp_path / name)
+    return tmp_path
+
+
+@pytest.fixture
+def structured_docs(docs_dir):
+    return load_json(str(docs_dir / "structured_docs.json"))
+
+
+def test_shards_round_trip_and_track_staleness(tokenizer, docs_dir, structured_docs):
+    structured_docs_path = str(docs_dir / "structured_docs.json")
+    pages_dir = str(docs_dir / PAGES_DIRNAME)
+    assert not shards_are_current(pages_dir, structured_docs_path)
+
+    write_page_shards(structured_docs, str(docs_dir))
+    assert shards_are_current(pages_dir, structured_docs_path)
+    assert PageShards(pages_dir).read_tree() == structured_docs
+
+    time.sleep(0.01)
+    os.utime(structured_docs_path)
+    assert not shards_are_current(pages_dir, structured_docs_path)
+
+
+def test_pages_load_lazily_within_the_cache_size(tokenizer, docs_dir, structured_docs):
+    write_page_shards(structured_docs, str(docs_dir))
+    counts = compute_token_counts(structured_docs)
+    shards = PageShards(str(docs_dir / PAGES_DIRNAME), cache_size=2)
+    subpages = shards.root["subpages"]
+    assert len(shards) == 0
+
+    for i, page in enumerate(subpages):
+        original = structured_docs["subpages"][i]
+        assert page["title"] == original["title"]
+        assert subpages.child_tokens(i) == counts[id(original)]
+        # token counts come from the manifest and survive eviction
+        assert page.child_tokens("content") == counts[id(original["content"])]
+        assert len(shards) <= 2
+
+    loaded = len(shards)
+    with shards.pinned():
+        for page in subpages[:5]:
+            page["content"]
+        assert len(shards) == loaded + 5
+    assert len(shards) == 2
+
+
+def test_pages_backend_builds_shards_and_renders_like_json(tokenizer, docs_dir, monkeypatch):
+    monkeypatch.setattr(config, "PAGE_CACHE_SIZE", 1)
+    paths = [["subpages", 0], ["subpages", 1, "content"], ["subpages", 2, "title"]]
+    rendered = {}
+    for backend in ("json", "pages"):
+        RENDER_CACHE.clear()
+        navigator = DocsNavigator(str(docs_dir / "docs_tree.json"), str(docs_dir / "structured_docs.json"), backend)
+        rendered[backend] = navigator.render_paths(paths, 3000)
+    assert (docs_dir / PAGES_DIRNAME).is_dir()
+    assert rendered["pages"] == rendered["json"]
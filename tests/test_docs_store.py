@@ -0,0 +1,67 @@
+"""docs_store.bin must round-trip the JSON documents and render like the JSON backend."""
+
+import os
+import shutil
+import time
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+
+import pytest
+
+from docs_parser.docs_blocks import BLOCKS_FILENAME
+from docs_parser.json_io import dump_json, load_json
+from tools.docs_navigator import RENDER_CACHE, DocsNavigator
+from tools.docs_render import compute_token_counts
+from tools.docs_store import STORE_FILENAME, DocsStore
+
+DOCS_DIR = Path(__file__).resolve().parents[1] / "examples" / "OpenHands" / "codewiki"
+
+
+def _plain(value):
+    if isinstance(value, Mapping):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, Sequence) and not isinstance(value, str):
+        return [_plain(item) for item in value]
+    return value
+
+
+@pytest.fixture
+def docs_dir(tmp_path):
+    for name in ("docs_tree.json", "structured_docs.json"):
+        shutil.copy(DOCS_DIR / name, tmp_path / name)
+    return tmp_path
+
+
+def _open(docs_dir):
+    return DocsStore.open_or_build(str(docs_dir / "docs_tree.json"), str(docs_dir / "structured_docs.json"))
+
+
+def test_store_round_trips_both_documents(tokenizer, docs_dir):
+    store = _open(docs_dir)
+    structured_docs = load_json(str(docs_dir / "structured_docs.json"))
+    assert _plain(store.structured_docs) == structured_docs
+    assert _plain(store.docs_tree) == load_json(str(docs_dir / "docs_tree.json"))
+    assert store.structured_docs.tokens == compute_token_counts(structured_docs)[id(structured_docs)]
+
+
+def test_store_backend_renders_like_json_backend(tokenizer, docs_dir):
+    paths = [["subpages", 0], ["subpages", 0, "content"], ["title"]]
+    rendered = {}
+    for backend in ("json", "store"):
+        RENDER_CACHE.clear()
+        navigator = DocsNavigator(str(docs_dir / "docs_tree.json"), str(docs_dir / "structured_docs.json"), backend)
+        rendered[backend] = navigator.render_paths(paths, 2000)
+    assert rendered["store"] == rendered["json"]
+
+
+def test_store_is_rebuilt_when_a_source_changes(tokenizer, docs_dir):
+    _open(docs_dir)
+    store_path = docs_dir / STORE_FILENAME
+    built = os.path.getmtime(store_path)
+    _open(docs_dir)
+    assert os.path.getmtime(store_path) == built
+
+    time.sleep(0.01)
+    dump_json({}, str(docs_dir / BLOCKS_FILENAME))
+    _open(docs_dir)
+    assert os.path.getmtime(store_path) > built
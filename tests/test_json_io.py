@@ -0,0 +1,60 @@
+"""Compressed JSON artifacts round-trip and are read transparently by their plain name."""
+
+import importlib.util
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+import config
+from docs_parser.json_io import JSON_COMPRESSIONS, dump_json, json_variants, load_json, resolve_json_path
+from docs_parser.json_writer import write_json_if_changed
+from docs_parser.parse_generated_docs import parse_deepwiki
+
+EXAMPLE_DIR = Path(__file__).resolve().parents[1] / "examples" / "OpenHands" / "deepwiki"
+HAS_ZSTD = importlib.util.find_spec("zstandard") is not None
+COMPRESSIONS = ["none", "gzip", pytest.param("zstd", marks=pytest.mark.skipif(not HAS_ZSTD, reason="needs the zstd extra"))]
+
+
+@pytest.fixture(scope="module")
+def structured_docs():
+    return load_json(str(EXAMPLE_DIR / "structured_docs.json"))
+
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+def test_round_trip_by_plain_name(tmp_path, structured_docs, compression):
+    plain = str(tmp_path / "structured_docs.json")
+    written = dump_json(structured_docs, plain, compression=compression)
+    assert written == plain + JSON_COMPRESSIONS[compression]
+    assert resolve_json_path(plain) == written
+    assert load_json(plain) == structured_docs
+
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+def test_unchanged_content_keeps_the_file(tmp_path, structured_docs, compression):
+    plain = str(tmp_path / "structured_docs.json")
+    assert write_json_if_changed(plain, structured_docs, compression=compression)
+    written = resolve_json_path(plain)
+    mtime = os.stat(written).st_mtime_ns
+    assert not write_json_if_changed(plain, structured_docs, compression=compression)
+    assert os.stat(written).st_mtime_ns == mtime
+
+
+def test_switching_compression_removes_the_other_variants(tmp_path, structured_docs):
+    plain = str(tmp_path / "structured_docs.json")
+    dump_json(structured_docs, plain, compression="none")
+    dump_json(structured_docs, plain, compression="gzip")
+    assert [os.path.exists(variant) for variant in json_variants(plain)] == [False, False, True]
+    assert load_json(plain) == structured_docs
+
+
+def test_parser_writes_compressed_outputs(tmp_path, monkeypatch):
+    docs = shutil.copytree(EXAMPLE_DIR / "docs", tmp_path / "docs")
+    parse_deepwiki(str(docs), "OpenHands", str(tmp_path / "plain"))
+    monkeypatch.setattr(config, "JSON_COMPRESSION", "gzip")
+    parse_deepwiki(str(docs), "OpenHands", str(tmp_path / "gzip"))
+    for name in ("docs_tree.json", "structured_docs.json", "node_ids.json"):
+        assert (tmp_path / "gzip" / (name + ".gz")).exists()
+        assert not (tmp_path / "gzip" / name).exists()
+        assert load_json(str(tmp_path / "gzip" / name)) == load_json(str(tmp_path / "plain" / name))
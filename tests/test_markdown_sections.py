@@ -0,0 +1,22 @@
+"""The markdown_it section extractor must give the same sections as markdown_to_json."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from docs_parser.markdown_parity import markdown_files
+from docs_parser.markdown_sections import markdown_to_dict
+
+DOCS_DIR = Path(__file__).resolve().parents[1] / "examples" / "OpenHands" / "deepwiki" / "docs"
+FILES = markdown_files(str(DOCS_DIR))
+
+
+def test_example_docs_found():
+    assert FILES, f"no markdown files under {DOCS_DIR}"
+
+
+@pytest.mark.parametrize("path", FILES, ids=lambda path: os.path.relpath(path, DOCS_DIR))
+def test_markdown_it_matches_markdown_to_json(path):
+    text = Path(path).read_text(encoding="utf-8")
+    assert markdown_to_dict(text, "markdown_it") == markdown_to_dict(text, "markdown_to_json")
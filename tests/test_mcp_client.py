@@ -0,0 +1,69 @@
+"""MCPClient keeps one session across calls and reconnects after the server goes away."""
+
+import asyncio
+
+import pytest
+
+from docs_parser.crawl_deepwiki_docs import MCPClient, iter_deepwiki_pages
+from mcp_standin_server import free_port, start_server, stop_server
+
+
+@pytest.fixture
+def port():
+    return free_port()
+
+
+@pytest.fixture
+def server(port):
+    process = start_server(port)
+    yield process
+    if process.poll() is None:
+        stop_server(process)
+
+
+async def _session_id(client: MCPClient) -> str:
+    result = await client.call_tool("session_id", {})
+    assert not result.isError, result.content
+    return result.content[0].text
+
+
+def test_calls_reuse_one_session(server, port):
+    async def run():
+        client = MCPClient(f"http://127.0.0.1:{port}/sse", timeout=5, read_timeout=10, keepalive_interval=0.2)
+        try:
+            first = await _session_id(client)
+            pages = [page async for page in iter_deepwiki_pages(client, "All-Hands-AI/OpenHands")]
+            await asyncio.sleep(0.5)  # a few keep-alive pings in between
+            assert await _session_id(client) == first
+            return pages
+        finally:
+            await client.disconnect()
+
+    pages = asyncio.run(run())
+    assert pages and all(text for _, text in pages)
+
+
+def test_failed_ping_closes_session_and_next_call_reconnects(server, port):
+    async def run():
+        client = MCPClient(f"http://127.0.0.1:{port}/sse", timeout=5, read_timeout=2, keepalive_interval=0.2)
+        try:
+            first = await _session_id(client)
+            stop_server(server)
+            for _ in range(100):
+                if client.session is None:
+                    break
+                await asyncio.sleep(0.1)
+            # the keep-alive closed the connection too, not just dropped the session
+            assert client.session is None and client._connection is None
+
+            restarted = start_server(port)
+            try:
+                assert await _session_id(client) != first
+            finally:
+                await client.disconnect()
+                stop_server(restarted)
+        finally:
+            if client.session is not None:
+                await client.disconnect()
+
+    asyncio.run(run())
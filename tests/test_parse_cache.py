@@ -0,0 +1,81 @@
+"""Re-parsing the example DeepWiki docs only parses changed files and rewrites only changed outputs."""
+
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from docs_parser import parse_generated_docs
+from docs_parser.json_io import load_json
+from docs_parser.parse_cache import PARSE_CACHE_FILENAME
+
+DOCS_DIR = Path(__file__).resolve().parents[1] / "examples" / "OpenHands" / "deepwiki" / "docs"
+OUTPUTS = ("docs_tree.json", "structured_docs.json", "node_ids.json", "chunk_index.json", "content_blocks.json")
+
+
+@pytest.fixture
+def docs(tmp_path):
+    return Path(shutil.copytree(DOCS_DIR, tmp_path / "docs"))
+
+
+@pytest.fixture
+def parsed_files(monkeypatch):
+    """Files actually parsed (cache misses) during the test."""
+    parsed = []
+    process = parse_generated_docs.process_markdown_file
+
+    def counting(file_path, *args):
+        parsed.append(os.path.basename(file_path))
+        return process(file_path, *args)
+
+    monkeypatch.setattr(parse_generated_docs, "process_markdown_file", counting)
+    return parsed
+
+
+def _parse(docs, output_dir, use_cache=True):
+    parse_generated_docs.parse_deepwiki(str(docs), "OpenHands", str(output_dir), use_cache=use_cache)
+
+
+def _snapshot(output_dir):
+    return {name: ((output_dir / name).read_bytes(), os.stat(output_dir / name).st_mtime_ns) for name in OUTPUTS}
+
+
+def test_unchanged_docs_hit_the_cache_and_leave_outputs_alone(tmp_path, docs, parsed_files):
+    output_dir = tmp_path / "out"
+    _parse(docs, output_dir)
+    assert len(parsed_files) == len(list(docs.glob("*.md")))
+    before = _snapshot(output_dir)
+
+    parsed_files.clear()
+    _parse(docs, output_dir)
+    assert parsed_files == []
+    assert _snapshot(output_dir) == before
+
+
+def test_changed_file_is_reparsed_like_an_uncached_parse(tmp_path, docs, parsed_files):
+    output_dir = tmp_path / "out"
+    _parse(docs, output_dir)
+    changed = docs / "content_3.md"
+    changed.write_text(changed.read_text(encoding="utf-8") + "\n\n## Added Section\n\nNew text.\n", encoding="utf-8")
+
+    parsed_files.clear()
+    _parse(docs, output_dir)
+    assert parsed_files == ["content_3.md"]
+
+    fresh_dir = tmp_path / "fresh"
+    _parse(docs, fresh_dir, use_cache=False)
+    for name in OUTPUTS:
+        assert load_json(str(output_dir / name)) == load_json(str(fresh_dir / name)), name
+
+
+def test_cache_keeps_page_content_out(tmp_path, docs):
+    output_dir = tmp_path / "out"
+    _parse(docs, output_dir)
+    _parse(docs, output_dir)
+    cache_text = (output_dir / PARSE_CACHE_FILENAME).read_text(encoding="utf-8")
+    entries = load_json(str(output_dir / PARSE_CACHE_FILENAME))["files"]
+    # parsed pages are stored as a reference into structured_docs, not as text
+    assert entries and all("node" in entry for entry in entries.values() if entry["result"] is not None)
+    paragraph = next(p for p in (docs / "content_1.md").read_text(encoding="utf-8").split("\n\n") if len(p) > 200)
+    assert paragraph not in cache_text